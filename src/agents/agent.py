@@ -1,15 +1,50 @@
 import asyncio
 import json
+import re
 from typing import Dict, List, Any, Optional, Union, Callable, Awaitable
 
 from agents.mcp_integration import get_mcp_integration
+from prompts import PromptTemplate
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Shared decoder and fence pattern for extracting tool calls from model responses
+_JSON_DEC = json.JSONDecoder()
+_FENCED_JSON_RE = re.compile(r"```json\s*(?=\{)")
+
+
+def _parse_tool_call(response: str) -> Optional[Dict[str, Any]]:
+    """
+    Extract the first JSON object from a model response
+    
+    Args:
+        response: Raw response text from the AI provider
+        
+    Returns:
+        Parsed JSON object or None if the response contains none
+    """
+    # Prefer a fenced ```json block, otherwise take the first object in the text
+    match = _FENCED_JSON_RE.search(response)
+    start = match.end() if match else response.find("{")
+    if start < 0:
+        return None
+    
+    try:
+        tool_call, _ = _JSON_DEC.raw_decode(response, start)
+    except ValueError:
+        return None
+    
+    return tool_call if isinstance(tool_call, dict) else None
+
+
 class Tool:
     """Base class for all local tools"""
     
+    # Tools that never await can set this and implement execute_sync,
+    # letting the agent call them without a coroutine round-trip
+    is_sync_fast: bool = False
+    
     def __init__(self, name: str, description: str):
         self.name = name
         self.description = description
@@ -17,6 +52,10 @@ class Tool:
     async def execute(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Execute the tool with given arguments"""
         raise NotImplementedError("Subclasses must implement execute method")
+    
+    def execute_sync(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute the tool synchronously, used when is_sync_fast is set"""
+        raise NotImplementedError("Fast tools must implement execute_sync method")
 
 
 class Agent:
@@ -40,32 +79,93 @@ class Agent:
             name: Agent name
             system: System prompt for the agent
             tools: List of local tools
-            mcp_servers: List of MCP server configurations to add
+            mcp_servers: List of MCP server configurations to add on connect
             mcp_config_path: Path to MCP configuration file
         """
         self.name = name
+        self._agent_prompt = None
         self.system = system
         self.local_tools = tools or []
+        self._local_tool_map = {tool.name: tool for tool in self.local_tools}
         self.mcp_integration = get_mcp_integration(mcp_config_path)
         
-        # Add MCP servers if provided
-        if mcp_servers:
-            for server_config in mcp_servers:
-                server_type = server_config.get("type", "")
-                if server_type == "stdio":
-                    self._add_stdio_mcp_server(server_config)
+        # MCP servers to add, registered on the first connect
+        self._pending_mcp_servers = [
+            server_config for server_config in (mcp_servers or [])
+            if server_config.get("type", "") == "stdio"
+        ]
         
         # Dictionary to track available MCP tools
         self.mcp_tools = {}
+        # Names of the MCP servers found on the last connect
+        self._server_set = frozenset()
+        
+    @property
+    def system(self) -> str:
+        """System prompt for the agent"""
+        return self._system
+    
+    @system.setter
+    def system(self, value: str) -> None:
+        self._system = value
+        self._agent_prompt = None
+        
+    def _rebuild_prompt_cache(self) -> None:
+        """
+        Build the agent prompt for the current system prompt and tool set
+        """
+        # Format tools for inclusion in the prompt
+        tools_description = "".join(
+            f"- {tool_info['name']} ({tool_info.get('server', 'local')}): {tool_info['description']}\n"
+            for tool_info in self.get_available_tools().values()
+        )
+        
+        # Create a special prompt for the agent
+        self._agent_prompt = PromptTemplate(
+            name="agent_prompt",
+            description="AI Agent with tool access",
+            system_prompt=f"""You are {self.name}, an AI assistant with access to various tools.
+
+SYSTEM INSTRUCTIONS:
+{self.system}
+
+AVAILABLE TOOLS:
+{tools_description}
+
+To use a tool, respond with JSON in the following format:
+```json
+{{
+  "tool": "tool_name",
+  "args": {{
+    "arg1": "value1",
+    "arg2": "value2"
+  }}
+}}
+```
+
+If you don't need to use a tool, simply respond with normal text.
+"""
+        )
+        
+    def _get_agent_prompt(self) -> PromptTemplate:
+        """
+        Get the cached agent prompt, rebuilding it if the tools or system prompt changed
+        
+        Returns:
+            PromptTemplate for the agent
+        """
+        if self._agent_prompt is None:
+            self._rebuild_prompt_cache()
+        return self._agent_prompt
         
-    def _add_stdio_mcp_server(self, server_config: Dict[str, Any]) -> None:
+    async def _add_stdio_mcp_server(self, server_config: Dict[str, Any]) -> None:
         """
         Add a stdio-based MCP server
         
         Args:
             server_config: Server configuration dictionary
         """
-        server_name = server_config.get("name", f"mcp-server-{len(self.mcp_integration.get_available_servers()) + 1}")
+        server_name = server_config.get("name", f"mcp-server-{len(self.mcp_integration.get_configured_servers()) + 1}")
         
         # Create MCP server configuration
         mcp_config = {
@@ -75,21 +175,32 @@ class Agent:
         }
         
         # Add server to MCP integration
-        self.mcp_integration.add_server(server_name, mcp_config)
+        await self.mcp_integration.add_server(server_name, mcp_config)
+        self._agent_prompt = None
         
-    def connect(self) -> None:
+    async def connect(self) -> None:
         """
         Connect to all configured MCP servers and discover available tools
         """
+        # Register servers passed to the constructor with a single config write
+        if self._pending_mcp_servers:
+            async with self.mcp_integration.batch_updates():
+                for server_config in self._pending_mcp_servers:
+                    await self._add_stdio_mcp_server(server_config)
+            self._pending_mcp_servers = []
+        
         # Connect to MCP servers
-        self.mcp_integration.connect()
+        await self.mcp_integration.connect()
         
         # Get available servers
-        servers = self.mcp_integration.get_available_servers()
+        servers = await self.mcp_integration.get_available_servers()
+        self._server_set = frozenset(servers)
         
-        # Discover tools from each server
-        for server in servers:
-            tools = self.mcp_integration.get_available_tools(server)
+        # Discover tools from all servers concurrently
+        tool_lists = await asyncio.gather(
+            *(self.mcp_integration.get_available_tools(server) for server in servers)
+        )
+        for server, tools in zip(servers, tool_lists):
             for tool in tools:
                 tool_id = f"{server}:{tool['name']}"
                 self.mcp_tools[tool_id] = {
@@ -98,14 +209,17 @@ class Agent:
                     "description": tool.get("description", "")
                 }
                 
+        self._rebuild_prompt_cache()
         logger.info(f"Connected to {len(servers)} MCP servers with {len(self.mcp_tools)} available tools")
         
-    def disconnect(self) -> None:
+    async def disconnect(self) -> None:
         """
         Disconnect from all MCP servers
         """
-        self.mcp_integration.disconnect()
+        await self.mcp_integration.disconnect()
         self.mcp_tools = {}
+        self._server_set = frozenset()
+        self._agent_prompt = None
         
     def get_available_tools(self) -> Dict[str, Dict[str, str]]:
         """
@@ -147,23 +261,25 @@ class Agent:
             Tool execution result
         """
         # Check if it's a local tool
-        for tool in self.local_tools:
-            if tool.name == tool_id:
-                try:
-                    return await tool.execute(arguments)
-                except Exception as e:
-                    logger.error(f"Error executing local tool {tool_id}: {str(e)}")
-                    return {
-                        "error": f"Error executing tool: {str(e)}",
-                        "isError": True
-                    }
+        tool = self._local_tool_map.get(tool_id)
+        if tool is not None:
+            try:
+                if tool.is_sync_fast:
+                    return tool.execute_sync(arguments)
+                return await tool.execute(arguments)
+            except Exception as e:
+                logger.error(f"Error executing local tool {tool_id}: {str(e)}")
+                return {
+                    "error": f"Error executing tool: {str(e)}",
+                    "isError": True
+                }
         
-        # Check if it's an MCP tool
+        # Check if it's an MCP tool, either discovered or on a connected server
         if ":" in tool_id:
             server_name, tool_name = tool_id.split(":", 1)
-            if server_name in self.mcp_integration.get_available_servers():
+            if tool_id in self.mcp_tools or server_name in self._server_set:
                 try:
-                    return self.mcp_integration.call_tool(server_name, tool_name, arguments)
+                    return await self.mcp_integration.call_tool(server_name, tool_name, arguments)
                 except Exception as e:
                     logger.error(f"Error executing MCP tool {tool_id}: {str(e)}")
                     return {
@@ -176,6 +292,27 @@ class Agent:
             "isError": True
         }
         
+    @staticmethod
+    async def _forward_partials(
+        partials: asyncio.Queue,
+        report: Callable[[str], Awaitable[None]]
+    ) -> None:
+        """
+        Report streamed replies until None is received, skipping to the newest one
+        
+        Args:
+            partials: Queue of replies received so far, ended by None
+            report: Coroutine function receiving the newest reply
+        """
+        while True:
+            partial = await partials.get()
+            # Skip to the newest reply if the UI fell behind
+            while partial is not None and not partials.empty():
+                partial = partials.get_nowait()
+            if partial is None:
+                return
+            await report(partial)
+    
     async def process(self, input_text: str, callback: Optional[Callable[[str], Awaitable[None]]] = None) -> str:
         """
         Process input text using AI model and available tools
@@ -187,12 +324,6 @@ class Agent:
         Returns:
             Agent response
         """
-        from api_providers.provider_factory import ProviderFactory
-        from prompts import PromptTemplate
-        import os
-        import json
-        import time
-        
         try:
             # Get provider information from the connected text processor
             # This assumes SpeechAgent has already set up a text_processor attribute
@@ -203,45 +334,10 @@ class Agent:
             
             provider = self.text_processor.provider
             
-            # Get available tools for the agent
-            tools = self.get_available_tools()
-            
-            # Format tools for inclusion in the prompt
-            tools_description = ""
-            for tool_id, tool_info in tools.items():
-                tool_type = tool_info.get("type", "unknown")
-                server = tool_info.get("server", "local") if tool_type == "mcp" else "local"
-                tools_description += f"- {tool_info['name']} ({server}): {tool_info['description']}\n"
-            
-            # Create a special prompt for the agent
-            agent_prompt = PromptTemplate(
-                name="agent_prompt",
-                description="AI Agent with tool access",
-                system_prompt=f"""You are {self.name}, an AI assistant with access to various tools.
-
-SYSTEM INSTRUCTIONS:
-{self.system}
-
-AVAILABLE TOOLS:
-{tools_description}
-
-To use a tool, respond with JSON in the following format:
-```json
-{{
-  "tool": "tool_name",
-  "args": {{
-    "arg1": "value1",
-    "arg2": "value2"
-  }}
-}}
-```
-
-If you don't need to use a tool, simply respond with normal text.
-"""
-            )
+            # Reuse the prompt built for the current tool set
+            agent_prompt = self._get_agent_prompt()
             
             # Process the input using the text processor
-            current_response = ""
             message_history = [
                 {"role": "system", "content": agent_prompt.system_prompt},
                 {"role": "user", "content": input_text}
@@ -253,9 +349,11 @@ If you don't need to use a tool, simply respond with normal text.
                 model = self.chat_model
             
             # Start with a simple response
-            raw_response = self.text_processor.process_text(
-                text=input_text,
-                prompt_template=agent_prompt,
+            # Run the blocking provider call in a worker thread so the event loop stays responsive
+            raw_response = await asyncio.to_thread(
+                self.text_processor.process_text,
+                input_text,
+                agent_prompt,
                 model=model
             )
             
@@ -267,17 +365,7 @@ If you don't need to use a tool, simply respond with normal text.
                 return error_msg
             
             # Check if the response contains a tool call (JSON format)
-            tool_call = None
-            try:
-                # Look for JSON block in the response
-                if "```json" in raw_response:
-                    json_part = raw_response.split("```json")[1].split("```")[0].strip()
-                    tool_call = json.loads(json_part)
-                elif raw_response.strip().startswith("{") and raw_response.strip().endswith("}"):
-                    tool_call = json.loads(raw_response.strip())
-            except (json.JSONDecodeError, IndexError):
-                # Not a tool call, just a regular response
-                tool_call = None
+            tool_call = _parse_tool_call(raw_response)
             
             # If it's a tool call, execute it and send result back to AI
             if tool_call and "tool" in tool_call and "args" in tool_call:
@@ -308,14 +396,27 @@ If you don't need to use a tool, simply respond with normal text.
                     "content": result_content
                 })
                 
-                # Get AI response to the tool result
-                final_response = self.text_processor.process_text(
-                    text=result_content,
-                    prompt_template=agent_prompt,
-                    model=model
-                )
+                # Get AI response to the tool result with the whole exchange as context
+                process_args = {"model": model, "messages": message_history}
+                if callback:
+                    # Stream the reply; the UI only renders the newest text it has not caught up with
+                    partials: asyncio.Queue = asyncio.Queue()
+                    loop = asyncio.get_running_loop()
+                    process_args["on_chunk"] = lambda partial: loop.call_soon_threadsafe(partials.put_nowait, partial)
+                    forward_task = asyncio.create_task(self._forward_partials(partials, callback))
+                try:
+                    final_response = await asyncio.to_thread(
+                        self.text_processor.process_text,
+                        result_content,
+                        agent_prompt,
+                        **process_args
+                    )
+                finally:
+                    if callback:
+                        partials.put_nowait(None)
+                        await forward_task
                 
-                # Stream the final response if callback provided
+                # Send the complete response if callback provided
                 if callback:
                     await callback(final_response)
                 
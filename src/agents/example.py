@@ -50,7 +50,7 @@ async def main():
     )
     
     # Connect to all MCP servers
-    agent.connect()
+    await agent.connect()
     
     try:
         # List all available tools
@@ -74,7 +74,7 @@ async def main():
         
     finally:
         # Disconnect from MCP servers
-        agent.disconnect()
+        await agent.disconnect()
 
 # Run the example asynchronously
 if __name__ == "__main__":
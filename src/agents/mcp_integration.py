@@ -1,26 +1,91 @@
+import asyncio
 import json
 import os
-from typing import Dict, List, Optional, Any, Union
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Any, Union
 
-from mcp_client import get_mcp_client, run_async
+from mcp_client import get_mcp_client
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 class MCPServerIntegration:
     """
     Integration class for MCP servers.
     Provides an easy way to add and use MCP servers in the project.
     """
-    def __init__(self, config_path: str = "mcp_config.json"):
+    def __init__(
+        self,
+        config_path: str = "mcp_config.json",
+        max_inflight: int = 8,
+        heartbeat_interval: Optional[float] = 30.0
+    ):
         """
         Initialize MCP server integration
         
         Args:
             config_path: Path to the MCP configuration file
+            max_inflight: Maximum number of concurrent tool calls per server
+            heartbeat_interval: Seconds between server health checks, None to disable
         """
         self.config_path = config_path
         self.mcp_client = get_mcp_client(config_path)
         self.connected = False
+        # Number of callers currently sharing the pooled connections
+        self._refcount = 0
+        # Parsed configuration, written back only when it has pending changes
+        self._config_cache = None
+        self._config_mtime = None
+        self._dirty = False
+        self._batch_depth = 0
+        # Per-server limits on concurrent tool calls, created on first use
+        self._max_inflight = max_inflight
+        self._server_semaphores: Dict[str, asyncio.Semaphore] = {}
+        # Background task pinging servers and restarting dead ones
+        self._heartbeat_interval = heartbeat_interval
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        
+    def _load_config_sync(self) -> Dict[str, Any]:
+        """
+        Get the parsed configuration, re-reading the file only if it changed on disk
+        
+        Returns:
+            Configuration dictionary
+        """
+        mtime = os.path.getmtime(self.config_path) if os.path.exists(self.config_path) else None
+        if self._config_cache is None or (mtime != self._config_mtime and not self._dirty):
+            if mtime is not None:
+                with open(self.config_path, 'r') as f:
+                    self._config_cache = json.load(f)
+            else:
+                self._config_cache = {"mcpServers": {}}
+            self._config_mtime = mtime
+        return self._config_cache
+    
+    def _write_config_sync(self, config: Dict[str, Any]) -> None:
+        """
+        Write the configuration to disk and reload it in the client
+        
+        Args:
+            config: Configuration dictionary
+        """
+        with open(self.config_path, 'w') as f:
+            json.dump(config, f, indent=2)
+        self._config_mtime = os.path.getmtime(self.config_path)
         
-    def add_server(self, server_name: str, server_config: Dict[str, Any]) -> None:
+        # Reload the configuration in the client
+        self.mcp_client.load_config()
+    
+    async def _load_config_cache(self) -> Dict[str, Any]:
+        """
+        Get the parsed configuration without blocking the event loop
+        
+        Returns:
+            Configuration dictionary
+        """
+        return await asyncio.to_thread(self._load_config_sync)
+    
+    async def add_server(self, server_name: str, server_config: Dict[str, Any]) -> None:
         """
         Add a new MCP server to the configuration
         
@@ -31,24 +96,15 @@ class MCPServerIntegration:
                 - args: List of arguments
                 - env: Optional environment variables
         """
-        # Load current configuration
-        if os.path.exists(self.config_path):
-            with open(self.config_path, 'r') as f:
-                config = json.load(f)
-        else:
-            config = {"mcpServers": {}}
-            
         # Add or update server configuration
-        config["mcpServers"][server_name] = server_config
+        config = await self._load_config_cache()
+        config.setdefault("mcpServers", {})[server_name] = server_config
+        self._dirty = True
         
-        # Save updated configuration
-        with open(self.config_path, 'w') as f:
-            json.dump(config, f, indent=2)
-            
-        # Reload the configuration in the client
-        self.mcp_client.load_config()
+        if not self._batch_depth:
+            await self.flush()
     
-    def remove_server(self, server_name: str) -> bool:
+    async def remove_server(self, server_name: str) -> bool:
         """
         Remove an MCP server from the configuration
         
@@ -58,34 +114,123 @@ class MCPServerIntegration:
         Returns:
             True if server was removed, False if not found
         """
-        if os.path.exists(self.config_path):
-            with open(self.config_path, 'r') as f:
-                config = json.load(f)
-                
-            if server_name in config.get("mcpServers", {}):
-                del config["mcpServers"][server_name]
-                
-                with open(self.config_path, 'w') as f:
-                    json.dump(config, f, indent=2)
-                    
-                # Reload the configuration in the client
-                self.mcp_client.load_config()
-                return True
-                
-        return False
-    
-    def connect(self) -> None:
-        """Connect to all configured MCP servers"""
-        run_async(self.mcp_client.connect_to_servers())
-        self.connected = True
+        config = await self._load_config_cache()
+        if server_name not in config.get("mcpServers", {}):
+            return False
+        
+        del config["mcpServers"][server_name]
+        self._dirty = True
+        
+        if not self._batch_depth:
+            await self.flush()
+        return True
+    
+    async def flush(self) -> None:
+        """Write pending configuration changes to disk and reload them in the client"""
+        if not self._dirty:
+            return
+        
+        await asyncio.to_thread(self._write_config_sync, self._config_cache)
+        self._dirty = False
     
-    def disconnect(self) -> None:
-        """Disconnect from all MCP servers"""
+    @asynccontextmanager
+    async def batch_updates(self) -> AsyncIterator["MCPServerIntegration"]:
+        """
+        Collect several add_server/remove_server calls into a single write
+        
+        Yields:
+            This integration instance
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                await self.flush()
+    
+    def get_configured_servers(self) -> List[str]:
+        """
+        Get a list of configured MCP servers, connected or not
+        
+        Returns:
+            List of server names
+        """
+        # The cache also holds servers added in a batch that is not flushed yet
+        if self._config_cache is not None:
+            return list(self._config_cache.get("mcpServers", {}).keys())
+        return list(self.mcp_client.servers.keys())
+    
+    async def connect(self) -> None:
+        """Connect to all configured MCP servers, reusing pooled connections"""
+        # Live sessions with an unchanged configuration are kept by the client
+        await self.mcp_client.connect_to_servers()
+        self._refcount += 1
         if self.connected:
-            run_async(self.mcp_client.close())
-            self.connected = False
+            logger.info(f"pooled connection reused refcount={self._refcount}")
+        self.connected = True
+        
+        if self._heartbeat_interval and (self._heartbeat_task is None or self._heartbeat_task.done()):
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+    
+    async def _is_alive(self, server_name: str) -> bool:
+        """
+        Check whether the connection to a server is still open
+        
+        Args:
+            server_name: Name of the server
+            
+        Returns:
+            False only if the transport to the server is closed or broken
+        """
+        try:
+            return await asyncio.wait_for(self.mcp_client.ping(server_name), timeout=2.0)
+        except asyncio.TimeoutError:
+            # A busy server answers slowly; restarting it would abort its running tool calls
+            logger.warning(f"MCP server {server_name} did not answer the ping in time")
+            return True
     
-    def get_available_servers(self) -> List[str]:
+    async def _reconnect(self, server_name: str) -> bool:
+        """
+        Restart the connection to a server whose transport is gone
+        
+        Args:
+            server_name: Name of the server
+            
+        Returns:
+            True if the server was reconnected
+        """
+        logger.warning(f"MCP server {server_name} connection lost, reconnecting")
+        return await self.mcp_client.reconnect(server_name)
+    
+    async def _heartbeat_loop(self) -> None:
+        """Periodically check all connected servers while the integration is connected"""
+        while self.connected:
+            await asyncio.sleep(self._heartbeat_interval)
+            for server_name in list(self.mcp_client.sessions):
+                if not await self._is_alive(server_name):
+                    await self._reconnect(server_name)
+    
+    async def disconnect(self) -> None:
+        """Release the pooled connections, closing them when no caller uses them anymore"""
+        if not self.connected:
+            return
+        
+        self._refcount -= 1
+        if self._refcount > 0:
+            logger.info(f"pooled connection released refcount={self._refcount}")
+            return
+        
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        
+        await self.mcp_client.close()
+        self._refcount = 0
+        self._server_semaphores = {}
+        self.connected = False
+    
+    async def get_available_servers(self) -> List[str]:
         """
         Get a list of available MCP servers
         
@@ -95,9 +240,9 @@ class MCPServerIntegration:
         if not self.connected:
             return []
             
-        return run_async(self.mcp_client.list_servers())
+        return await self.mcp_client.list_servers()
     
-    def get_available_tools(self, server_name: str) -> List[Dict[str, Any]]:
+    async def get_available_tools(self, server_name: str) -> List[Dict[str, Any]]:
         """
         Get available tools from a specific server
         
@@ -110,9 +255,9 @@ class MCPServerIntegration:
         if not self.connected:
             return []
             
-        return run_async(self.mcp_client.list_tools(server_name))
+        return await self.mcp_client.list_tools(server_name)
     
-    def call_tool(self, server_name: str, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    async def call_tool(self, server_name: str, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """
         Call a tool on an MCP server
         
@@ -126,8 +271,18 @@ class MCPServerIntegration:
         """
         if not self.connected:
             return {"error": "Not connected to MCP servers", "isError": True}
+        
+        semaphore = self._server_semaphores.get(server_name)
+        if semaphore is None:
+            semaphore = self._server_semaphores[server_name] = asyncio.Semaphore(self._max_inflight)
+            
+        async with semaphore:
+            result = await self.mcp_client.call_tool(server_name, tool_name, arguments)
             
-        return run_async(self.mcp_client.call_tool(server_name, tool_name, arguments))
+            # Retry only calls that never reached the server, so a tool never runs twice
+            if result.get("delivered") is False and await self._reconnect(server_name):
+                result = await self.mcp_client.call_tool(server_name, tool_name, arguments)
+            return result
 
 
 # Singleton instance
@@ -3,10 +3,9 @@ Speech Agent - Integrates speech-to-text functionality with AI agents using MCP
 """
 from typing import Dict, List, Any, Optional, Callable, Awaitable
 import asyncio
-import tempfile
-import os
 
 from agents.agent import Agent, Tool
+from prompts import PromptTemplate
 from speech_to_text import AudioTranscriber
 from text_processors import TextProcessor
 from utils.logger import get_logger
@@ -31,22 +30,34 @@ class TranscriptionTool(Tool):
         Args:
             args: Dictionary containing:
                 - file_path: Path to the audio file
+                - audio_bytes: Audio data as bytes, used instead of file_path
+                - filename: Optional original file name for audio_bytes
                 - model: Optional transcription model
                 
         Returns:
             Dictionary with transcription result
         """
         file_path = args.get("file_path", "")
+        audio_bytes = args.get("audio_bytes")
         model = args.get("model", self.default_model)
         
-        if not file_path:
+        if not file_path and not audio_bytes:
             return {
                 "error": "No file path provided",
                 "isError": True
             }
             
         try:
-            text, success = self.transcriber.transcribe_file(file_path, model)
+            # Run the blocking provider call in a worker thread so other tasks can progress
+            if audio_bytes:
+                text, success = await asyncio.to_thread(
+                    self.transcriber.transcribe_bytes,
+                    audio_bytes, model, args.get("filename", "audio.wav")
+                )
+            else:
+                text, success = await asyncio.to_thread(
+                    self.transcriber.transcribe_file, file_path, model
+                )
             
             if success:
                 return {
@@ -86,6 +97,7 @@ class TextProcessingTool(Tool):
                 - text: Text to process
                 - system_prompt: System prompt for the AI
                 - model: Optional model name
+                - on_chunk: Optional callable receiving the reply so far while it streams
                 
         Returns:
             Dictionary with processed text result
@@ -93,6 +105,7 @@ class TextProcessingTool(Tool):
         text = args.get("text", "")
         system_prompt = args.get("system_prompt", "")
         model = args.get("model", self.default_model)
+        on_chunk = args.get("on_chunk")
         
         if not text:
             return {
@@ -107,19 +120,14 @@ class TextProcessingTool(Tool):
             }
             
         try:
-            from src.prompts import PromptTemplate
-            
-            # Create a custom prompt template
             prompt = PromptTemplate(
                 name="Custom",
                 description="Custom prompt",
                 system_prompt=system_prompt
             )
-            
-            processed_text = self.text_processor.process_text(
-                text,
-                prompt,
-                model=model
+            # Identical concurrent requests are coalesced by the provider
+            processed_text = await asyncio.to_thread(
+                self.text_processor.process_text, text, prompt, model=model, on_chunk=on_chunk
             )
             
             return {
@@ -149,7 +157,8 @@ class SpeechAgent(Agent):
         transcription_model: str,
         chat_model: str,
         mcp_servers: List[Dict[str, Any]] = None,
-        mcp_config_path: str = "mcp_config.json"
+        mcp_config_path: str = "mcp_config.json",
+        transcription_options: Optional[Dict[str, Any]] = None
     ):
         """
         Initialize Speech Agent
@@ -163,9 +172,10 @@ class SpeechAgent(Agent):
             chat_model: Default chat model
             mcp_servers: List of MCP server configurations to add
             mcp_config_path: Path to MCP configuration file
+            transcription_options: Extra transcription provider arguments, e.g. the OpenAI and Groq keys for 'openrouter'
         """
         # Initialize speech-to-text components
-        self.transcriber = AudioTranscriber(provider=provider, api_key=api_key)
+        self.transcriber = AudioTranscriber(provider=provider, api_key=api_key, **(transcription_options or {}))
         self.text_processor = TextProcessor(provider=provider, api_key=api_key)
         
         # Create local tools
@@ -204,19 +214,17 @@ class SpeechAgent(Agent):
         Returns:
             Dictionary with original and processed text
         """
-        tmp_file_path = ""
+        # Warm up the chat connection while the audio is being transcribed
+        prewarm_task = asyncio.create_task(
+            asyncio.to_thread(self.text_processor.prewarm, chat_model)
+        )
         try:
-            # Save audio to a temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-                tmp_file.write(audio_bytes)
-                tmp_file_path = tmp_file.name
-            
-            # Transcribe the audio
+            # Transcribe the audio straight from memory
             if callback:
                 await callback("status", "Transcribing audio...", "")
                 
             transcription_result = await self.execute_tool("transcribe", {
-                "file_path": tmp_file_path,
+                "audio_bytes": audio_bytes,
                 "model": transcription_model
             })
             
@@ -233,12 +241,28 @@ class SpeechAgent(Agent):
                 await callback("transcription", original_text, "")
                 await callback("status", "Processing text...", "")
             
-            # Process the transcribed text
-            processing_result = await self.execute_tool("process_text", {
+            await prewarm_task
+            
+            # Process the transcribed text, passing the streamed reply on as it arrives
+            processing_args = {
                 "text": original_text,
                 "system_prompt": system_prompt,
                 "model": chat_model
-            })
+            }
+            if callback:
+                partials: asyncio.Queue = asyncio.Queue()
+                loop = asyncio.get_running_loop()
+                processing_args["on_chunk"] = lambda partial: loop.call_soon_threadsafe(partials.put_nowait, partial)
+                forward_task = asyncio.create_task(self._forward_partials(
+                    partials, lambda partial: callback("processed_partial", partial, "")
+                ))
+                try:
+                    processing_result = await self.execute_tool("process_text", processing_args)
+                finally:
+                    partials.put_nowait(None)
+                    await forward_task
+            else:
+                processing_result = await self.execute_tool("process_text", processing_args)
             
             if processing_result.get("isError", False):
                 if callback:
@@ -267,9 +291,6 @@ class SpeechAgent(Agent):
             }
             
         finally:
-            # Clean up temporary file
-            if tmp_file_path and os.path.exists(tmp_file_path):
-                try:
-                    os.unlink(tmp_file_path)
-                except Exception as e:
-                    logger.error(f"Error deleting temporary file: {str(e)}")
\ No newline at end of file
+            # Don't leave the warm-up pending when returning early
+            if not prewarm_task.done():
+                prewarm_task.cancel()
\ No newline at end of file
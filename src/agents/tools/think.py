@@ -7,6 +7,8 @@ class ThinkTool(Tool):
     This is a local tool that doesn't require external API calls.
     """
     
+    is_sync_fast = True
+    
     def __init__(self):
         super().__init__(
             name="think",
@@ -17,6 +19,18 @@ class ThinkTool(Tool):
         """
         Execute the thinking process.
         
+        Args:
+            args: Dictionary containing the 'thought' key
+            
+        Returns:
+            Dictionary with the result of thinking
+        """
+        return self.execute_sync(args)
+        
+    def execute_sync(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute the thinking process without awaiting anything.
+        
         Args:
             args: Dictionary containing the 'thought' key
             
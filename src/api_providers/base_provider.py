@@ -1,6 +1,526 @@
 from abc import ABC, abstractmethod
-from typing import Tuple, Optional, List
+from typing import BinaryIO, Callable, Tuple, Optional, List, Dict, Union
+import asyncio
+import atexit
+import collections
+import functools
+import hashlib
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import importlib.util
+import io
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+import weakref
+import httpx
+import numpy as np
+from openai import DefaultHttpxClient, OpenAI
 from prompts import PromptTemplate
+from utils.audio import merge_transcripts, slice_wav, sniff_audio_format, temporary_audio_file, wav_to_mono_16k
+from utils.logger import get_logger
+from utils.transcript_cache import TranscriptCache, file_sha256, get_transcript_cache
+
+logger = get_logger(__name__)
+
+# HTTP/2 needs the optional h2 package; fall back to HTTP/1.1 keep-alive without it
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Connection pool shared by every provider client, created on first use
+_shared_http_client: Optional[httpx.Client] = None
+_shared_http_client_lock = threading.Lock()
+
+
+def get_shared_http_client() -> httpx.Client:
+    """
+    Get the process-wide HTTP client backing all provider clients
+
+    Keep-alive connections are pooled per host, so transcription and chat
+    requests to the same API reuse warm TLS connections (HTTP/2 when h2 is
+    installed). API keys and base URLs are applied per request by the SDK.
+
+    Returns:
+        Shared httpx client
+    """
+    global _shared_http_client
+    # Providers are built concurrently at startup; only one of them may create the pool
+    with _shared_http_client_lock:
+        if _shared_http_client is None or _shared_http_client.is_closed:
+            _shared_http_client = DefaultHttpxClient(
+                http2=_HTTP2_AVAILABLE,
+                # Keep idle connections longer than httpx's 5 s default so a warmed
+                # connection is still there when the user submits audio or text
+                limits=httpx.Limits(max_connections=128, max_keepalive_connections=64, keepalive_expiry=60.0)
+            )
+        return _shared_http_client
+
+
+# Retries of transient failures (connection errors, 408/409/429 and 5xx) with
+# exponential backoff and jitter, done by the OpenAI SDK; other 4xx fail at once
+MAX_API_RETRIES = 4
+
+
+@functools.lru_cache(maxsize=8)
+def get_openai_client(api_key: str, base_url: Optional[str] = None) -> OpenAI:
+    """
+    Get the shared OpenAI-compatible client for an API key and endpoint
+
+    Args:
+        api_key: API key for the provider
+        base_url: API base URL, or None for the OpenAI default
+
+    Returns:
+        Cached OpenAI client instance using the shared connection pool
+    """
+    return OpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        max_retries=MAX_API_RETRIES,
+        http_client=get_shared_http_client()
+    )
+
+
+def close_provider_clients() -> None:
+    """Close the shared connection pool and forget the cached provider clients"""
+    global _shared_http_client
+    get_openai_client.cache_clear()
+    if _shared_http_client is not None:
+        _shared_http_client.close()
+        _shared_http_client = None
+
+
+atexit.register(close_provider_clients)
+
+
+def strip_provider_prefix(model: str, expected: str, display_name: str) -> Tuple[str, Optional[str]]:
+    """
+    Remove a "provider/" prefix from a model id, rejecting other providers' models
+
+    Args:
+        model: Model id, with or without a provider prefix (e.g. "groq/whisper-large-v3")
+        expected: Provider prefix accepted by the caller, in lower case
+        display_name: Provider name used in the error message
+
+    Returns:
+        Tuple containing (model_name, error_message or None)
+    """
+    provider, sep, base_model = model.partition('/')
+    if not sep:
+        return model, None
+    if provider.lower() == expected:
+        return base_model, None
+    return model, f"Error: Model '{model}' is not a {display_name} model. Please select a {display_name} model."
+
+
+# Model id classifiers, compiled once and matched case-insensitively
+WHISPER_MODEL_RE = re.compile(r'whisper', re.IGNORECASE)
+GPT4O_TRANSCRIBE_RE = re.compile(r'gpt-4o.*transcribe|transcribe.*gpt-4o', re.IGNORECASE)
+OPENAI_CHAT_MODEL_RE = re.compile(r'gpt|o1|o3', re.IGNORECASE)
+
+# How long model lists fetched from the APIs are reused
+MODEL_LIST_TTL_SECONDS = 300
+
+
+# ttl_cache results, keyed by the API client so provider instances sharing a
+# client (e.g. across Streamlit reruns) also share their model lists
+_ttl_cache_store: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _ttl_cache_for(provider) -> dict:
+    """Get the ttl_cache entries shared by all providers using the same client"""
+    owner = getattr(provider, 'client', None) or provider
+    return _ttl_cache_store.setdefault(owner, {})
+
+
+def ttl_cache(seconds: float):
+    """
+    Cache a provider method's result for a limited time
+
+    Results are shared between instances of the same provider class that use
+    the same client.
+
+    Args:
+        seconds: Time to live of a cached result
+
+    Returns:
+        Decorator for provider methods
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache = _ttl_cache_for(self)
+            key = (type(self).__qualname__, method.__name__, args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            entry = cache.get(key)
+            if entry is None or entry[0] <= now:
+                # Concurrent misses, e.g. during parallel provider initialization, share one request
+                result = single_flight(f"ttl:{id(cache)}:{key!r}", lambda: method(self, *args, **kwargs))
+                entry = cache[key] = (now + seconds, result)
+            # Hand out copies so callers can't modify the cached list
+            return list(entry[1]) if isinstance(entry[1], list) else entry[1]
+        return wrapper
+    return decorator
+
+
+def invalidate_ttl_cache(provider) -> None:
+    """
+    Drop all results cached with ttl_cache for a provider, e.g. after a model was not found
+
+    Args:
+        provider: Provider instance
+    """
+    _ttl_cache_for(provider).clear()
+
+
+# Requests currently being sent, keyed by a digest of their content
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def single_flight(key: str, call: Callable):
+    """
+    Run a call once per key at a time; concurrent callers with the same key share its result
+
+    Streamlit reruns the script in a new thread on every widget change, so the
+    same upload or prompt can be sent again while the first request is still
+    waiting for its response.
+
+    Args:
+        key: Digest identifying the request
+        call: Function sending the request
+
+    Returns:
+        Result of call, or of the identical call already in flight
+    """
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+    if not leader:
+        return future.result()
+
+    try:
+        result = call()
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+
+
+def cache_transcripts(method):
+    """
+    Serve repeated transcriptions of the same audio from the disk transcript cache
+
+    Wraps transcribe_file and transcribe_bytes; the audio is identified by the
+    hash of its contents, so renamed or re-uploaded files still hit the cache.
+    Only successful transcriptions are stored, and identical transcriptions
+    already in flight are awaited instead of uploaded again.
+
+    Args:
+        method: Provider method taking (file_path or audio_bytes, model, ...)
+
+    Returns:
+        Wrapped provider method
+    """
+    @functools.wraps(method)
+    def wrapper(self, source, model: str, *args, **kwargs):
+        try:
+            digest = hashlib.sha256(source).hexdigest() if isinstance(source, bytes) else file_sha256(source)
+        except OSError:
+            return method(self, source, model, *args, **kwargs)
+
+        key = TranscriptCache.make_key(digest, type(self).__name__, model)
+        cache = get_transcript_cache()
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached, True
+
+        def transcribe() -> Tuple[str, bool]:
+            text, success = method(self, source, model, *args, **kwargs)
+            if success and cache is not None:
+                cache.put(key, text)
+            return text, success
+
+        return single_flight(key, transcribe)
+    return wrapper
+
+
+def coalesce_requests(method):
+    """
+    Send identical concurrent process_text calls to the API only once
+
+    Args:
+        method: Provider process_text method
+
+    Returns:
+        Wrapped provider method
+    """
+    @functools.wraps(method)
+    def wrapper(self, text: str, prompt_template: PromptTemplate, model: str = None, temperature: float = 0.2, messages: Optional[List[Dict[str, str]]] = None, on_chunk: Optional[Callable[[str], None]] = None):
+        body = json.dumps(
+            [type(self).__name__, model, temperature, messages or [prompt_template.system_prompt, text]],
+            sort_keys=True
+        )
+        key = hashlib.blake2b(body.encode()).hexdigest()
+        # Callers joining an in-flight request get the full reply once it is complete
+        return single_flight(key, lambda: method(self, text, prompt_template, model, temperature, messages, on_chunk))
+    return wrapper
+
+
+class RateLimiter:
+    """Token bucket spacing out requests to stay under a per-minute limit"""
+
+    def __init__(self, requests_per_minute: int, burst: Optional[int] = None):
+        """
+        Initialize the limiter with a full bucket
+
+        Args:
+            requests_per_minute: Sustained request rate
+            burst: Requests allowed back to back before spacing starts (defaults to a sixth of the rate)
+        """
+        self.interval = 60.0 / requests_per_minute
+        self.capacity = float(burst or max(1, requests_per_minute // 6))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        # A thread lock, because requests are sent from Streamlit script threads,
+        # slice upload workers and asyncio.to_thread workers alike
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take a token from the bucket
+
+        Returns:
+            Seconds to wait before sending the request
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) / self.interval)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens * self.interval)
+
+    def wait(self) -> None:
+        """Block the calling thread until a request may be sent"""
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+
+def _get_rate_limiter(provider) -> Optional[RateLimiter]:
+    """
+    Get the rate limiter of a provider instance, created on first use
+
+    Args:
+        provider: Provider with a requests_per_minute class attribute
+
+    Returns:
+        RateLimiter, or None if the provider has no per-minute limit
+    """
+    if not provider.requests_per_minute:
+        return None
+    limiter = provider.__dict__.get('_rate_limiter')
+    if limiter is None:
+        limiter = provider.__dict__.setdefault('_rate_limiter', RateLimiter(provider.requests_per_minute))
+    return limiter
+
+
+_MODEL_TOKEN_SPLIT_RE = re.compile(r'[-/:.]')
+
+
+class ModelIndex:
+    """Case-insensitive lookup table over a provider's model ids"""
+
+    def __init__(self, models: List[str]):
+        """
+        Index a list of model ids
+
+        Args:
+            models: Model ids in the provider's order
+        """
+        self.models = list(models)
+        self.by_name: Dict[str, str] = {}
+        self.by_token: Dict[str, List[str]] = collections.defaultdict(list)
+        for model in self.models:
+            lowered = model.lower()
+            self.by_name.setdefault(lowered, model)
+            self.by_token[_MODEL_TOKEN_SPLIT_RE.split(lowered, 1)[0]].append(model)
+
+    def find(self, model: str) -> Optional[str]:
+        """
+        Look up a model id regardless of case
+
+        Args:
+            model: Requested model id
+
+        Returns:
+            Model id as spelled by the provider, or None if unknown
+        """
+        return self.by_name.get(model.lower())
+
+    def closest(self, model: str) -> Optional[str]:
+        """
+        Find the first model whose id contains the requested one
+
+        Models sharing the first name token (e.g. "llama") are searched before the rest.
+
+        Args:
+            model: Requested model id
+
+        Returns:
+            Matching model id or None
+        """
+        lowered = model.lower()
+        candidates = self.by_token.get(_MODEL_TOKEN_SPLIT_RE.split(lowered, 1)[0], [])
+        for candidates in (candidates, self.models):
+            match = next((m for m in candidates if lowered in m.lower()), None)
+            if match:
+                return match
+        return None
+
+    def with_prefix(self, provider: str) -> List[str]:
+        """
+        List the models of one provider on a routing API (e.g. "openai/gpt-4o")
+
+        Args:
+            provider: Provider prefix without the slash
+
+        Returns:
+            Model ids starting with "provider/"
+        """
+        prefix = provider.lower() + '/'
+        candidates = self.by_token.get(_MODEL_TOKEN_SPLIT_RE.split(prefix, 1)[0], [])
+        return [m for m in candidates if m.lower().startswith(prefix)]
+
+
+# Compressed formats the transcription APIs accept as-is; anything else is
+# decoded and re-encoded as 16 kHz mono WAV before upload
+DIRECT_UPLOAD_FORMATS = frozenset({"flac", "m4a", "mp3", "mp4", "mpeg", "mpga", "oga", "ogg", "webm"})
+
+
+def audio_format_from_name(filename: str) -> Optional[str]:
+    """
+    Derive the pydub/ffmpeg format name from a file name
+
+    Args:
+        filename: File name such as "recording.m4a"
+
+    Returns:
+        Format name without the dot, or None to let ffmpeg probe the data
+    """
+    ext = os.path.splitext(filename)[1].lstrip('.').lower()
+    return ext or None
+
+
+# Extensions naming the same container as the format sniff_audio_format reports
+_FORMAT_ALIASES = {"mp4": "m4a", "mpeg": "mp3", "mpga": "mp3", "oga": "ogg"}
+
+
+def detect_audio_format(header: bytes, filename: str) -> Tuple[Optional[str], bool]:
+    """
+    Determine the audio format from the data, falling back to the file name
+
+    Recordings and temp files often carry a generic ".wav" name whatever their
+    content, so the magic bytes win when they disagree with the extension.
+
+    Args:
+        header: First bytes of the audio data (12 are enough)
+        filename: File name or path of the audio
+
+    Returns:
+        Tuple containing (format name or None, whether the file name's extension matches it)
+    """
+    named = audio_format_from_name(filename)
+    sniffed = sniff_audio_format(header)
+    if sniffed is None or _FORMAT_ALIASES.get(named, named) == sniffed:
+        return named, True
+    return sniffed, False
+
+
+def _transcode_to_wav(source: Union[str, bytes], audio_format: Optional[str] = None) -> bytes:
+    """
+    Decode audio with pydub/ffmpeg and re-encode it as 16-bit 16 kHz mono WAV
+
+    Runs in a worker process, so it takes and returns plain picklable data.
+
+    Args:
+        source: Path to the audio file or the audio data as bytes
+        audio_format: Format name passed to ffmpeg, or None to probe the data
+
+    Returns:
+        WAV file contents
+    """
+    # pydub is only needed for formats NumPy can't handle, so import it on first use
+    from pydub import AudioSegment
+
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    audio = AudioSegment.from_file(source, format=audio_format)
+    buffer = io.BytesIO()
+    audio.set_frame_rate(16000).set_channels(1).set_sample_width(2).export(buffer, format='wav')
+    return buffer.getvalue()
+
+
+# Worker processes for pydub decoding, created on first use
+_audio_pool: Optional[ProcessPoolExecutor] = None
+_audio_pool_lock = threading.Lock()
+
+
+def transcode_to_wav_buffer(source: Union[str, bytes], audio_format: Optional[str] = None) -> io.BytesIO:
+    """
+    Transcode audio to 16 kHz mono WAV in a worker process
+
+    Decoding is CPU-bound and partly holds the GIL, so concurrent uploads are
+    decoded on separate cores. Falls back to the calling thread if the pool
+    cannot be used.
+
+    Args:
+        source: Path to the audio file or the audio data as bytes
+        audio_format: Format name passed to ffmpeg, or None to probe the data
+
+    Returns:
+        BytesIO positioned at the start and named "audio.wav"
+    """
+    global _audio_pool
+    # Script threads transcode concurrently; only one of them may create the pool
+    with _audio_pool_lock:
+        try:
+            if _audio_pool is None:
+                # Spawn rather than fork: forking the multi-threaded server can copy held locks into the child
+                _audio_pool = ProcessPoolExecutor(
+                    max_workers=min(4, os.cpu_count() or 1),
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            pool = _audio_pool
+            future = pool.submit(_transcode_to_wav, source, audio_format)
+        except (BrokenProcessPool, OSError, RuntimeError):
+            # No usable worker processes (e.g. restricted sandbox or interpreter shutdown)
+            _audio_pool = None
+            future = None
+
+    try:
+        wav_bytes = future.result() if future else _transcode_to_wav(source, audio_format)
+    except BrokenProcessPool:
+        with _audio_pool_lock:
+            # Another thread may already have replaced the broken pool
+            if _audio_pool is pool:
+                _audio_pool = None
+        wav_bytes = _transcode_to_wav(source, audio_format)
+
+    buffer = io.BytesIO(wav_bytes)
+    buffer.name = "audio.wav"
+    return buffer
+
 
 class APIError(Exception):
     def __init__(self, message: str, provider: str, error_type: str):
@@ -25,6 +545,153 @@ class BaseProvider:
 class BaseAudioProvider(ABC):
     """Abstract base class for audio transcription providers"""
 
+    # Maximum number of uploads transcribe_files runs at the same time
+    max_concurrency: int = 8
+    # Upload rate the async methods stay under (None disables rate limiting)
+    requests_per_minute: Optional[int] = None
+    # Long decoded audio is transcribed in parallel slices of this length (None disables slicing)
+    slice_duration_sec: Optional[float] = 30.0
+    slice_overlap_sec: float = 1.0
+    # Request verbose_json and warn on low-confidence segments; plain text otherwise
+    want_segment_stats: bool = False
+
+    @staticmethod
+    def segment_stats(transcription) -> Tuple[float, float]:
+        """
+        Average the confidence statistics of a verbose transcription's segments
+
+        Args:
+            transcription: verbose_json transcription result with segments
+
+        Returns:
+            Tuple containing (avg_logprob, no_speech_prob), or (0.0, 0.0) without segments
+        """
+        segments = transcription.segments or []
+        if not segments:
+            return 0.0, 0.0
+
+        stats = np.fromiter(
+            ((segment.avg_logprob, segment.no_speech_prob) for segment in segments),
+            dtype=np.dtype((np.float64, 2)),
+            count=len(segments)
+        )
+        avg_logprob, no_speech_prob = stats.mean(axis=0)
+        return float(avg_logprob), float(no_speech_prob)
+
+    def warn_on_segment_stats(self, transcription) -> None:
+        """
+        Print warnings when the segment statistics of a verbose transcription look unreliable
+
+        Args:
+            transcription: verbose_json transcription result with segments
+        """
+        avg_logprob, no_speech_prob = self.segment_stats(transcription)
+
+        if avg_logprob < -0.5:
+            logger.warning("Low average log probability. Possible transcription issues.")
+        if no_speech_prob > 0.5:
+            logger.warning("High probability of no speech detected. Possible silence or noise in audio.")
+
+    def prepare_file_upload(self, file_path: str) -> BinaryIO:
+        """
+        Open an audio file for upload, transcoding it in memory only if needed
+
+        Args:
+            file_path: Path to the audio file
+
+        Returns:
+            Readable binary file object; the caller closes it
+        """
+        with open(file_path, 'rb') as f:
+            header = f.read(12)
+        audio_format, name_matches = detect_audio_format(header, file_path)
+
+        if audio_format in DIRECT_UPLOAD_FORMATS:
+            if name_matches:
+                return open(file_path, 'rb')
+            # The API picks the decoder from the file name, so fix a misleading extension
+            with open(file_path, 'rb') as f:
+                buffer = io.BytesIO(f.read())
+            buffer.name = f"audio.{audio_format}"
+            return buffer
+
+        # Integer PCM WAV is resampled in-process; other formats go through pydub
+        if audio_format == 'wav':
+            buffer = wav_to_mono_16k(file_path)
+            if buffer is not None:
+                return buffer
+
+        return transcode_to_wav_buffer(file_path, None if name_matches else audio_format)
+
+    def prepare_bytes_upload(self, audio_bytes: bytes, filename: str = "audio.wav") -> BinaryIO:
+        """
+        Wrap in-memory audio for upload, transcoding it only if needed
+
+        Args:
+            audio_bytes: Audio data as bytes
+            filename: Original file name, used to detect the audio format if the data doesn't tell
+
+        Returns:
+            Readable in-memory file object
+        """
+        audio_format, name_matches = detect_audio_format(audio_bytes[:12], filename)
+        if audio_format in DIRECT_UPLOAD_FORMATS:
+            buffer = io.BytesIO(audio_bytes)
+            buffer.name = os.path.basename(filename) if name_matches else f"audio.{audio_format}"
+            return buffer
+
+        if audio_format == 'wav':
+            buffer = wav_to_mono_16k(io.BytesIO(audio_bytes))
+            if buffer is not None:
+                return buffer
+
+        return transcode_to_wav_buffer(audio_bytes, audio_format)
+
+    def upload_in_slices(self, audio_file: BinaryIO, upload: Callable[[BinaryIO], Tuple[str, bool]], on_partial: Optional[Callable[[str], None]] = None) -> Tuple[str, bool]:
+        """
+        Upload prepared audio, transcribing long WAV audio as parallel overlapping slices
+
+        Only audio decoded by prepare_*_upload is sliced; files uploaded
+        unchanged are sent as a whole.
+
+        Args:
+            audio_file: Audio returned by prepare_file_upload or prepare_bytes_upload
+            upload: Function transcribing a single file object
+            on_partial: Called with the merged transcript so far each time the next slice in order completes (optional)
+
+        Returns:
+            Tuple containing (transcription_text, success_flag)
+        """
+        # Every API request takes exactly one rate limiter token, whether sliced or not
+        limiter = _get_rate_limiter(self)
+        if limiter:
+            send = upload
+
+            def upload(audio_slice: BinaryIO) -> Tuple[str, bool]:
+                limiter.wait()
+                return send(audio_slice)
+
+        if not self.slice_duration_sec or not isinstance(audio_file, io.BytesIO) or audio_file.name != "audio.wav":
+            return upload(audio_file)
+
+        slices = slice_wav(audio_file, self.slice_duration_sec, self.slice_overlap_sec)
+        if len(slices) == 1:
+            return upload(slices[0])
+
+        texts = []
+        with ThreadPoolExecutor(max_workers=min(len(slices), self.max_concurrency)) as pool:
+            futures = [pool.submit(upload, audio_slice) for audio_slice in slices]
+            for future in futures:
+                text, success = future.result()
+                if not success:
+                    for pending in futures:
+                        pending.cancel()
+                    return text, False
+                texts.append(text)
+                if on_partial:
+                    on_partial(merge_transcripts(texts))
+        return merge_transcripts(texts), True
+
     @abstractmethod
     def transcribe_file(self, file_path: str, model: str) -> Tuple[str, bool]:
         """
@@ -39,6 +706,82 @@ class BaseAudioProvider(ABC):
         """
         pass
 
+    def transcribe_bytes(self, audio_bytes: bytes, model: str, filename: str = "audio.wav", on_partial: Optional[Callable[[str], None]] = None) -> Tuple[str, bool]:
+        """
+        Transcribe audio held in memory
+
+        The default implementation spills to a temporary file; providers that
+        can upload from memory override it.
+
+        Args:
+            audio_bytes: Audio data as bytes
+            model: Model to use for transcription
+            filename: Original file name, used to detect the audio format
+            on_partial: Called with the transcript so far as slices of long audio complete (optional)
+
+        Returns:
+            Tuple containing (transcription_text, success_flag)
+        """
+        suffix = os.path.splitext(filename)[1] or '.wav'
+        with temporary_audio_file(audio_bytes, suffix) as tmp_path:
+            return self.transcribe_file(tmp_path, model)
+
+    async def transcribe_file_async(self, file_path: str, model: str) -> Tuple[str, bool]:
+        """
+        Transcribe an audio file without blocking the event loop
+
+        Args:
+            file_path: Path to the audio file
+            model: Model to use for transcription
+
+        Returns:
+            Tuple containing (transcription_text, success_flag)
+        """
+        # Rate limiting happens per upload inside upload_in_slices
+        return await asyncio.to_thread(self.transcribe_file, file_path, model)
+
+    async def transcribe_bytes_async(self, audio_bytes: bytes, model: str, filename: str = "audio.wav") -> Tuple[str, bool]:
+        """
+        Transcribe in-memory audio without blocking the event loop
+
+        Args:
+            audio_bytes: Audio data as bytes
+            model: Model to use for transcription
+            filename: Original file name, used to detect the audio format
+
+        Returns:
+            Tuple containing (transcription_text, success_flag)
+        """
+        # Rate limiting happens per upload inside upload_in_slices
+        return await asyncio.to_thread(self.transcribe_bytes, audio_bytes, model, filename)
+
+    async def transcribe_files(self, file_paths: List[str], model: str, max_concurrency: Optional[int] = None) -> List[Tuple[str, bool]]:
+        """
+        Transcribe several audio files concurrently
+
+        Args:
+            file_paths: Paths to the audio files
+            model: Model to use for transcription
+            max_concurrency: Maximum number of parallel uploads (defaults to max_concurrency)
+
+        Returns:
+            List of (transcription_text, success_flag) tuples in the order of file_paths
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def transcribe_one(file_path: str) -> Tuple[str, bool]:
+            async with semaphore:
+                return await self.transcribe_file_async(file_path, model)
+
+        results = await asyncio.gather(
+            *(transcribe_one(file_path) for file_path in file_paths),
+            return_exceptions=True
+        )
+        return [
+            (f"Transcription error: {str(result)}", False) if isinstance(result, Exception) else result
+            for result in results
+        ]
+
     @abstractmethod
     def get_available_transcription_models(self) -> list[str]:
         """
@@ -53,8 +796,13 @@ class BaseAudioProvider(ABC):
 class BaseTextProvider(ABC):
     """Abstract base class for text processing providers"""
 
+    # Maximum number of requests process_batch runs at the same time
+    max_concurrency: int = 8
+    # Request rate the async methods stay under (None disables rate limiting)
+    requests_per_minute: Optional[int] = None
+
     @abstractmethod
-    def process_text(self, text: str, prompt_template: PromptTemplate, model: str = None, temperature: float = 0.2) -> Optional[str]:
+    def process_text(self, text: str, prompt_template: PromptTemplate, model: str = None, temperature: float = 0.2, messages: Optional[List[Dict[str, str]]] = None, on_chunk: Optional[Callable[[str], None]] = None) -> Optional[str]:
         """
         Process text using the provider's API
 
@@ -63,12 +811,156 @@ class BaseTextProvider(ABC):
             prompt_template: Prompt template to use
             model: Model to use for processing (optional)
             temperature: Temperature parameter for generation (optional)
+            messages: Full chat history to send instead of the system prompt and text (optional)
+            on_chunk: Called with the reply received so far while it is streamed (optional)
 
         Returns:
             Processed text or None if processing failed
         """
         pass
 
+    def create_completion(self, on_chunk: Optional[Callable[[str], None]] = None, **request) -> Optional[str]:
+        """
+        Send a chat completion request, streaming the reply if a callback is given
+
+        Args:
+            on_chunk: Called with the reply received so far after each streamed chunk (optional)
+            **request: Arguments for client.chat.completions.create
+
+        Returns:
+            Full reply text
+        """
+        # Every chat request passes here, whichever entry point it came from
+        limiter = _get_rate_limiter(self)
+        if limiter:
+            limiter.wait()
+
+        if on_chunk is None:
+            response = self.client.chat.completions.create(**request)
+            return response.choices[0].message.content
+
+        reply = ""
+        for chunk in self.client.chat.completions.create(stream=True, **request):
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                reply += delta
+                on_chunk(reply)
+        return reply
+
+    async def process_text_async(self, text: str, prompt_template: PromptTemplate, model: str = None, temperature: float = 0.2, messages: Optional[List[Dict[str, str]]] = None) -> Optional[str]:
+        """
+        Process text without blocking the event loop
+
+        Args:
+            text: Text to process
+            prompt_template: Prompt template to use
+            model: Model to use for processing (optional)
+            temperature: Temperature parameter for generation (optional)
+            messages: Full chat history to send instead of the system prompt and text (optional)
+
+        Returns:
+            Processed text or None if processing failed
+        """
+        # Rate limiting happens per request inside create_completion
+        return await asyncio.to_thread(self.process_text, text, prompt_template, model, temperature, messages)
+
+    async def process_batch(self, texts: List[str], prompt_template: PromptTemplate, model: str = None, temperature: float = 0.2, max_concurrency: Optional[int] = None) -> List[Optional[str]]:
+        """
+        Process several texts concurrently with the same prompt
+
+        Args:
+            texts: Texts to process
+            prompt_template: Prompt template to use
+            model: Model to use for processing (optional)
+            temperature: Temperature parameter for generation (optional)
+            max_concurrency: Maximum number of parallel requests (defaults to max_concurrency)
+
+        Returns:
+            List of processed texts (or error messages) in the order of texts
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def process_one(text: str) -> Optional[str]:
+            async with semaphore:
+                return await self.process_text_async(text, prompt_template, model, temperature)
+
+        results = await asyncio.gather(
+            *(process_one(text) for text in texts),
+            return_exceptions=True
+        )
+        return [
+            f"Error: {str(result)}" if isinstance(result, Exception) else result
+            for result in results
+        ]
+
+    async def process_text_multi(self, text: str, prompt_templates: List[PromptTemplate], model: str = None, temperature: float = 0.2, max_concurrency: Optional[int] = None) -> List[Optional[str]]:
+        """
+        Process one text with several prompt templates concurrently
+
+        Templates sharing a system prompt are sent as a single request whose
+        result is reused, saving requests against per-minute rate limits.
+
+        Args:
+            text: Text to process
+            prompt_templates: Prompt templates to apply
+            model: Model to use for processing (optional)
+            temperature: Temperature parameter for generation (optional)
+            max_concurrency: Maximum number of parallel requests (defaults to max_concurrency)
+
+        Returns:
+            List of processed texts (or error messages) in the order of prompt_templates
+        """
+        unique_templates: Dict[str, PromptTemplate] = {}
+        for template in prompt_templates:
+            unique_templates.setdefault(template.system_prompt, template)
+
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def process_one(template: PromptTemplate) -> Optional[str]:
+            async with semaphore:
+                return await self.process_text_async(text, template, model, temperature)
+
+        results = await asyncio.gather(
+            *(process_one(template) for template in unique_templates.values()),
+            return_exceptions=True
+        )
+        by_prompt = {
+            system_prompt: f"Error: {str(result)}" if isinstance(result, Exception) else result
+            for system_prompt, result in zip(unique_templates, results)
+        }
+        return [by_prompt[template.system_prompt] for template in prompt_templates]
+
+    @ttl_cache(MODEL_LIST_TTL_SECONDS)
+    def get_chat_model_index(self) -> ModelIndex:
+        """
+        Get a lookup table over the available chat models, rebuilt when the model list expires
+
+        Returns:
+            ModelIndex of get_available_chat_models()
+        """
+        return ModelIndex(self.get_available_chat_models())
+
+    def prewarm(self, model: str = None) -> None:
+        """
+        Open a keep-alive connection to the chat endpoint ahead of the first request
+
+        Fills the model list cache process_text validates against and sends a
+        HEAD request to the API host, so the TLS handshake is already done when
+        process_text runs even if the model list came from the cache. Failures
+        are ignored.
+
+        Args:
+            model: Chat model that will be used (optional)
+        """
+        try:
+            self.get_chat_model_index()
+            client = getattr(self, 'client', None)
+            if client is not None:
+                # Unauthenticated and answered with an error status, but it leaves a pooled connection
+                get_shared_http_client().head(str(client.base_url), timeout=5.0)
+        except Exception as e:
+            logger.warning("Could not prewarm chat client: %s", e)
+
     @abstractmethod
     def get_available_chat_models(self) -> list[str]:
         """
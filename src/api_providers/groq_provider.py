@@ -1,39 +1,144 @@
-from typing import Tuple, Optional, List
-import os
-import time
-from pydub import AudioSegment
-from openai import OpenAI, OpenAIError
-
-from .base_provider import BaseAudioProvider, BaseTextProvider
+from typing import BinaryIO, Tuple, Optional, List, Dict, Callable
+from openai import OpenAIError
+
+from .base_provider import (
+    BaseAudioProvider,
+    BaseTextProvider,
+    cache_transcripts,
+    coalesce_requests,
+    get_openai_client,
+    invalidate_ttl_cache,
+    strip_provider_prefix,
+    ttl_cache,
+    MODEL_LIST_TTL_SECONDS,
+    WHISPER_MODEL_RE
+)
 from prompts import PromptTemplate
+from utils.logger import get_logger
+from utils.tokens import check_context_length
+
+logger = get_logger(__name__)
+
+# Known models used when the API returns none; Groq only supports whisper-large-v3 for transcription
+GROQ_TRANSCRIPTION_FALLBACK_MODELS = (
+    "whisper-large-v3",
+)
+
+# Known chat models used when the API returns none
+GROQ_CHAT_FALLBACK_MODELS = (
+    "llama-3.3-70b-versatile",
+    "llama-3.1-8b-instant",
+    "llama-guard-3-8b",
+    "llama3-70b-8192",
+    "llama3-8b-8192",
+    "mixtral-8x7b-32768",
+    "gemma2-9b-it"
+)
+
 
 class GroqAudioProvider(BaseAudioProvider):
     """Groq implementation of the audio provider"""
 
-    def __init__(self, api_key: str):
+    # Groq free-tier limits: 20 transcription requests per minute
+    max_concurrency = 5
+    requests_per_minute = 20
+
+    def __init__(self, api_key: str, want_segment_stats: bool = False):
         """
         Initialize the Groq audio provider
 
         Args:
             api_key: Groq API key
+            want_segment_stats: Request per-segment metadata and warn on low confidence (optional)
         """
-        self.client = OpenAI(
-            api_key=api_key,
-            base_url="https://api.groq.com/openai/v1"
-        )
+        self.want_segment_stats = want_segment_stats
+        self.client = get_openai_client(api_key, "https://api.groq.com/openai/v1")
 
-    def downsample_audio(self, audio_segment: AudioSegment) -> AudioSegment:
+    def _resolve_transcription_model(self, model: str) -> Tuple[str, Optional[str]]:
         """
-        Downsample audio to 16kHz mono (required by Whisper)
+        Map the requested model to the Whisper model supported by Groq
 
         Args:
-            audio_segment: Audio segment to downsample
+            model: Model to use for transcription
 
         Returns:
-            Downsampled audio segment
+            Tuple containing (model_name, error_message or None)
         """
-        return audio_segment.set_frame_rate(16000).set_channels(1)
+        # Handle models with provider prefix (e.g., "groq/whisper-large-v3")
+        model, error = strip_provider_prefix(model, 'groq', 'Groq')
+        if error:
+            return model, error
+
+        # Validate model - ensure it's a transcription model
+        if not WHISPER_MODEL_RE.search(model):
+            return model, f"Error: '{model}' is not a transcription model. Groq only supports Whisper models for transcription."
 
+        # Groq currently only supports whisper-large-v3 for transcription
+        if model != "whisper-large-v3":
+            # Don't print warning for whisper-large-v3-turbo as it's handled by Groq API
+            if model != "whisper-large-v3-turbo":
+                logger.warning("Groq only supports whisper-large-v3 for transcription. Using whisper-large-v3 instead of %s.", model)
+            model = "whisper-large-v3"
+
+        return model, None
+
+    def _transcribe_upload(self, audio_file: BinaryIO, model: str) -> Tuple[str, bool]:
+        """
+        Send prepared audio to Groq's transcription API
+
+        Args:
+            audio_file: Open WAV file or buffer to upload
+            model: Resolved transcription model
+
+        Returns:
+            Tuple containing (transcription_text, success_flag)
+        """
+        try:
+            # Use Groq's transcription API
+            transcription = self.client.audio.transcriptions.create(
+                model=model,  # Groq only supports whisper-large-v3
+                file=audio_file,
+                language="de",
+                response_format="verbose_json" if self.want_segment_stats else "text",
+                prompt="This is a recording of a German speaker."
+            )
+
+            if not self.want_segment_stats:
+                # Plain text responses are returned as a string
+                return transcription, True
+
+            self.warn_on_segment_stats(transcription)
+            return transcription.text, True
+
+        except OpenAIError as e:
+            logger.error("Error during transcription: %s", e.type)
+
+            if e.type == "not_found":
+                invalidate_ttl_cache(self)
+                return f"Error: Model '{model}' not found. Groq only supports whisper-large-v3 for transcription.", False
+            elif e.type == "invalid_request_error":
+                # Get more details from the error
+                error_details = str(e)
+                if "file too large" in error_details.lower():
+                    return "Error: Audio file is too large. Please use a shorter audio file.", False
+                else:
+                    return f"Error: Invalid request - {error_details}", False
+            elif e.type == "api_connection_error":
+                return "Error: Connection to Groq API failed. Please check your internet connection.", False
+            else:
+                return f"Error: An unknown error occurred - {str(e)}", False
+        except Exception as e:
+            error_msg = str(e)
+            logger.error("Error with model %s: %s", model, error_msg)
+
+            # Handle specific Streamlit-related errors
+            if "'AppSession' object has no attribute '_scriptrunner'" in error_msg:
+                logger.error("Streamlit session error detected. This is likely a compatibility issue with Streamlit.")
+                return "Error: Streamlit session error. Please try restarting the application.", False
+
+            return f"Transcription error: {error_msg}", False
+
+    @cache_transcripts
     def transcribe_file(self, file_path: str, model: str) -> Tuple[str, bool]:
         """
         Transcribe an audio file using Groq's API
@@ -45,98 +150,43 @@ class GroqAudioProvider(BaseAudioProvider):
         Returns:
             Tuple containing (transcription_text, success_flag)
         """
-        temp_path = ""
         try:
-            # Handle models with provider prefix (e.g., "groq/whisper-large-v3")
-            if '/' in model:
-                provider, base_model = model.split('/', 1)
-                if provider.lower() == 'groq':
-                    model = base_model
-                else:
-                    return f"Error: Model '{model}' is not a Groq model. Please select a Groq model.", False
-
-            # Validate model - ensure it's a transcription model
-            if 'whisper' not in model.lower():
-                return f"Error: '{model}' is not a transcription model. Groq only supports Whisper models for transcription.", False
-
-            # Groq currently only supports whisper-large-v3 for transcription
-            if model != "whisper-large-v3":
-                # Don't print warning for whisper-large-v3-turbo as it's handled by Groq API
-                if model != "whisper-large-v3-turbo":
-                    print(f"Warning: Groq only supports whisper-large-v3 for transcription. Using whisper-large-v3 instead of {model}.")
-                model = "whisper-large-v3"
-
-            audio = AudioSegment.from_file(file_path)
-            audio = self.downsample_audio(audio)
-
-            temp_path = file_path + '_optimized.wav'
-            audio.export(temp_path, format='wav')
-
-            with open(temp_path, 'rb') as f:
-                try:
-                    # Use Groq's transcription API
-                    transcription = self.client.audio.transcriptions.create(
-                        model=model,  # Groq only supports whisper-large-v3
-                        file=f,
-                        language="de",
-                        response_format="verbose_json",
-                        prompt="This is a recording of a German speaker."
-                    )
-
-                    # Process transcription results
-                    avg_logprob = sum(segment.avg_logprob for segment in transcription.segments) / len(transcription.segments)
-                    no_speech_prob = sum(segment.no_speech_prob for segment in transcription.segments) / len(transcription.segments)
-
-                    if avg_logprob < -0.5:
-                        print("Warning: Low average log probability. Possible transcription issues.")
-                    if no_speech_prob > 0.5:
-                        print("Warning: High probability of no speech detected. Possible silence or noise in audio.")
-
-                    return transcription.text, True
-
-                except OpenAIError as e:
-                    error_message = f"Error during transcription: {e.type}"
-                    print(error_message)
-
-                    if e.type == "not_found":
-                        return f"Error: Model '{model}' not found. Groq only supports whisper-large-v3 for transcription.", False
-                    elif e.type == "invalid_request_error":
-                        # Get more details from the error
-                        error_details = str(e)
-                        if "file too large" in error_details.lower():
-                            return "Error: Audio file is too large. Please use a shorter audio file.", False
-                        else:
-                            return f"Error: Invalid request - {error_details}", False
-                    elif e.type == "api_connection_error":
-                        return "Error: Connection to Groq API failed. Please check your internet connection.", False
-                    else:
-                        return f"Error: An unknown error occurred - {str(e)}", False
-                except Exception as e:
-                    error_msg = str(e)
-                    print(f"Error with model {model}: {error_msg}")
+            model, error = self._resolve_transcription_model(model)
+            if error:
+                return error, False
 
-                    # Handle specific Streamlit-related errors
-                    if "'AppSession' object has no attribute '_scriptrunner'" in error_msg:
-                        print("Streamlit session error detected. This is likely a compatibility issue with Streamlit.")
-                        return "Error: Streamlit session error. Please try restarting the application.", False
-
-                    return f"Transcription error: {error_msg}", False
+            with self.prepare_file_upload(file_path) as audio_file:
+                return self.upload_in_slices(audio_file, lambda f: self._transcribe_upload(f, model))
 
         except Exception as e:
             return f"Transcription error: {str(e)}", False
 
-        finally:
-            # Delete temporary file with retries
-            if temp_path and os.path.exists(temp_path):
-                max_retries = 3
-                for i in range(max_retries):
-                    try:
-                        os.unlink(temp_path)
-                        break
-                    except PermissionError:
-                        if i < max_retries - 1:  # Don't wait on last attempt
-                            time.sleep(0.1 * (i + 1))
+    @cache_transcripts
+    def transcribe_bytes(self, audio_bytes: bytes, model: str, filename: str = "audio.wav", on_partial: Optional[Callable[[str], None]] = None) -> Tuple[str, bool]:
+        """
+        Transcribe in-memory audio using Groq's API without touching the disk
+
+        Args:
+            audio_bytes: Audio data as bytes
+            model: Model to use for transcription
+            filename: Original file name, used to detect the audio format
+            on_partial: Called with the transcript so far as slices of long audio complete (optional)
+
+        Returns:
+            Tuple containing (transcription_text, success_flag)
+        """
+        try:
+            model, error = self._resolve_transcription_model(model)
+            if error:
+                return error, False
+
+            audio_file = self.prepare_bytes_upload(audio_bytes, filename)
+            return self.upload_in_slices(audio_file, lambda f: self._transcribe_upload(f, model), on_partial)
+
+        except Exception as e:
+            return f"Transcription error: {str(e)}", False
 
+    @ttl_cache(MODEL_LIST_TTL_SECONDS)
     def get_available_transcription_models(self) -> List[str]:
         """
         Get available transcription models for Groq
@@ -149,29 +199,29 @@ class GroqAudioProvider(BaseAudioProvider):
             response = self.client.models.list()
 
             # Filter for whisper models
-            whisper_models = [model.id for model in response.data if 'whisper' in model.id.lower()]
+            whisper_models = [model.id for model in response.data if WHISPER_MODEL_RE.search(model.id)]
 
             if not whisper_models:
                 # Fallback to known models if API doesn't return any
                 # Only include whisper-large-v3 as it's the only one actually supported by Groq
-                return [
-                    "whisper-large-v3"
-                ]
+                return list(GROQ_TRANSCRIPTION_FALLBACK_MODELS)
 
             return whisper_models
 
         except Exception as e:
-            print(f"Error fetching Groq transcription models: {str(e)}")
+            logger.error("Error fetching Groq transcription models: %s", e)
             # Fallback to known models if API call fails
             # Only include whisper-large-v3 as it's the only one actually supported by Groq
-            return [
-                "whisper-large-v3"
-            ]
+            return list(GROQ_TRANSCRIPTION_FALLBACK_MODELS)
 
 
 class GroqTextProvider(BaseTextProvider):
     """Groq implementation of the text provider"""
 
+    # Groq free-tier limits: 30 chat requests per minute
+    max_concurrency = 5
+    requests_per_minute = 30
+
     def __init__(self, api_key: str):
         """
         Initialize the Groq text provider
@@ -179,12 +229,10 @@ class GroqTextProvider(BaseTextProvider):
         Args:
             api_key: Groq API key
         """
-        self.client = OpenAI(
-            api_key=api_key,
-            base_url="https://api.groq.com/openai/v1"
-        )
+        self.client = get_openai_client(api_key, "https://api.groq.com/openai/v1")
 
-    def process_text(self, text: str, prompt_template: PromptTemplate, model: str = None, temperature: float = 0.2) -> Optional[str]:
+    @coalesce_requests
+    def process_text(self, text: str, prompt_template: PromptTemplate, model: str = None, temperature: float = 0.2, messages: Optional[List[Dict[str, str]]] = None, on_chunk: Optional[Callable[[str], None]] = None) -> Optional[str]:
         """
         Process text using Groq's API
 
@@ -193,6 +241,8 @@ class GroqTextProvider(BaseTextProvider):
             prompt_template: Prompt template to use
             model: Model to use for processing (optional)
             temperature: Temperature parameter for generation (optional)
+            messages: Full chat history to send instead of the system prompt and text (optional)
+            on_chunk: Called with the reply received so far while it is streamed (optional)
 
         Returns:
             Processed text or None if processing failed
@@ -202,36 +252,35 @@ class GroqTextProvider(BaseTextProvider):
             model_name = model if model else "llama-3.3-70b-versatile"
 
             # Handle models with provider prefix (e.g., "groq/llama-3.3-70b-versatile")
-            if '/' in model_name:
-                provider, base_model = model_name.split('/', 1)
-                if provider.lower() == 'groq':
-                    model_name = base_model
-                else:
-                    return f"Error: Model '{model_name}' is not a Groq model. Please select a Groq model."
+            model_name, error = strip_provider_prefix(model_name, 'groq', 'Groq')
+            if error:
+                return error
 
             # Validate model - ensure it's not a transcription model
-            if 'whisper' in model_name.lower():
+            if WHISPER_MODEL_RE.search(model_name):
                 return f"Error: '{model_name}' is a transcription model, not a chat model. Please select a chat model."
 
             # Get available models to validate
             try:
-                available_models = self.get_available_chat_models()
-                if model_name not in available_models:
+                model_index = self.get_chat_model_index()
+                known_model = model_index.find(model_name)
+                if known_model:
+                    model_name = known_model
+                else:
                     # Try to find a similar model as fallback
-                    fallback_model = next((m for m in available_models if model_name.lower() in m.lower()), None)
+                    fallback_model = model_index.closest(model_name)
                     if fallback_model:
-                        print(f"Model '{model_name}' not found, using '{fallback_model}' instead")
+                        logger.warning("Model '%s' not found, using '%s' instead", model_name, fallback_model)
                         model_name = fallback_model
                     else:
-                        return f"Error: Model '{model_name}' not found. Available models: {', '.join(available_models[:3])}..."
+                        return f"Error: Model '{model_name}' not found. Available models: {', '.join(model_index.models[:3])}..."
             except Exception as e:
                 # Continue with the provided model if we can't validate
-                print(f"Warning: Could not validate model: {str(e)}")
+                logger.warning("Could not validate model: %s", e)
 
             # Process the text
-            response = self.client.chat.completions.create(
-                model=model_name,
-                messages=[
+            if messages is None:
+                messages = [
                     {
                         "role": "system",
                         "content": prompt_template.system_prompt
@@ -240,16 +289,25 @@ class GroqTextProvider(BaseTextProvider):
                         "role": "user",
                         "content": text
                     }
-                ],
+                ]
+
+            # Catch oversized requests locally instead of waiting for the API to reject them
+            length_error = check_context_length(messages, model_name)
+            if length_error:
+                return length_error
+
+            return self.create_completion(
+                on_chunk,
+                model=model_name,
+                messages=messages,
                 temperature=temperature
             )
-            return response.choices[0].message.content
 
         except OpenAIError as e:
-            error_message = f"Error during text processing: {e.type}"
-            print(error_message)
+            logger.error("Error during text processing: %s", e.type)
 
             if e.type == "not_found":
+                invalidate_ttl_cache(self)
                 return f"Error: Model '{model_name}' not found. Please select a different model."
             elif e.type == "invalid_request_error":
                 # Get more details from the error
@@ -266,15 +324,16 @@ class GroqTextProvider(BaseTextProvider):
                 return f"Error: An unknown error occurred - {str(e)}"
         except Exception as e:
             error_msg = str(e)
-            print(f"Unexpected error: {error_msg}")
+            logger.error("Unexpected error: %s", error_msg)
 
             # Handle specific Streamlit-related errors
             if "'AppSession' object has no attribute '_scriptrunner'" in error_msg:
-                print("Streamlit session error detected. This is likely a compatibility issue with Streamlit.")
+                logger.error("Streamlit session error detected. This is likely a compatibility issue with Streamlit.")
                 return "Error: Streamlit session error. Please try restarting the application."
 
             return f"Error: {error_msg}"
 
+    @ttl_cache(MODEL_LIST_TTL_SECONDS)
     def get_available_chat_models(self) -> List[str]:
         """
         Get available chat models for Groq
@@ -287,31 +346,15 @@ class GroqTextProvider(BaseTextProvider):
             response = self.client.models.list()
 
             # Filter for chat models (exclude whisper models)
-            chat_models = [model.id for model in response.data if 'whisper' not in model.id.lower()]
+            chat_models = [model.id for model in response.data if not WHISPER_MODEL_RE.search(model.id)]
 
             if not chat_models:
                 # Fallback to known models if API doesn't return any
-                return [
-                    "llama-3.3-70b-versatile",
-                    "llama-3.1-8b-instant",
-                    "llama-guard-3-8b",
-                    "llama3-70b-8192",
-                    "llama3-8b-8192",
-                    "mixtral-8x7b-32768",
-                    "gemma2-9b-it"
-                ]
+                return list(GROQ_CHAT_FALLBACK_MODELS)
 
             return chat_models
 
         except Exception as e:
-            print(f"Error fetching Groq chat models: {str(e)}")
+            logger.error("Error fetching Groq chat models: %s", e)
             # Fallback to known models if API call fails
-            return [
-                "llama-3.3-70b-versatile",
-                "llama-3.1-8b-instant",
-                "llama-guard-3-8b",
-                "llama3-70b-8192",
-                "llama3-8b-8192",
-                "mixtral-8x7b-32768",
-                "gemma2-9b-it"
-            ]
+            return list(GROQ_CHAT_FALLBACK_MODELS)
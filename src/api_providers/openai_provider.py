@@ -1,36 +1,126 @@
-from typing import Tuple, Optional, List, Dict, Any
-import os
-import time
+from typing import BinaryIO, Tuple, Optional, List, Dict, Any, Callable
 import json
-from pydub import AudioSegment
-from openai import OpenAI, OpenAIError, NotFoundError
-from .base_provider import BaseAudioProvider, BaseTextProvider
+from openai import OpenAIError, NotFoundError
+from .base_provider import (
+    BaseAudioProvider,
+    BaseTextProvider,
+    cache_transcripts,
+    coalesce_requests,
+    get_openai_client,
+    invalidate_ttl_cache,
+    ttl_cache,
+    MODEL_LIST_TTL_SECONDS,
+    WHISPER_MODEL_RE,
+    GPT4O_TRANSCRIBE_RE,
+    OPENAI_CHAT_MODEL_RE
+)
 from prompts import PromptTemplate
+from utils.logger import get_logger
+from utils.tokens import check_context_length
+
+logger = get_logger(__name__)
+
+# Known transcription models used when the API returns none
+OPENAI_TRANSCRIPTION_FALLBACK_MODELS = (
+    "whisper-1",
+    "gpt-4o-mini-transcribe",
+    "gpt-4o-transcribe"
+)
+
+# Known chat models used when the API returns none
+OPENAI_CHAT_FALLBACK_MODELS = (
+    "gpt-4o",
+    "gpt-4o-mini",
+    "o1",
+    "o1-mini",
+    "o3-mini",
+    "gpt-4-turbo",
+    "gpt-3.5-turbo"
+)
+
 
 class OpenAIAudioProvider(BaseAudioProvider):
     """OpenAI implementation of the audio provider"""
 
-    def __init__(self, api_key: str):
+    max_concurrency = 10
+
+    def __init__(self, api_key: str, want_segment_stats: bool = False):
         """
         Initialize the OpenAI audio provider
 
         Args:
             api_key: OpenAI API key
+            want_segment_stats: Request per-segment metadata from Whisper models and warn on low confidence (optional)
         """
-        self.client = OpenAI(api_key=api_key)
+        self.want_segment_stats = want_segment_stats
+        self.client = get_openai_client(api_key)
 
-    def downsample_audio(self, audio_segment: AudioSegment) -> AudioSegment:
+    def _transcribe_upload(self, audio_file: BinaryIO, model: str) -> Tuple[str, bool]:
         """
-        Downsample audio to 16kHz mono (required by Whisper)
+        Send prepared audio to OpenAI's transcription API
 
         Args:
-            audio_segment: Audio segment to downsample
+            audio_file: Open WAV file or buffer to upload
+            model: Model to use for transcription
 
         Returns:
-            Downsampled audio segment
+            Tuple containing (transcription_text, success_flag)
         """
-        return audio_segment.set_frame_rate(16000).set_channels(1)
+        try:
+            # Determine the appropriate response format based on the model
+            # New GPT-4o transcription models only support json or text
+            if GPT4O_TRANSCRIBE_RE.search(model):
+                response_format = "json"
+                transcription = self.client.audio.transcriptions.create(
+                    model=model,
+                    file=audio_file,
+                    language="de",
+                    response_format=response_format,
+                    prompt="This is a recording of a German speaker."
+                )
+
+                # For json format, the text is directly accessible
+                return transcription.text, True
+            elif not self.want_segment_stats:
+                # Plain text is all we read, so skip the per-segment payload
+                transcription = self.client.audio.transcriptions.create(
+                    model=model,
+                    file=audio_file,
+                    language="de",
+                    response_format="text",
+                    prompt="This is a recording of a German speaker."
+                )
+                return transcription, True
+            else:
+                # For whisper models, use verbose_json for additional metadata
+                response_format = "verbose_json"
+                transcription = self.client.audio.transcriptions.create(
+                    model=model,
+                    file=audio_file,
+                    language="de",
+                    response_format=response_format,
+                    prompt="This is a recording of a German speaker."
+                )
+
+                # Process transcription results for whisper models
+                self.warn_on_segment_stats(transcription)
+                return transcription.text, True
+
+        except NotFoundError:
+            logger.warning("Model %s not found, using default model.", model)
+            invalidate_ttl_cache(self)
+            # Rewind so the fallback uploads the whole file again
+            audio_file.seek(0)
+            transcription = self.client.audio.transcriptions.create(
+                model="whisper-1",  # Default OpenAI model
+                file=audio_file,
+                language="de",
+                response_format="text",
+                prompt="This is a recording of a German speaker."
+            )
+            return transcription, True
 
+    @cache_transcripts
     def transcribe_file(self, file_path: str, model: str) -> Tuple[str, bool]:
         """
         Transcribe an audio file using OpenAI's API
@@ -42,78 +132,35 @@ class OpenAIAudioProvider(BaseAudioProvider):
         Returns:
             Tuple containing (transcription_text, success_flag)
         """
-        temp_path = ""
         try:
-            audio = AudioSegment.from_file(file_path)
-            audio = self.downsample_audio(audio)
-
-            temp_path = file_path + '_optimized.wav'
-            audio.export(temp_path, format='wav')
-
-            with open(temp_path, 'rb') as f:
-                try:
-                    # Determine the appropriate response format based on the model
-                    # New GPT-4o transcription models only support json or text
-                    if 'gpt-4o' in model.lower() and 'transcribe' in model.lower():
-                        response_format = "json"
-                        transcription = self.client.audio.transcriptions.create(
-                            model=model,
-                            file=f,
-                            language="de",
-                            response_format=response_format,
-                            prompt="This is a recording of a German speaker."
-                        )
-
-                        # For json format, the text is directly accessible
-                        return transcription.text, True
-                    else:
-                        # For whisper models, use verbose_json for additional metadata
-                        response_format = "verbose_json"
-                        transcription = self.client.audio.transcriptions.create(
-                            model=model,
-                            file=f,
-                            language="de",
-                            response_format=response_format,
-                            prompt="This is a recording of a German speaker."
-                        )
-
-                        # Process transcription results for whisper models
-                        avg_logprob = sum(segment.avg_logprob for segment in transcription.segments) / len(transcription.segments)
-                        no_speech_prob = sum(segment.no_speech_prob for segment in transcription.segments) / len(transcription.segments)
-
-                        if avg_logprob < -0.5:
-                            print("Warning: Low average log probability. Possible transcription issues.")
-                        if no_speech_prob > 0.5:
-                            print("Warning: High probability of no speech detected. Possible silence or noise in audio.")
-
-                        return transcription.text, True
-
-                except NotFoundError:
-                    print(f"Model {model} not found, using default model.")
-                    transcription = self.client.audio.transcriptions.create(
-                        model="whisper-1",  # Default OpenAI model
-                        file=f,
-                        language="de",
-                        response_format="verbose_json",
-                        prompt="This is a recording of a German speaker."
-                    )
-                    return transcription.text, True
+            with self.prepare_file_upload(file_path) as audio_file:
+                return self.upload_in_slices(audio_file, lambda f: self._transcribe_upload(f, model))
 
         except Exception as e:
             return f"Transcription error: {str(e)}", False
 
-        finally:
-            # Delete temporary file with retries
-            if temp_path and os.path.exists(temp_path):
-                max_retries = 3
-                for i in range(max_retries):
-                    try:
-                        os.unlink(temp_path)
-                        break
-                    except PermissionError:
-                        if i < max_retries - 1:  # Don't wait on last attempt
-                            time.sleep(0.1 * (i + 1))
+    @cache_transcripts
+    def transcribe_bytes(self, audio_bytes: bytes, model: str, filename: str = "audio.wav", on_partial: Optional[Callable[[str], None]] = None) -> Tuple[str, bool]:
+        """
+        Transcribe in-memory audio using OpenAI's API without touching the disk
+
+        Args:
+            audio_bytes: Audio data as bytes
+            model: Model to use for transcription
+            filename: Original file name, used to detect the audio format
+            on_partial: Called with the transcript so far as slices of long audio complete (optional)
+
+        Returns:
+            Tuple containing (transcription_text, success_flag)
+        """
+        try:
+            audio_file = self.prepare_bytes_upload(audio_bytes, filename)
+            return self.upload_in_slices(audio_file, lambda f: self._transcribe_upload(f, model), on_partial)
+
+        except Exception as e:
+            return f"Transcription error: {str(e)}", False
 
+    @ttl_cache(MODEL_LIST_TTL_SECONDS)
     def get_available_transcription_models(self) -> List[str]:
         """
         Get available transcription models for OpenAI
@@ -129,22 +176,17 @@ class OpenAIAudioProvider(BaseAudioProvider):
             audio_models = []
 
             # Check for whisper models
-            whisper_models = [model.id for model in response.data if 'whisper' in model.id.lower()]
+            whisper_models = [model.id for model in response.data if WHISPER_MODEL_RE.search(model.id)]
             audio_models.extend(whisper_models)
 
             # Check for new GPT-4o transcription models
-            gpt4o_transcribe_models = [model.id for model in response.data
-                                      if ('gpt-4o' in model.id.lower() and 'transcribe' in model.id.lower())]
+            gpt4o_transcribe_models = [model.id for model in response.data if GPT4O_TRANSCRIBE_RE.search(model.id)]
             audio_models.extend(gpt4o_transcribe_models)
 
             # If no models found from API, use known models
             if not audio_models:
                 # Include both whisper-1 and the new GPT-4o transcription models
-                return [
-                    "whisper-1",
-                    "gpt-4o-mini-transcribe",
-                    "gpt-4o-transcribe"
-                ]
+                return list(OPENAI_TRANSCRIPTION_FALLBACK_MODELS)
 
             # Make sure the new models are included even if not returned by the API
             if "gpt-4o-mini-transcribe" not in audio_models:
@@ -156,18 +198,16 @@ class OpenAIAudioProvider(BaseAudioProvider):
             return audio_models
 
         except Exception as e:
-            print(f"Error fetching OpenAI transcription models: {str(e)}")
+            logger.error("Error fetching OpenAI transcription models: %s", e)
             # Fallback to known models if API call fails
-            return [
-                "whisper-1",
-                "gpt-4o-mini-transcribe",
-                "gpt-4o-transcribe"
-            ]
+            return list(OPENAI_TRANSCRIPTION_FALLBACK_MODELS)
 
 
 class OpenAITextProvider(BaseTextProvider):
     """OpenAI implementation of the text provider"""
 
+    max_concurrency = 10
+
     def __init__(self, api_key: str):
         """
         Initialize the OpenAI text provider
@@ -175,9 +215,10 @@ class OpenAITextProvider(BaseTextProvider):
         Args:
             api_key: OpenAI API key
         """
-        self.client = OpenAI(api_key=api_key)
+        self.client = get_openai_client(api_key)
 
-    def process_text(self, text: str, prompt_template: PromptTemplate, model: str = None, temperature: float = 0.2) -> Optional[str]:
+    @coalesce_requests
+    def process_text(self, text: str, prompt_template: PromptTemplate, model: str = None, temperature: float = 0.2, messages: Optional[List[Dict[str, str]]] = None, on_chunk: Optional[Callable[[str], None]] = None) -> Optional[str]:
         """
         Process text using OpenAI's API
 
@@ -186,6 +227,8 @@ class OpenAITextProvider(BaseTextProvider):
             prompt_template: Prompt template to use
             model: Model to use for processing (optional)
             temperature: Temperature parameter for generation (optional)
+            messages: Full chat history to send instead of the system prompt and text (optional)
+            on_chunk: Called with the reply received so far while it is streamed (optional)
 
         Returns:
             Processed text or None if processing failed
@@ -193,9 +236,8 @@ class OpenAITextProvider(BaseTextProvider):
         try:
             model_name = model if model else "gpt-4o-mini"
 
-            response = self.client.chat.completions.create(
-                model=model_name,
-                messages=[
+            if messages is None:
+                messages = [
                     {
                         "role": "system",
                         "content": prompt_template.system_prompt
@@ -204,13 +246,23 @@ class OpenAITextProvider(BaseTextProvider):
                         "role": "user",
                         "content": text
                     }
-                ],
+                ]
+
+            # Catch oversized requests locally instead of waiting for the API to reject them
+            length_error = check_context_length(messages, model_name)
+            if length_error:
+                return length_error
+
+            return self.create_completion(
+                on_chunk,
+                model=model_name,
+                messages=messages,
                 temperature=temperature
             )
-            return response.choices[0].message.content
         except OpenAIError as e:
-            print(f"Error during text processing: {e.type}")
+            logger.error("Error during text processing: %s", e.type)
             if e.type == "not_found":
+                invalidate_ttl_cache(self)
                 return "Error: Model not found. Please check the model name."
             elif e.type == "invalid_request_error":
                 return "Error: Invalid request. Please check the parameters."
@@ -219,6 +271,7 @@ class OpenAITextProvider(BaseTextProvider):
             else:
                 return "Error: An unknown error occurred."
 
+    @ttl_cache(MODEL_LIST_TTL_SECONDS)
     def get_available_chat_models(self) -> List[str]:
         """
         Get available chat models for OpenAI
@@ -232,34 +285,15 @@ class OpenAITextProvider(BaseTextProvider):
 
             # Filter for chat models (exclude whisper models)
             chat_models = [model.id for model in response.data
-                          if ('gpt' in model.id.lower() or
-                              'o1' in model.id.lower() or
-                              'o3' in model.id.lower()) and
-                             'whisper' not in model.id.lower()]
+                          if OPENAI_CHAT_MODEL_RE.search(model.id) and not WHISPER_MODEL_RE.search(model.id)]
 
             if not chat_models:
                 # Fallback to known models if API doesn't return any
-                return [
-                    "gpt-4o",
-                    "gpt-4o-mini",
-                    "o1",
-                    "o1-mini",
-                    "o3-mini",
-                    "gpt-4-turbo",
-                    "gpt-3.5-turbo"
-                ]
+                return list(OPENAI_CHAT_FALLBACK_MODELS)
 
             return chat_models
 
         except Exception as e:
-            print(f"Error fetching OpenAI chat models: {str(e)}")
+            logger.error("Error fetching OpenAI chat models: %s", e)
             # Fallback to known models if API call fails
-            return [
-                "gpt-4o",
-                "gpt-4o-mini",
-                "o1",
-                "o1-mini",
-                "o3-mini",
-                "gpt-4-turbo",
-                "gpt-3.5-turbo"
-            ]
+            return list(OPENAI_CHAT_FALLBACK_MODELS)
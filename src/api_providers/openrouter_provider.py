@@ -1,35 +1,68 @@
-from typing import Tuple, Optional, List, Dict, Any
-import os
+from typing import Tuple, Optional, List, Dict, Any, Callable
 import time
 import json
-from pydub import AudioSegment
-from openai import OpenAI, OpenAIError, NotFoundError
+from openai import OpenAIError, NotFoundError
 import re
-
-from .base_provider import BaseAudioProvider, BaseTextProvider
+from concurrent.futures import ThreadPoolExecutor
+
+from .base_provider import (
+    BaseAudioProvider,
+    BaseTextProvider,
+    coalesce_requests,
+    get_openai_client,
+    invalidate_ttl_cache,
+    ttl_cache,
+    MODEL_LIST_TTL_SECONDS,
+    WHISPER_MODEL_RE
+)
 from prompts import PromptTemplate
+from utils.logger import get_logger
+from utils.tokens import check_context_length
 from .openai_provider import OpenAIAudioProvider
 from .groq_provider import GroqAudioProvider
 
+logger = get_logger(__name__)
+
+# Unprefixed model names that are routed to Groq rather than OpenAI
+GROQ_MODEL_PREFIXES = ('whisper-large-v3', 'llama')
+
+# Known models used when the API returns none
+OPENROUTER_CHAT_FALLBACK_MODELS = (
+    # OpenAI models
+    "openai/gpt-4o",
+    "openai/gpt-4o-mini",
+    "openai/o1",
+    "openai/o1-mini",
+    "openai/gpt-4-turbo",
+    # Groq models
+    "groq/llama-3.3-70b-versatile",
+    "groq/llama-3.1-8b-instant",
+    # Anthropic models
+    "anthropic/claude-3-opus-20240229",
+    "anthropic/claude-3-sonnet-20240229",
+    # Special routing
+    "openrouter/auto"
+)
+
+
 class OpenRouterAudioProvider(BaseAudioProvider):
     """OpenRouter implementation of the audio provider that routes to OpenAI and Groq"""
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, openai_api_key: Optional[str] = None, groq_api_key: Optional[str] = None):
         """
         Initialize the OpenRouter audio provider
 
         Args:
             api_key: OpenRouter API key
+            openai_api_key: OpenAI API key for transcription (optional)
+            groq_api_key: Groq API key for transcription (optional)
         """
         self.openrouter_api_key = api_key
-        self.openai_api_key = os.getenv("OPENAI_API_KEY")
-        self.groq_api_key = os.getenv("GROQ_API_KEY")
+        self.openai_api_key = openai_api_key
+        self.groq_api_key = groq_api_key
 
         # Initialize the OpenRouter client for text processing
-        self.client = OpenAI(
-            api_key=api_key,
-            base_url="https://openrouter.ai/api/v1"
-        )
+        self.client = get_openai_client(api_key, "https://openrouter.ai/api/v1")
 
         # Initialize provider-specific clients if API keys are available
         self.providers: Dict[str, BaseAudioProvider] = {}
@@ -40,50 +73,24 @@ class OpenRouterAudioProvider(BaseAudioProvider):
         if self.groq_api_key:
             self.providers['groq'] = GroqAudioProvider(self.groq_api_key)
 
-    def downsample_audio(self, audio_segment: AudioSegment) -> AudioSegment:
-        """
-        Downsample audio to 16kHz mono (required by Whisper)
-
-        Args:
-            audio_segment: Audio segment to downsample
-
-        Returns:
-            Downsampled audio segment
-        """
-        return audio_segment.set_frame_rate(16000).set_channels(1)
-
-    def _get_provider_from_model(self, model: str) -> str:
+    def _split_model(self, model: str) -> Tuple[str, str]:
         """
-        Extract provider from model string
+        Split a model string into provider and base model name
 
         Args:
             model: Model string (e.g., 'openai/whisper-1', 'groq/whisper-large-v3')
 
         Returns:
-            Provider name
+            Tuple containing (provider_name, base_model)
         """
-        if '/' in model:
-            return model.split('/')[0].lower()
+        prefix, sep, base_model = model.partition('/')
+        if sep:
+            return prefix.lower(), base_model
 
         # Default mappings for models without explicit provider
-        if model.startswith('whisper-large-v3') or model.startswith('llama'):
-            return 'groq'
-        else:
-            return 'openai'  # Default to OpenAI for other models
-
-    def _get_base_model_name(self, model: str) -> str:
-        """
-        Extract base model name from model string
-
-        Args:
-            model: Model string (e.g., 'openai/whisper-1', 'groq/whisper-large-v3')
-
-        Returns:
-            Base model name
-        """
-        if '/' in model:
-            return model.split('/', 1)[1]
-        return model
+        if model.startswith(GROQ_MODEL_PREFIXES):
+            return 'groq', model
+        return 'openai', model  # Default to OpenAI for other models
 
     def transcribe_file(self, file_path: str, model: str) -> Tuple[str, bool]:
         """
@@ -97,8 +104,7 @@ class OpenRouterAudioProvider(BaseAudioProvider):
             Tuple containing (transcription_text, success_flag)
         """
         # Extract provider and base model name
-        provider_name = self._get_provider_from_model(model)
-        base_model = self._get_base_model_name(model)
+        provider_name, base_model = self._split_model(model)
 
         # Check if we have the provider available
         if provider_name not in self.providers:
@@ -109,6 +115,28 @@ class OpenRouterAudioProvider(BaseAudioProvider):
         provider = self.providers[provider_name]
         return provider.transcribe_file(file_path, base_model)
 
+    def transcribe_bytes(self, audio_bytes: bytes, model: str, filename: str = "audio.wav", on_partial: Optional[Callable[[str], None]] = None) -> Tuple[str, bool]:
+        """
+        Transcribe in-memory audio by routing to the appropriate provider
+
+        Args:
+            audio_bytes: Audio data as bytes
+            model: Model to use for transcription (format: 'provider/model' or just 'model')
+            filename: Original file name, used to detect the audio format
+            on_partial: Called with the transcript so far as slices of long audio complete (optional)
+
+        Returns:
+            Tuple containing (transcription_text, success_flag)
+        """
+        provider_name, base_model = self._split_model(model)
+
+        if provider_name not in self.providers:
+            missing_key = f"{provider_name.upper()}_API_KEY"
+            return f"Error: {missing_key} not set. Please add it to your .env file.", False
+
+        provider = self.providers[provider_name]
+        return provider.transcribe_bytes(audio_bytes, base_model, filename, on_partial)
+
     def get_available_transcription_models(self) -> List[str]:
         """
         Get available transcription models from all configured providers
@@ -116,17 +144,17 @@ class OpenRouterAudioProvider(BaseAudioProvider):
         Returns:
             List of available model names with provider prefixes
         """
-        models = []
-
-        # Add OpenAI models if available
-        if 'openai' in self.providers:
-            openai_models = ['openai/' + model for model in self.providers['openai'].get_available_transcription_models()]
-            models.extend(openai_models)
+        # Fetch the model lists of all configured providers at the same time
+        with ThreadPoolExecutor(max_workers=max(1, len(self.providers))) as pool:
+            fetched = {
+                name: pool.submit(provider.get_available_transcription_models)
+                for name, provider in self.providers.items()
+            }
 
-        # Add Groq models if available
-        if 'groq' in self.providers:
-            groq_models = ['groq/' + model for model in self.providers['groq'].get_available_transcription_models()]
-            models.extend(groq_models)
+        models = []
+        for name in ('openai', 'groq'):
+            if name in fetched:
+                models.extend(f"{name}/{model}" for model in fetched[name].result())
 
         # If no providers are configured, return a message as the first option
         if not models:
@@ -145,12 +173,10 @@ class OpenRouterTextProvider(BaseTextProvider):
         Args:
             api_key: OpenRouter API key
         """
-        self.client = OpenAI(
-            api_key=api_key,
-            base_url="https://openrouter.ai/api/v1"
-        )
+        self.client = get_openai_client(api_key, "https://openrouter.ai/api/v1")
 
-    def process_text(self, text: str, prompt_template: PromptTemplate, model: str = None, temperature: float = 0.2) -> Optional[str]:
+    @coalesce_requests
+    def process_text(self, text: str, prompt_template: PromptTemplate, model: str = None, temperature: float = 0.2, messages: Optional[List[Dict[str, str]]] = None, on_chunk: Optional[Callable[[str], None]] = None) -> Optional[str]:
         """
         Process text using OpenRouter's API
 
@@ -159,6 +185,8 @@ class OpenRouterTextProvider(BaseTextProvider):
             prompt_template: Prompt template to use
             model: Model to use for processing (optional)
             temperature: Temperature parameter for generation (optional)
+            messages: Full chat history to send instead of the system prompt and text (optional)
+            on_chunk: Called with the reply received so far while it is streamed (optional)
 
         Returns:
             Processed text or None if processing failed
@@ -168,39 +196,41 @@ class OpenRouterTextProvider(BaseTextProvider):
             model_name = model if model else "openai/gpt-4o"
 
             # Validate model - ensure it's not a transcription model
-            if 'whisper' in model_name.lower():
+            if WHISPER_MODEL_RE.search(model_name):
                 return f"Error: '{model_name}' is a transcription model, not a chat model. Please select a chat model."
 
             # Get available models to validate
             try:
-                available_models = self.get_available_chat_models()
-                if model_name not in available_models and model_name != "openrouter/auto":
+                model_index = self.get_chat_model_index()
+                known_model = model_index.find(model_name)
+                if known_model:
+                    model_name = known_model
+                elif model_name != "openrouter/auto":
                     # Try to find a similar model as fallback
                     provider_prefix = model_name.split('/')[0] if '/' in model_name else None
 
                     if provider_prefix:
                         # Look for models from the same provider
-                        provider_models = [m for m in available_models if m.startswith(f"{provider_prefix}/")]
+                        provider_models = model_index.with_prefix(provider_prefix)
                         if provider_models:
                             fallback_model = provider_models[0]
-                            print(f"Model '{model_name}' not found, using '{fallback_model}' instead")
+                            logger.warning("Model '%s' not found, using '%s' instead", model_name, fallback_model)
                             model_name = fallback_model
                         else:
                             # If no models from that provider, use auto routing
-                            print(f"No models found from provider '{provider_prefix}', using auto routing")
+                            logger.warning("No models found from provider '%s', using auto routing", provider_prefix)
                             model_name = "openrouter/auto"
                     else:
                         # If no provider prefix, use auto routing
-                        print(f"Model '{model_name}' not found, using auto routing")
+                        logger.warning("Model '%s' not found, using auto routing", model_name)
                         model_name = "openrouter/auto"
             except Exception as e:
                 # Continue with the provided model if we can't validate
-                print(f"Warning: Could not validate model: {str(e)}")
+                logger.warning("Could not validate model: %s", e)
 
             # Add provider preferences for better routing
-            response = self.client.chat.completions.create(
-                model=model_name,
-                messages=[
+            if messages is None:
+                messages = [
                     {
                         "role": "system",
                         "content": prompt_template.system_prompt
@@ -209,7 +239,17 @@ class OpenRouterTextProvider(BaseTextProvider):
                         "role": "user",
                         "content": text
                     }
-                ],
+                ]
+
+            # Catch oversized requests locally instead of waiting for the API to reject them
+            length_error = check_context_length(messages, model_name)
+            if length_error:
+                return length_error
+
+            return self.create_completion(
+                on_chunk,
+                model=model_name,
+                messages=messages,
                 temperature=temperature,
                 extra_body={
                     "provider": {
@@ -217,13 +257,12 @@ class OpenRouterTextProvider(BaseTextProvider):
                     }
                 }
             )
-            return response.choices[0].message.content
 
         except OpenAIError as e:
-            error_message = f"Error during text processing: {e.type}"
-            print(error_message)
+            logger.error("Error during text processing: %s", e.type)
 
             if e.type == "not_found":
+                invalidate_ttl_cache(self)
                 return f"Error: Model '{model_name}' not found. Please select a different model or use 'openrouter/auto' for automatic routing."
             elif e.type == "invalid_request_error":
                 # Get more details from the error
@@ -239,9 +278,10 @@ class OpenRouterTextProvider(BaseTextProvider):
             else:
                 return f"Error: An unknown error occurred - {str(e)}"
         except Exception as e:
-            print(f"Unexpected error: {str(e)}")
+            logger.error("Unexpected error: %s", e)
             return f"Error: {str(e)}"
 
+    @ttl_cache(MODEL_LIST_TTL_SECONDS)
     def get_available_chat_models(self) -> List[str]:
         """
         Get available chat models for OpenRouter
@@ -261,41 +301,11 @@ class OpenRouterTextProvider(BaseTextProvider):
 
             if not models or len(models) <= 1:  # Only the auto option
                 # Fallback to known models if API doesn't return any
-                return [
-                    # OpenAI models
-                    "openai/gpt-4o",
-                    "openai/gpt-4o-mini",
-                    "openai/o1",
-                    "openai/o1-mini",
-                    "openai/gpt-4-turbo",
-                    # Groq models
-                    "groq/llama-3.3-70b-versatile",
-                    "groq/llama-3.1-8b-instant",
-                    # Anthropic models
-                    "anthropic/claude-3-opus-20240229",
-                    "anthropic/claude-3-sonnet-20240229",
-                    # Special routing
-                    "openrouter/auto"
-                ]
+                return list(OPENROUTER_CHAT_FALLBACK_MODELS)
 
             return models
 
         except Exception as e:
-            print(f"Error fetching OpenRouter models: {str(e)}")
+            logger.error("Error fetching OpenRouter models: %s", e)
             # Fallback to known models if API call fails
-            return [
-                # OpenAI models
-                "openai/gpt-4o",
-                "openai/gpt-4o-mini",
-                "openai/o1",
-                "openai/o1-mini",
-                "openai/gpt-4-turbo",
-                # Groq models
-                "groq/llama-3.3-70b-versatile",
-                "groq/llama-3.1-8b-instant",
-                # Anthropic models
-                "anthropic/claude-3-opus-20240229",
-                "anthropic/claude-3-sonnet-20240229",
-                # Special routing
-                "openrouter/auto"
-            ]
+            return list(OPENROUTER_CHAT_FALLBACK_MODELS)
@@ -1,4 +1,4 @@
-from typing import Dict, Type, Union
+from typing import Any, Dict, Tuple, Type, Union
 from .base_provider import BaseAudioProvider, BaseTextProvider
 from .openai_provider import OpenAIAudioProvider, OpenAITextProvider
 from .groq_provider import GroqAudioProvider, GroqTextProvider
@@ -21,26 +21,37 @@ class ProviderFactory:
         'openrouter': OpenRouterTextProvider
     }
     
+    # Provider instances reused across calls (and Streamlit reruns), keyed by (provider_name, api_key[, options])
+    _audio_instances: Dict[tuple, BaseAudioProvider] = {}
+    _text_instances: Dict[Tuple[str, str], BaseTextProvider] = {}
+    
     @classmethod
-    def get_audio_provider(cls, provider_name: str, api_key: str) -> BaseAudioProvider:
+    def get_audio_provider(cls, provider_name: str, api_key: str, **provider_options: Any) -> BaseAudioProvider:
         """
         Get an audio provider instance
         
         Args:
             provider_name: Name of the provider (e.g., 'openai', 'groq')
             api_key: API key for the provider
+            **provider_options: Extra constructor arguments, e.g. the transcription keys of 'openrouter'
             
         Returns:
-            Instance of BaseAudioProvider
+            Shared instance of BaseAudioProvider for this provider and API key
             
         Raises:
             ValueError: If provider_name is not supported
         """
-        provider_class = cls._audio_providers.get(provider_name.lower())
-        if not provider_class:
-            raise ValueError(f"Unsupported audio provider: {provider_name}")
-        
-        return provider_class(api_key)
+        key = (provider_name.lower(), api_key)
+        if provider_options:
+            key += (tuple(sorted(provider_options.items())),)
+        provider = cls._audio_instances.get(key)
+        if provider is None:
+            provider_class = cls._audio_providers.get(key[0])
+            if not provider_class:
+                raise ValueError(f"Unsupported audio provider: {provider_name}")
+            
+            provider = cls._audio_instances[key] = provider_class(api_key, **provider_options)
+        return provider
     
     @classmethod
     def get_text_provider(cls, provider_name: str, api_key: str) -> BaseTextProvider:
@@ -52,16 +63,20 @@ class ProviderFactory:
             api_key: API key for the provider
             
         Returns:
-            Instance of BaseTextProvider
+            Shared instance of BaseTextProvider for this provider and API key
             
         Raises:
             ValueError: If provider_name is not supported
         """
-        provider_class = cls._text_providers.get(provider_name.lower())
-        if not provider_class:
-            raise ValueError(f"Unsupported text provider: {provider_name}")
-        
-        return provider_class(api_key)
+        key = (provider_name.lower(), api_key)
+        provider = cls._text_instances.get(key)
+        if provider is None:
+            provider_class = cls._text_providers.get(key[0])
+            if not provider_class:
+                raise ValueError(f"Unsupported text provider: {provider_name}")
+            
+            provider = cls._text_instances[key] = provider_class(api_key)
+        return provider
     
     @classmethod
     def register_audio_provider(cls, name: str, provider_class: Type[BaseAudioProvider]) -> None:
@@ -73,6 +88,7 @@ class ProviderFactory:
             provider_class: Provider class
         """
         cls._audio_providers[name.lower()] = provider_class
+        cls._audio_instances = {key: p for key, p in cls._audio_instances.items() if key[0] != name.lower()}
     
     @classmethod
     def register_text_provider(cls, name: str, provider_class: Type[BaseTextProvider]) -> None:
@@ -84,3 +100,4 @@ class ProviderFactory:
             provider_class: Provider class
         """
         cls._text_providers[name.lower()] = provider_class
+        cls._text_instances = {key: p for key, p in cls._text_instances.items() if key[0] != name.lower()}
@@ -1,22 +1,118 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import asyncio
 from speech_to_text import AudioTranscriber
 from text_processors import TextProcessor
 from prompts import AVAILABLE_PROMPTS, PromptTemplate
 from streamlit_mic_recorder import mic_recorder
 import uuid
-import tempfile
+import threading
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 import os
-import time
 import json
+import tempfile
 from mcp_client import get_mcp_client, run_async
+from config.api_keys import APIKeys
+from utils.tokens import count_tokens
 from agents.agent import Agent
+from agents.mcp_integration import get_mcp_integration
 from agents.speech_agent import SpeechAgent
 from agents.tools.think import ThinkTool
 
 load_dotenv()
 
+# Read once; reruns and provider setup use these instead of the environment
+API_KEYS = APIKeys.from_env()
+
+# Provider selectbox options and the position of each provider in them
+_PROVIDER_OPTIONS = ('Groq', 'OpenAI', 'OpenRouter')
+_PROVIDER_INDEX = {name.lower(): index for index, name in enumerate(_PROVIDER_OPTIONS)}
+
+# Serializes the first connection to the shared MCP client's servers
+_MCP_CONNECT_LOCK = threading.Lock()
+
+# Number of chat messages rendered before older ones are collapsed
+_CHAT_HISTORY_LIMIT = 20
+
+# Placeholders of the "Add new server" form
+_DEFAULT_MCP_ARGS_JSON = '["--directory", "C:/path/to/server", "run", "server.py"]'
+_DEFAULT_MCP_ENV_JSON = '{"API_KEY": "your-api-key"}'
+
+
+def _with_script_ctx(callback):
+    """Lets an async UI callback update the page from the shared event loop thread"""
+    ctx = get_script_run_ctx()
+
+    async def wrapper(*args, **kwargs):
+        # The loop thread serves all sessions; claim it for this one before touching the UI
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return await callback(*args, **kwargs)
+
+    return wrapper
+
+
+@st.cache_data(show_spinner=False)
+def _load_mcp_config(config_path: str, mtime: float) -> dict:
+    """Parses the MCP configuration; the modification time keys the cache"""
+    with open(config_path, 'r') as f:
+        return json.load(f)
+
+
+@st.cache_data(show_spinner=False)
+def _format_mcp_servers(config_path: str, mtime: float) -> dict:
+    """Pretty-prints each configured server once per version of the file"""
+    servers = _load_mcp_config(config_path, mtime)["mcpServers"]
+    return {name: json.dumps(server_config, indent=2) for name, server_config in servers.items()}
+
+
+def _read_mcp_config(config_path: str) -> dict:
+    """Returns the MCP configuration, re-reading the file only after it changed"""
+    if not os.path.exists(config_path):
+        return {"mcpServers": {}}
+    return _load_mcp_config(config_path, os.path.getmtime(config_path))
+
+
+def _write_mcp_config(config_path: str, config: dict) -> None:
+    """Atomically replaces the MCP configuration file"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(config_path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(config, f, indent=2)
+        os.replace(tmp_path, config_path)
+    except BaseException:
+        # Don't leave the partial file next to the configuration
+        os.unlink(tmp_path)
+        raise
+    _load_mcp_config.clear()
+    _format_mcp_servers.clear()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _list_mcp_tools() -> dict:
+    """Lists the MCP tools of all servers at once, reusing the result across reruns for 30 seconds"""
+    return run_async(get_mcp_client().list_all_tools())
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _count_tokens(text: str, model: str = None) -> int:
+    """Counts the tokens of a text once, instead of on every rerun with the same input"""
+    return count_tokens(text, model)
+
+
+@st.cache_resource(show_spinner=False)
+def _get_transcriber(provider: str, api_key: str) -> AudioTranscriber:
+    """Builds the transcriber of a provider once and shares it across reruns"""
+    return AudioTranscriber(provider=provider, api_key=api_key, **API_KEYS.transcription_options(provider))
+
+
+@st.cache_resource(show_spinner=False)
+def _get_text_processor(provider: str, api_key: str) -> TextProcessor:
+    """Builds the text processor of a provider once and shares it across reruns"""
+    return TextProcessor(provider=provider, api_key=api_key)
+
+
 class TranscriptionApp:
     def __init__(self):
         if 'provider' not in st.session_state:
@@ -37,14 +133,9 @@ class TranscriptionApp:
         # MCP-Client initialisieren
         self.mcp_client = get_mcp_client()
         
-        # MCP-Server initialisieren (wenn noch nicht verbunden)
+        # MCP-Server werden erst verbunden, wenn ein MCP- oder Agenten-Tab sie braucht
         if 'mcp_connected' not in st.session_state:
             st.session_state.mcp_connected = False
-            try:
-                run_async(self.mcp_client.connect_to_servers())
-                st.session_state.mcp_connected = True
-            except Exception as e:
-                print(f"Error connecting to MCP servers: {str(e)}")
 
         # Lazy Loading für Provider
         self.providers = {}
@@ -54,9 +145,21 @@ class TranscriptionApp:
 
         # Setup the selected provider
         self.setup_provider()
-        
-        # Initialisiere den Agenten
-        self.initialize_agent()
+
+        # Open the connection to the chat API in the background once per session
+        if not st.session_state.get('_warmed') and API_KEYS.for_provider(st.session_state.provider):
+            st.session_state._warmed = True
+            threading.Thread(target=self.text_processor.prewarm, daemon=True).start()
+
+    @staticmethod
+    def load_chat_models(provider, api_key):
+        """Fetches the chat models of one provider"""
+        return _get_text_processor(provider, api_key).get_available_models()
+
+    @staticmethod
+    def load_transcription_models(provider, api_key):
+        """Fetches the transcription models of one provider"""
+        return _get_transcriber(provider, api_key).get_available_models()
 
     def initialize_all_providers(self):
         """Initialize all providers and cache their models at startup"""
@@ -66,55 +169,78 @@ class TranscriptionApp:
             with st.spinner("Initializing providers and loading models..."):
                 # Initialize all providers
                 providers = ['groq', 'openai', 'openrouter']
-
-                for provider in providers:
-                    api_key = os.getenv(f"{provider.upper()}_API_KEY")
-                    if not api_key:
-                        st.session_state.cached_models[provider] = {
-                            'chat': [f"No {provider.upper()}_API_KEY found in .env file"],
-                            'transcription': [f"No {provider.upper()}_API_KEY found in .env file"]
-                        }
-                        continue
-
-                    try:
-                        # Initialize provider
-                        transcriber = AudioTranscriber(provider=provider, api_key=api_key)
-                        text_processor = TextProcessor(provider=provider, api_key=api_key)
-
-                        # Cache models
-                        st.session_state.cached_models[provider] = {
-                            'chat': text_processor.get_available_models(),
-                            'transcription': transcriber.get_available_models()
-                        }
-                    except Exception as e:
-                        st.error(f"Error initializing {provider}: {str(e)}")
-                        st.session_state.cached_models[provider] = {
-                            'chat': [f"Error loading {provider} models"],
-                            'transcription': [f"Error loading {provider} models"]
-                        }
+                futures = {}
+
+                # Fetch chat and transcription models of all providers at the same time
+                with ThreadPoolExecutor(max_workers=2 * len(providers)) as executor:
+                    for provider in providers:
+                        api_key = API_KEYS.for_provider(provider)
+                        if not api_key:
+                            st.session_state.cached_models[provider] = {
+                                'chat': [f"No {provider.upper()}_API_KEY found in .env file"],
+                                'transcription': [f"No {provider.upper()}_API_KEY found in .env file"]
+                            }
+                            continue
+
+                        st.session_state.cached_models[provider] = {}
+                        futures[executor.submit(self.load_chat_models, provider, api_key)] = (provider, 'chat')
+                        futures[executor.submit(self.load_transcription_models, provider, api_key)] = (provider, 'transcription')
+
+                    failed = set()
+                    for future in as_completed(futures):
+                        provider, kind = futures[future]
+                        try:
+                            # Cache models
+                            st.session_state.cached_models[provider][kind] = future.result()
+                        except Exception as e:
+                            # One failing provider doesn't hold up the others
+                            if provider not in failed:
+                                failed.add(provider)
+                                st.error(f"Error initializing {provider}: {str(e)}")
+
+                for provider in failed:
+                    st.session_state.cached_models[provider] = {
+                        'chat': [f"Error loading {provider} models"],
+                        'transcription': [f"Error loading {provider} models"]
+                    }
 
     def setup_provider(self):
         """Initializes the selected provider"""
         provider = st.session_state.provider.lower()
-        api_key = os.getenv(f"{provider.upper()}_API_KEY")
+        api_key = API_KEYS.for_provider(provider)
 
         # Ensure environment variables are loaded for OpenRouter to access OpenAI and Groq
         if provider == 'openrouter':
             # Check if API keys are available and show warnings if not
-            if not os.getenv("OPENAI_API_KEY"):
+            if not API_KEYS.openai:
                 st.warning("OpenAI API key not found. OpenAI models will not be available for transcription via OpenRouter.")
 
-            if not os.getenv("GROQ_API_KEY"):
+            if not API_KEYS.groq:
                 st.warning("Groq API key not found. Groq models will not be available for transcription via OpenRouter.")
 
-        self.transcriber = AudioTranscriber(provider=provider, api_key=api_key)
-        self.text_processor = TextProcessor(provider=provider, api_key=api_key)
+        self.transcriber = _get_transcriber(provider, api_key)
+        self.text_processor = _get_text_processor(provider, api_key)
         
+    def _ensure_mcp_connected(self):
+        """Connects to the MCP servers on first use; returns whether they are connected"""
+        if not st.session_state.mcp_connected:
+            # Sessions share the MCP client, so only one of them connects at a time.
+            # Connecting through the integration counts this session, so an agent's
+            # disconnect can't close the servers while the session still uses them.
+            with _MCP_CONNECT_LOCK:
+                try:
+                    run_async(get_mcp_integration().connect())
+                    st.session_state.mcp_connected = True
+                except Exception as e:
+                    print(f"Error connecting to MCP servers: {str(e)}")
+        return st.session_state.mcp_connected
+
     def initialize_agent(self):
         """Initialize the SpeechAgent with current provider settings"""
         if 'agent' not in st.session_state:
+            self._ensure_mcp_connected()
             provider = st.session_state.provider.lower()
-            api_key = os.getenv(f"{provider.upper()}_API_KEY")
+            api_key = API_KEYS.for_provider(provider)
             
             # Get default models for the current provider
             models = st.session_state.cached_models.get(provider, {})
@@ -132,11 +258,12 @@ class TranscriptionApp:
                     provider=provider,
                     api_key=api_key,
                     transcription_model=default_transcription_model,
-                    chat_model=default_chat_model
+                    chat_model=default_chat_model,
+                    transcription_options=API_KEYS.transcription_options(provider)
                 )
                 
                 # Connect to MCP servers
-                st.session_state.agent.connect()
+                run_async(st.session_state.agent.connect())
                 
             except Exception as e:
                 print(f"Error initializing the agent: {str(e)}")
@@ -145,20 +272,17 @@ class TranscriptionApp:
     def setup_ui(self):
         st.title("AI Audio Transcription")
 
-        # Tabs for different functionalities
-        tab1, tab2, tab3, tab4 = st.tabs(["Transcription", "MCP Configuration", "MCP Tools", "AI Agent"])
-
-        with tab1:
-            self.setup_transcription_ui()
+        # Pages for different functionalities
+        pages = {
+            "Transcription": self.setup_transcription_ui,
+            "MCP Configuration": self.setup_mcp_config,
+            "MCP Tools": self.show_mcp_tools,
+            "AI Agent": self.setup_agent_ui
+        }
 
-        with tab2:
-            self.setup_mcp_config()
-
-        with tab3:
-            self.show_mcp_tools()
-            
-        with tab4:
-            self.setup_agent_ui()
+        # Unlike st.tabs, only the selected page is built (and queries MCP servers) on a rerun
+        active_page = st.radio("View", list(pages), horizontal=True, key="active_tab", label_visibility="collapsed")
+        pages[active_page]()
 
     def setup_mcp_config(self):
         """Displays and edits the MCP configuration"""
@@ -166,18 +290,15 @@ class TranscriptionApp:
         
         # Load current configuration
         config_path = "mcp_config.json"
-        if os.path.exists(config_path):
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-        else:
-            config = {"mcpServers": {}}
+        config = _read_mcp_config(config_path)
         
         # Show current servers
         if config["mcpServers"]:
             st.write("Configured servers:")
-            for server_name, server_config in config["mcpServers"].items():
+            formatted_servers = _format_mcp_servers(config_path, os.path.getmtime(config_path))
+            for server_name, server_json in formatted_servers.items():
                 with st.expander(f"Server: {server_name}"):
-                    st.code(json.dumps(server_config, indent=2))
+                    st.code(server_json)
         else:
             st.info("No MCP servers configured")
         
@@ -187,10 +308,10 @@ class TranscriptionApp:
             command = st.text_input("Command", value="uv")
             
             # Arguments as list
-            args_str = st.text_area("Arguments (JSON array)", value='["--directory", "C:/path/to/server", "run", "server.py"]')
+            args_str = st.text_area("Arguments (JSON array)", value=_DEFAULT_MCP_ARGS_JSON)
             
             # Environment variables as dictionary
-            env_str = st.text_area("Environment variables (JSON object)", value='{"API_KEY": "your-api-key"}')
+            env_str = st.text_area("Environment variables (JSON object)", value=_DEFAULT_MCP_ENV_JSON)
             
             if st.button("Add server"):
                 try:
@@ -206,8 +327,7 @@ class TranscriptionApp:
                             "env": env
                         }
                         
-                        with open(config_path, 'w') as f:
-                            json.dump(config, f, indent=2)
+                        _write_mcp_config(config_path, config)
                         
                         st.success(f"Server {server_name} successfully added")
                         st.info("Please restart the app to use the new servers")
@@ -225,8 +345,7 @@ class TranscriptionApp:
                 if st.button("Remove server") and server_to_remove:
                     del config["mcpServers"][server_to_remove]
                     
-                    with open(config_path, 'w') as f:
-                        json.dump(config, f, indent=2)
+                    _write_mcp_config(config_path, config)
                     
                     st.success(f"Server {server_to_remove} successfully removed")
                     st.info("Please restart the app to apply the changes")
@@ -236,12 +355,15 @@ class TranscriptionApp:
         st.header("MCP-Tools")
         
         # Check if MCP servers are connected
-        if not st.session_state.mcp_connected:
+        if not self._ensure_mcp_connected():
             st.warning("No MCP servers connected. Please configure and start the servers.")
             return
         
-        # Get available servers
-        servers = run_async(self.mcp_client.list_servers())
+        # Get available servers together with their tools
+        if st.button("Refresh tools"):
+            _list_mcp_tools.clear()
+        tools_by_server = _list_mcp_tools()
+        servers = list(tools_by_server)
         
         if not servers:
             st.info("No MCP servers connected")
@@ -257,7 +379,7 @@ class TranscriptionApp:
             )
         
         # Get tools for the selected server
-        tools = run_async(self.mcp_client.list_tools(selected_server))
+        tools = tools_by_server[selected_server]
         
         if not tools:
             st.info(f"No tools available for server {selected_server}")
@@ -318,6 +440,9 @@ class TranscriptionApp:
         """UI for the AI Agent with integration of Speech-to-Text functionality"""
         st.header("AI Agent with Speech-to-Text")
         
+        # The agent (and its MCP connections) is only created once this tab is opened
+        self.initialize_agent()
+        
         # Check if the agent was initialized
         if 'agent' not in st.session_state or st.session_state.agent is None:
             st.warning("The agent could not be initialized. Please check your API keys.")
@@ -369,15 +494,23 @@ class TranscriptionApp:
         with agent_tab2:
             self.setup_agent_audio_ui()
     
+    @st.fragment
     def setup_agent_chat_ui(self):
-        """Chat interface for the agent"""
+        """Chat interface for the agent; runs as a fragment so its widgets only rerun this part of the page"""
         st.subheader("Chat with the agent")
         
         # Chat-Verlauf anzeigen
         chat_container = st.container()
         
         with chat_container:
-            for message in st.session_state.agent_messages:
+            # Only the latest messages are rendered on every rerun; older ones on request
+            messages = st.session_state.agent_messages
+            older = messages[:-_CHAT_HISTORY_LIMIT]
+            if older and st.toggle(f"Show {len(older)} earlier messages", key="show_older_agent_messages"):
+                visible = messages
+            else:
+                visible = messages[-_CHAT_HISTORY_LIMIT:]
+            for message in visible:
                 if message["role"] == "user":
                     st.chat_message("user").write(message["content"])
                 else:
@@ -401,13 +534,14 @@ class TranscriptionApp:
                 
                 # Process the request with the agent
                 with st.spinner("Agent is working..."):
-                    response = run_async(st.session_state.agent.process(user_input, stream_response))
+                    response = run_async(st.session_state.agent.process(user_input, _with_script_ctx(stream_response)))
                 
                 # Save the response in the chat history
                 st.session_state.agent_messages.append({"role": "assistant", "content": response})
     
+    @st.fragment
     def setup_agent_audio_ui(self):
-        """Audio processing with the agent"""
+        """Audio processing with the agent; runs as a fragment so its widgets only rerun this part of the page"""
         st.subheader("Process audio")
         
         # Model selection
@@ -461,96 +595,80 @@ class TranscriptionApp:
                 st.audio(audio['bytes'])
                 self.handle_agent_recording(audio['bytes'], transcription_model, chat_model, system_prompt)
     
-    def handle_agent_file_upload(self, uploaded_file, transcription_model, chat_model, system_prompt):
-        """Processes an uploaded audio file with the agent"""
-        with st.spinner("Verarbeite Audio..."):
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-                # Datei speichern
-                tmp_file.write(uploaded_file.getvalue())
-                
-                # Callback-Funktion für Fortschrittsaktualisierungen
-                results_container = st.container()
-                progress = st.progress(0)
-                
-                async def update_progress(status_type, status_text, additional_info=""):
-                    if status_type == "status":
-                        if status_text == "Transcribing audio...":
-                            progress.progress(25)
-                        elif status_text == "Processing text...":
-                            progress.progress(75)
-                    elif status_type == "transcription":
-                        progress.progress(50)
-                        with results_container:
-                            st.subheader("Transkription:")
-                            st.write(status_text)
-                    elif status_type == "processed":
-                        progress.progress(100)
-                        with results_container:
-                            st.subheader("Verarbeiteter Text:")
-                            st.write(status_text)
-                    elif status_type == "error":
-                        progress.progress(100)
-                        with results_container:
-                            st.error(status_text)
-                
-                # Transkribiere und verarbeite mit dem Agenten
-                result = run_async(st.session_state.agent.transcribe_and_process(
-                    audio_bytes=uploaded_file.getvalue(),
-                    transcription_model=transcription_model,
-                    chat_model=chat_model,
-                    system_prompt=system_prompt,
-                    callback=update_progress
-                ))
-                
-                # Zeige Download-Button an, wenn erfolgreich
-                if "processed_text" in result:
+    def _agent_progress_callback(self, results_container, progress):
+        """Erstellt die Callback-Funktion für Fortschrittsaktualisierungen des Agenten"""
+        processed_output = None
+        
+        async def update_progress(status_type, status_text, additional_info=""):
+            nonlocal processed_output
+            if status_type == "status":
+                if status_text == "Transcribing audio...":
+                    progress.progress(25)
+                elif status_text == "Processing text...":
+                    progress.progress(75)
+            elif status_type == "transcription":
+                progress.progress(50)
+                with results_container:
+                    st.subheader("Transkription:")
+                    st.write(status_text)
+            elif status_type in ("processed_partial", "processed"):
+                # The processed text streams into one placeholder
+                if processed_output is None:
                     with results_container:
-                        st.download_button(
-                            label="Verarbeiteten Text herunterladen",
-                            data=result["processed_text"],
-                            file_name="processed_text.txt",
-                            mime="text/plain"
-                        )
-                
-                # Aufräumen
-                os.unlink(tmp_file.name)
+                        st.subheader("Verarbeiteter Text:")
+                        processed_output = st.empty()
+                if status_type == "processed":
+                    progress.progress(100)
+                    processed_output.write(status_text)
+                else:
+                    processed_output.markdown(status_text)
+            elif status_type == "error":
+                progress.progress(100)
+                with results_container:
+                    st.error(status_text)
+        
+        return _with_script_ctx(update_progress)
     
-    def handle_agent_recording(self, audio_bytes, transcription_model, chat_model, system_prompt):
-        """Verarbeitet eine Mikrofon-Aufnahme mit dem Agenten"""
+    def _handle_agent_audio(self, audio_bytes, transcription_model, chat_model, system_prompt):
+        """Verarbeitet Audiodaten mit dem Agenten"""
         with st.spinner("Verarbeite Audio..."):
-            # Callback-Funktion für Fortschrittsaktualisierungen
             results_container = st.container()
             progress = st.progress(0)
             
-            async def update_progress(status_type, status_text, additional_info=""):
-                if status_type == "status":
-                    if status_text == "Transcribing audio...":
-                        progress.progress(25)
-                    elif status_text == "Processing text...":
-                        progress.progress(75)
-                elif status_type == "transcription":
-                    progress.progress(50)
-                    with results_container:
-                        st.subheader("Transkription:")
-                        st.write(status_text)
-                elif status_type == "processed":
-                    progress.progress(100)
-                    with results_container:
-                        st.subheader("Verarbeiteter Text:")
-                        st.write(status_text)
-                elif status_type == "error":
-                    progress.progress(100)
-                    with results_container:
-                        st.error(status_text)
+            # Same caches as the transcription tab, so repeated audio skips both API calls
+            provider = st.session_state.agent.transcriber.provider
+            transcription_key = self._transcription_cache_key(provider, transcription_model, audio_bytes)
+            original_text = st.session_state.transcription_cache.get(transcription_key)
+            processed_text = None
+            if original_text is not None:
+                processed_text = st.session_state.processed_text_cache.get(
+                    self._processed_text_cache_key(provider, chat_model, system_prompt, original_text)
+                )
             
-            # Transkribiere und verarbeite mit dem Agenten
-            result = run_async(st.session_state.agent.transcribe_and_process(
-                audio_bytes=audio_bytes,
-                transcription_model=transcription_model,
-                chat_model=chat_model,
-                system_prompt=system_prompt,
-                callback=update_progress
-            ))
+            if processed_text is not None:
+                result = {"original_text": original_text, "processed_text": processed_text}
+                progress.progress(100)
+                with results_container:
+                    st.subheader("Transkription:")
+                    st.write(original_text)
+                    st.subheader("Verarbeiteter Text:")
+                    st.write(processed_text)
+            else:
+                # Transkribiere und verarbeite mit dem Agenten
+                result = run_async(st.session_state.agent.transcribe_and_process(
+                    audio_bytes=audio_bytes,
+                    transcription_model=transcription_model,
+                    chat_model=chat_model,
+                    system_prompt=system_prompt,
+                    callback=self._agent_progress_callback(results_container, progress)
+                ))
+                if "original_text" in result:
+                    st.session_state.transcription_cache[transcription_key] = result["original_text"]
+                # Providers return errors as text; only keep real results
+                if result.get("processed_text") and not result["processed_text"].startswith("Error"):
+                    st.session_state.processed_text_cache[self._processed_text_cache_key(
+                        provider, chat_model, system_prompt, result["original_text"]
+                    )] = result["processed_text"]
             
             # Zeige Download-Button an, wenn erfolgreich
             if "processed_text" in result:
@@ -561,7 +679,15 @@ class TranscriptionApp:
                         file_name="processed_text.txt",
                         mime="text/plain"
                     )
-
+    
+    def handle_agent_file_upload(self, uploaded_file, transcription_model, chat_model, system_prompt):
+        """Processes an uploaded audio file with the agent"""
+        self._handle_agent_audio(uploaded_file.getvalue(), transcription_model, chat_model, system_prompt)
+    
+    def handle_agent_recording(self, audio_bytes, transcription_model, chat_model, system_prompt):
+        """Verarbeitet eine Mikrofon-Aufnahme mit dem Agenten"""
+        self._handle_agent_audio(audio_bytes, transcription_model, chat_model, system_prompt)
+    
     def setup_transcription_ui(self):
         """Original UI für Transkription"""
         # Provider selection
@@ -569,9 +695,8 @@ class TranscriptionApp:
         with col1:
             provider = st.selectbox(
                 "Select AI Provider:",
-                options=['Groq', 'OpenAI', 'OpenRouter'],
-                index=0 if st.session_state.provider == 'groq' else
-                      1 if st.session_state.provider == 'openai' else 2,
+                options=_PROVIDER_OPTIONS,
+                index=_PROVIDER_INDEX.get(st.session_state.provider, 2),
                 help="OpenRouter benötigt OpenAI und/oder Groq API-Schlüssel für die Transkription"
             )
 
@@ -582,13 +707,12 @@ class TranscriptionApp:
                 # Aktualisiere auch den Agenten bei Providerwechsel
                 if 'agent' in st.session_state:
                     # Trenne bestehende Verbindungen
-                    st.session_state.agent.disconnect()
+                    run_async(st.session_state.agent.disconnect())
                     
                     # Entferne den Agenten aus dem Session State
                     del st.session_state.agent
                     
-                    # Initialisiere den Agenten neu
-                    self.initialize_agent()
+                    # Der Agent wird beim nächsten Öffnen des Agenten-Tabs neu erstellt
                 
                 st.rerun()
 
@@ -666,15 +790,11 @@ class TranscriptionApp:
                 if not is_valid:
                     st.error(message)
                 else:
-                    token_count = self.count_tokens(text_input)
+                    token_count = self.count_tokens(text_input, chat_model)
                     st.info(f"Approximate tokens: {token_count}")
                     try:
                         with st.spinner("Processing Text..."):
-                            processed_text = self.text_processor.process_text(
-                                text_input,
-                                prompt,
-                                model=chat_model
-                            )
+                            processed_text = self._process_text_cached(text_input, prompt, chat_model)
                         if processed_text:
                             col1, col2 = st.columns(2)
                             with col1:
@@ -699,97 +819,117 @@ class TranscriptionApp:
         provider = st.session_state.provider.lower()
 
         # Use cached models if available
-        if 'cached_models' in st.session_state and provider in st.session_state.cached_models:
-            return st.session_state.cached_models[provider]
-
-        # Fallback to direct API calls if cache is not available
-        return {
-            'chat': self.text_processor.get_available_models(),
-            'transcription': self.transcriber.get_available_models()
-        }
-
-    def handle_file_upload(self, uploaded_file, model, chat_model, prompt):
-        with st.spinner("Processing Audio..."):
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-                tmp_file.write(uploaded_file.getvalue())
+        cached_models = st.session_state.setdefault('cached_models', {})
+        if provider not in cached_models:
+            # Fallback to direct API calls, kept for the following reruns
+            cached_models[provider] = {
+                'chat': self.text_processor.get_available_models(),
+                'transcription': self.transcriber.get_available_models()
+            }
+        return cached_models[provider]
+
+    @staticmethod
+    def _transcription_cache_key(provider, model, audio_bytes):
+        """Builds the transcription cache key from the provider, model and a hash of the audio"""
+        return (provider, model, hashlib.blake2b(audio_bytes, digest_size=16).hexdigest())
+
+    @staticmethod
+    def _processed_text_cache_key(provider, chat_model, system_prompt, text):
+        """Builds the processed text cache key from the provider, model and hashes of prompt and text"""
+        return (
+            provider,
+            chat_model,
+            hashlib.blake2b(system_prompt.encode(), digest_size=16).hexdigest(),
+            hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+        )
 
-                text, success = self.transcriber.transcribe_file(
-                    tmp_file.name,
-                    model=model
+    def _transcribe_and_prewarm(self, audio_bytes, model, filename, chat_model):
+        """Transcribes audio while warming up the chat connection in the background"""
+        # Reruns with the same audio are answered from the session cache
+        cache_key = self._transcription_cache_key(st.session_state.provider, model, audio_bytes)
+        cached = st.session_state.transcription_cache.get(cache_key)
+        if cached is not None:
+            return cached, True
+
+        # Partial transcripts of long audio are shown here until all slices are done
+        partial_output = st.empty()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # Transcribe on the script thread so partial results can be rendered
+            executor.submit(self.text_processor.prewarm, chat_model)
+            transcription = self.transcriber.transcribe_bytes(
+                audio_bytes,
+                model=model,
+                filename=filename,
+                on_partial=partial_output.markdown
+            )
+        partial_output.empty()
+
+        text, success = transcription
+        if success:
+            st.session_state.transcription_cache[cache_key] = text
+        return transcription
+
+    def _process_text_cached(self, text, prompt, chat_model, on_chunk=None):
+        """Processes text, reusing the session's earlier result for the same text, prompt and model"""
+        cache_key = self._processed_text_cache_key(st.session_state.provider, chat_model, prompt.system_prompt, text)
+        cached = st.session_state.processed_text_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        processed_text = self.text_processor.process_text(text, prompt, model=chat_model, on_chunk=on_chunk)
+        # Errors are returned as text; only keep real results
+        if processed_text and not processed_text.startswith("Error"):
+            st.session_state.processed_text_cache[cache_key] = processed_text
+        return processed_text
+
+    def _run_pipeline(self, audio_bytes, filename, model, chat_model, prompt, spinner_text, show_download):
+        """Transcribes audio, processes the transcript and renders both"""
+        with st.spinner(spinner_text):
+            # Upload straight from memory; no temp file round-trip
+            text, success = self._transcribe_and_prewarm(audio_bytes, model, filename, chat_model)
+
+            if not success:
+                st.error(text)
+                return
+
+            st.success("Transcription successful!")
+
+            # Display original text
+            st.subheader("Original Transcription:")
+            st.write(text)
+            if show_download:
+                # Available right away, independent of the text processing below
+                st.download_button(
+                    label="Download Transcription",
+                    data=text,
+                    file_name="transcription.txt",
+                    mime="text/plain"
                 )
 
-                if success:
-                    st.success("Transcription successful!")
+            # Automatic text processing, shown while the reply streams in
+            st.subheader(f"Processed Text ({prompt.name}):")
+            output = st.empty()
+            with st.spinner("Processing Text..."):
+                processed_text = self._process_text_cached(text, prompt, chat_model, on_chunk=output.markdown)
+                if processed_text:
+                    output.write(processed_text)
 
-                    # Display original text
-                    st.subheader("Original Transcription:")
-                    st.write(text)
-
-                    # Automatic text processing
-                    with st.spinner("Processing Text..."):
-                        processed_text = self.text_processor.process_text(
-                            text,
-                            prompt,
-                            model=chat_model
+                    if show_download:
+                        # Download button for processed text
+                        st.download_button(
+                            label="Download Processed Text",
+                            data=processed_text,
+                            file_name="processed_text.txt",
+                            mime="text/plain"
                         )
-                        if processed_text:
-                            st.subheader(f"Processed Text ({prompt.name}):")
-                            st.write(processed_text)
-
-                            # Download button for processed text
-                            st.download_button(
-                                label="Download Processed Text",
-                                data=processed_text,
-                                file_name="processed_text.txt",
-                                mime="text/plain"
-                            )
-                else:
-                    st.error(text)
 
-                os.unlink(tmp_file.name)
+    def handle_file_upload(self, uploaded_file, model, chat_model, prompt):
+        self._run_pipeline(uploaded_file.getvalue(), uploaded_file.name, model, chat_model, prompt,
+                           spinner_text="Processing Audio...", show_download=True)
 
     def handle_recording(self, audio_bytes, model, chat_model, prompt):
-        with st.spinner("Processing Recording..."):
-            tmp_file_path = ""
-            try:
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-                    tmp_file.write(audio_bytes)
-                    tmp_file_path = tmp_file.name
-
-                text, success = self.transcriber.transcribe_file(
-                    tmp_file_path,
-                    model=model
-                )
-
-                if success:
-                    st.success("Transcription successful!")
-
-                    # Display original text
-                    st.subheader("Original Transcription:")
-                    st.write(text)
-
-                    # Automatic text processing
-                    with st.spinner("Processing Text..."):
-                        processed_text = self.text_processor.process_text(
-                            text,
-                            prompt,
-                            model=chat_model
-                        )
-                        if processed_text:
-                            st.subheader(f"Processed Text ({prompt.name}):")
-                            st.write(processed_text)
-                else:
-                    st.error(text)
-
-            finally:
-                if tmp_file_path:
-                    max_retries = 3
-                    for _ in range(max_retries):
-                        try:
-                            os.unlink(tmp_file_path)
-                            break
-                        except PermissionError:
-                            time.sleep(0.1)
+        self._run_pipeline(audio_bytes, "recording.webm", model, chat_model, prompt,
+                           spinner_text="Processing Recording...", show_download=False)
 
     def validate_text_input(self, text: str) -> tuple[bool, str]:
         """Validates the text input and returns (is_valid, message)"""
@@ -799,10 +939,9 @@ class TranscriptionApp:
             return False, "Text exceeds maximum length of 5000 characters"
         return True, ""
 
-    def count_tokens(self, text: str) -> int:
+    def count_tokens(self, text: str, model: str = None) -> int:
         """Approximate token count for billing purposes"""
-        # Rough approximation: 4 characters per token
-        return len(text) // 4
+        return _count_tokens(text, model)
 
 if __name__ == "__main__":
     app = TranscriptionApp()
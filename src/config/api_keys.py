@@ -0,0 +1,53 @@
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass(frozen=True)
+class APIKeys:
+    """API keys of all supported providers, read once at startup"""
+    openai: Optional[str] = None
+    groq: Optional[str] = None
+    openrouter: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> "APIKeys":
+        """
+        Read the keys from the environment (call after load_dotenv)
+
+        Returns:
+            APIKeys with the values of OPENAI_API_KEY, GROQ_API_KEY and OPENROUTER_API_KEY
+        """
+        return cls(
+            openai=os.getenv("OPENAI_API_KEY"),
+            groq=os.getenv("GROQ_API_KEY"),
+            openrouter=os.getenv("OPENROUTER_API_KEY")
+        )
+
+    def transcription_options(self, provider: str) -> Dict[str, Optional[str]]:
+        """
+        Get the extra keys a provider needs for transcription
+
+        OpenRouter has no audio API and routes transcription to OpenAI and Groq.
+
+        Args:
+            provider: Provider name ('openai', 'groq' or 'openrouter')
+
+        Returns:
+            Keyword arguments for AudioTranscriber, empty for providers that need none
+        """
+        if provider.lower() == 'openrouter':
+            return {"openai_api_key": self.openai, "groq_api_key": self.groq}
+        return {}
+
+    def for_provider(self, provider: str) -> Optional[str]:
+        """
+        Get the API key of a provider
+
+        Args:
+            provider: Provider name ('openai', 'groq' or 'openrouter')
+
+        Returns:
+            API key, or None if it is not set
+        """
+        return getattr(self, provider.lower(), None)
@@ -1,10 +1,92 @@
 import asyncio
 import json
 import os
+import platform
+import re
+import threading
+from contextlib import AsyncExitStack
+from functools import lru_cache
 from typing import Dict, List, Optional, Any
 
+import anyio
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
+from mcp.types import CONNECTION_CLOSED
+
+# Windows drive paths (C:\path) and their WSL mounts (/mnt/c/path)
+_WINDOWS_PATH_RE = re.compile(r'^([A-Za-z]):\\(.*)')
+_WSL_PATH_RE = re.compile(r'^/mnt/([a-z])/(.*)')
+
+# Errors raised while sending, before a request reached the server
+_UNSENT_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError)
+
+@lru_cache(maxsize=1)
+def _platform_kind() -> str:
+    """
+    Detects the platform once, for converting server paths
+    
+    Returns:
+        'wsl', 'windows' or 'other'
+    """
+    system = platform.system().lower()
+    if system == 'linux' and 'microsoft' in platform.release().lower():
+        return 'wsl'
+    if system == 'windows':
+        return 'windows'
+    return 'other'
+
+@lru_cache(maxsize=8)
+def _load_servers(config_path: str, mtime: float) -> Dict:
+    """
+    Parses the server section of a configuration file; the modification time keys the cache
+    
+    Args:
+        config_path: Path to the MCP configuration file
+        mtime: Modification time of the file
+    
+    Returns:
+        Configured servers by name
+    """
+    with open(config_path, 'r') as f:
+        return json.load(f).get("mcpServers", {})
+
+def _convert_path(arg: str, kind: str) -> str:
+    """
+    Converts a path argument between Windows and WSL notation
+    
+    Args:
+        arg: Command line argument
+        kind: Platform kind returned by _platform_kind
+    
+    Returns:
+        Converted path, or the argument unchanged if it needs no conversion
+    """
+    if kind == 'wsl':
+        # Convert Windows paths (C:\path\to\file) to WSL paths (/mnt/c/path/to/file)
+        match = _WINDOWS_PATH_RE.match(arg)
+        if match:
+            return f"/mnt/{match.group(1).lower()}/" + match.group(2).replace('\\', '/')
+    elif kind == 'windows':
+        # Convert WSL paths (/mnt/c/path) to Windows paths (C:\path)
+        match = _WSL_PATH_RE.match(arg)
+        if match:
+            return f"{match.group(1).upper()}:\\" + match.group(2).replace('/', '\\')
+    return arg
+
+def _is_transport_error(error: Exception) -> bool:
+    """
+    Tells a closed, broken or exited server connection apart from an error reply
+    
+    Args:
+        error: Exception raised by a session request
+    
+    Returns:
+        True if the connection to the server is gone
+    """
+    if isinstance(error, _UNSENT_ERRORS + (anyio.EndOfStream, ConnectionError)):
+        return True
+    # The session reports a transport that closed underneath it with this error code
+    return getattr(getattr(error, "error", None), "code", None) == CONNECTION_CLOSED
 
 class MCPClient:
     def __init__(self, config_path: str = "mcp_config.json"):
@@ -17,7 +99,10 @@ class MCPClient:
         self.config_path = config_path
         self.servers = {}
         self.sessions = {}
-        self.exit_stack = None
+        # Config key each session was started with, used to reuse warm sessions
+        self._session_keys = {}
+        # One exit stack per server, so a single transport can be closed on its own
+        self._exit_stacks: Dict[str, AsyncExitStack] = {}
         self.load_config()
         
     def load_config(self) -> None:
@@ -26,16 +111,33 @@ class MCPClient:
             with open(self.config_path, 'w') as f:
                 json.dump({"mcpServers": {}}, f, indent=2)
             
-        with open(self.config_path, 'r') as f:
-            config = json.load(f)
-            self.servers = config.get("mcpServers", {})
+        # Copy, so changes to this client's servers don't leak into the cache
+        self.servers = dict(_load_servers(self.config_path, os.path.getmtime(self.config_path)))
     
-    async def connect_to_servers(self) -> None:
-        """Connects to all configured MCP servers"""
-        from contextlib import AsyncExitStack
+    @staticmethod
+    def _config_key(server_config: Dict) -> tuple:
+        """
+        Builds a hashable key identifying a server configuration
+        
+        Args:
+            server_config: Configuration of the server
         
-        self.exit_stack = AsyncExitStack()
+        Returns:
+            Tuple of command, arguments and environment
+        """
+        return (
+            server_config.get("command", ""),
+            tuple(server_config.get("args", [])),
+            frozenset((server_config.get("env") or {}).items())
+        )
+    
+    async def connect_to_servers(self) -> None:
+        """Connects to all configured MCP servers, reusing sessions that are still alive"""
         for server_name, server_config in self.servers.items():
+            if (server_name in self.sessions
+                    and self._session_keys.get(server_name) == self._config_key(server_config)
+                    and await self.ping(server_name)):
+                continue
             try:
                 await self.connect_to_server(server_name, server_config)
             except Exception as e:
@@ -43,7 +145,7 @@ class MCPClient:
     
     async def connect_to_server(self, server_name: str, server_config: Dict) -> None:
         """
-        Connects to a single MCP server
+        Connects to a single MCP server, closing its previous transport first
         
         Args:
             server_name: Name of the server
@@ -54,43 +156,8 @@ class MCPClient:
         env = server_config.get("env", {})
         
         # Handle paths across different platforms
-        import platform
-        import re
-        import os
-        
-        modified_args = []
-        system = platform.system().lower()
-        
-        for arg in args:
-            if not isinstance(arg, str):
-                modified_args.append(arg)
-                continue
-                
-            # Handle Windows paths on WSL
-            if system == 'linux' and 'microsoft' in platform.release().lower():
-                # Convert Windows paths (C:\path\to\file) to WSL paths (/mnt/c/path/to/file)
-                if re.match(r'^[A-Za-z]:\\', arg):
-                    drive_letter = arg[0].lower()
-                    wsl_path = f"/mnt/{drive_letter}/{arg[3:].replace('\\', '/')}"
-                    modified_args.append(wsl_path)
-                else:
-                    modified_args.append(arg)
-                    
-            # Handle WSL paths on Windows
-            elif system == 'windows':
-                # Convert WSL paths (/mnt/c/path) to Windows paths (C:\path)
-                wsl_path_match = re.match(r'^/mnt/([a-z])/(.*)', arg)
-                if wsl_path_match:
-                    drive_letter = wsl_path_match.group(1).upper()
-                    path_part = wsl_path_match.group(2).replace('/', '\\')
-                    win_path = f"{drive_letter}:\\{path_part}"
-                    modified_args.append(win_path)
-                else:
-                    modified_args.append(arg)
-            
-            # No conversion needed for other cases
-            else:
-                modified_args.append(arg)
+        kind = _platform_kind()
+        modified_args = [_convert_path(arg, kind) if isinstance(arg, str) else arg for arg in args]
         
         server_params = StdioServerParameters(
             command=command,
@@ -98,16 +165,21 @@ class MCPClient:
             env=env or None
         )
         
+        # Stop the old server process before starting a new one
+        await self._close_server(server_name)
+        
+        exit_stack = self._exit_stacks[server_name] = AsyncExitStack()
         try:
-            stdio_transport = await self.exit_stack.enter_async_context(stdio_client(server_params))
+            stdio_transport = await exit_stack.enter_async_context(stdio_client(server_params))
             stdin, stdout = stdio_transport
-            session = await self.exit_stack.enter_async_context(ClientSession(stdin, stdout))
+            session = await exit_stack.enter_async_context(ClientSession(stdin, stdout))
             
             # Server initialisieren
             await session.initialize()
             
             # Session speichern
             self.sessions[server_name] = session
+            self._session_keys[server_name] = self._config_key(server_config)
             
             # List available tools and resources
             tools_response = await session.list_tools()
@@ -118,8 +190,69 @@ class MCPClient:
             # Show full error for debugging
             import traceback
             print(f"Detailed error: {traceback.format_exc()}")
+            # Don't leave a half-started server process behind
+            await self._close_server(server_name)
             raise
     
+    async def _close_server(self, server_name: str) -> None:
+        """
+        Closes the transport of a server and forgets its session
+        
+        Args:
+            server_name: Name of the server
+        """
+        self.sessions.pop(server_name, None)
+        self._session_keys.pop(server_name, None)
+        exit_stack = self._exit_stacks.pop(server_name, None)
+        if exit_stack is None:
+            return
+        try:
+            await exit_stack.aclose()
+        except Exception as e:
+            print(f"Error closing server {server_name}: {str(e)}")
+    
+    async def ping(self, server_name: str) -> bool:
+        """
+        Checks whether the transport of a server is still usable
+        
+        Args:
+            server_name: Name of the server
+        
+        Returns:
+            False if the server is not connected or its transport is closed or broken
+        """
+        if server_name not in self.sessions:
+            return False
+        
+        try:
+            await self.sessions[server_name].send_ping()
+        except Exception as e:
+            print(f"Ping to server {server_name} failed: {str(e)}")
+            # An error reply still means the connection itself works
+            return not _is_transport_error(e)
+        return True
+    
+    async def reconnect(self, server_name: str) -> bool:
+        """
+        Replaces the session of a server with a freshly started one
+        
+        Args:
+            server_name: Name of the server
+        
+        Returns:
+            True if the server is connected again
+        """
+        if server_name not in self.servers:
+            return False
+        
+        # connect_to_server closes the old transport before starting the new process
+        try:
+            await self.connect_to_server(server_name, self.servers[server_name])
+            return True
+        except Exception as e:
+            print(f"Error reconnecting to server {server_name}: {str(e)}")
+            return False
+    
     async def list_servers(self) -> List[str]:
         """List of all connected servers"""
         return list(self.sessions.keys())
@@ -146,6 +279,17 @@ class MCPClient:
             "server": server_name
         } for tool in response.tools]
     
+    async def list_all_tools(self) -> Dict[str, List[Dict]]:
+        """
+        Lists the tools of all connected servers concurrently
+        
+        Returns:
+            Dictionary mapping each server name to its tool information
+        """
+        server_names = list(self.sessions.keys())
+        tool_lists = await asyncio.gather(*(self.list_tools(name) for name in server_names))
+        return dict(zip(server_names, tool_lists))
+    
     async def call_tool(self, server_name: str, tool_name: str, arguments: Dict[str, Any]) -> Dict:
         """
         Calls a tool on a server
@@ -156,10 +300,10 @@ class MCPClient:
             arguments: Arguments for the tool
         
         Returns:
-            Result of the tool call
+            Result of the tool call; "delivered" is False if the request never reached the server
         """
         if server_name not in self.sessions:
-            return {"error": f"Server {server_name} not connected"}
+            return {"error": f"Server {server_name} not connected", "delivered": False}
         
         session = self.sessions[server_name]
         try:
@@ -168,15 +312,18 @@ class MCPClient:
                 "content": result.content,
                 "isError": result.isError
             }
+        except _UNSENT_ERRORS as e:
+            # The transport was already closed when the request was sent
+            return {"error": f"Connection to server {server_name} is lost: {e!r}", "delivered": False}
         except Exception as e:
             return {"error": str(e)}
     
     async def close(self) -> None:
         """Closes all connections and frees resources"""
-        if self.exit_stack:
-            await self.exit_stack.aclose()
-            self.exit_stack = None
-            self.sessions = {}
+        for server_name in list(self._exit_stacks):
+            await self._close_server(server_name)
+        self.sessions = {}
+        self._session_keys = {}
 
 # Singleton-Instanz
 _mcp_client_instance = None
@@ -197,11 +344,33 @@ def get_mcp_client(config_path: str = "mcp_config.json") -> MCPClient:
     return _mcp_client_instance
 
 # Asynchronous helper functions for Streamlit
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns the shared event loop, starting it in a daemon thread on first use
+    
+    Returns:
+        Event loop that runs for the lifetime of the process
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="mcp-event-loop", daemon=True).start()
+    return _loop
+
 def run_async(coroutine):
-    """Executes a coroutine in an asyncio event loop"""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+    """Executes a coroutine on the shared event loop and waits for its result"""
+    loop = _get_event_loop()
     try:
-        return loop.run_until_complete(coroutine)
-    finally:
-        loop.close()
\ No newline at end of file
+        running_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        running_loop = None
+    if running_loop is loop:
+        # Waiting here would block the loop the coroutine needs
+        coroutine.close()
+        raise RuntimeError("run_async cannot be called from the shared event loop")
+    # One long-lived loop keeps MCP sessions (and their stdio pipes) usable across reruns
+    return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
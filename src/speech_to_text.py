@@ -1,18 +1,19 @@
-from typing import Tuple, List
+from typing import Any, Callable, Tuple, List, Optional
 from api_providers.provider_factory import ProviderFactory
 from api_providers.base_provider import BaseAudioProvider
 
 class AudioTranscriber:
-    def __init__(self, provider: str, api_key: str):
+    def __init__(self, provider: str, api_key: str, **provider_options: Any):
         """
         Initialize AudioTranscriber with chosen provider
 
         Args:
-            provider: Provider name ('openai' or 'groq')
+            provider: Provider name ('openai', 'groq' or 'openrouter')
             api_key: API key for the provider
+            **provider_options: Extra provider arguments, e.g. openai_api_key and groq_api_key for 'openrouter'
         """
         self.provider = provider.lower()
-        self.audio_provider = ProviderFactory.get_audio_provider(provider, api_key)
+        self.audio_provider = ProviderFactory.get_audio_provider(provider, api_key, **provider_options)
 
     def transcribe_file(self, file_path: str, model: str) -> Tuple[str, bool]:
         """
@@ -27,6 +28,62 @@ class AudioTranscriber:
         """
         return self.audio_provider.transcribe_file(file_path, model)
 
+    def transcribe_bytes(self, audio_bytes: bytes, model: str, filename: str = "audio.wav", on_partial: Optional[Callable[[str], None]] = None) -> Tuple[str, bool]:
+        """
+        Transcribe in-memory audio using the selected provider
+
+        Args:
+            audio_bytes: Audio data as bytes
+            model: Model to use for transcription
+            filename: Original file name, used to detect the audio format
+            on_partial: Called with the transcript so far as slices of long audio complete (optional)
+
+        Returns:
+            Tuple containing (transcription_text, success_flag)
+        """
+        return self.audio_provider.transcribe_bytes(audio_bytes, model, filename, on_partial)
+
+    async def transcribe_file_async(self, file_path: str, model: str) -> Tuple[str, bool]:
+        """
+        Transcribe an audio file without blocking the event loop
+
+        Args:
+            file_path: Path to the audio file
+            model: Model to use for transcription
+
+        Returns:
+            Tuple containing (transcription_text, success_flag)
+        """
+        return await self.audio_provider.transcribe_file_async(file_path, model)
+
+    async def transcribe_bytes_async(self, audio_bytes: bytes, model: str, filename: str = "audio.wav") -> Tuple[str, bool]:
+        """
+        Transcribe in-memory audio without blocking the event loop
+
+        Args:
+            audio_bytes: Audio data as bytes
+            model: Model to use for transcription
+            filename: Original file name, used to detect the audio format
+
+        Returns:
+            Tuple containing (transcription_text, success_flag)
+        """
+        return await self.audio_provider.transcribe_bytes_async(audio_bytes, model, filename)
+
+    async def transcribe_files(self, file_paths: List[str], model: str, max_concurrency: Optional[int] = None) -> List[Tuple[str, bool]]:
+        """
+        Transcribe several audio files concurrently using the selected provider
+
+        Args:
+            file_paths: Paths to the audio files
+            model: Model to use for transcription
+            max_concurrency: Maximum number of parallel uploads (optional)
+
+        Returns:
+            List of (transcription_text, success_flag) tuples in the order of file_paths
+        """
+        return await self.audio_provider.transcribe_files(file_paths, model, max_concurrency)
+
     def get_available_models(self) -> List[str]:
         """
         Get available transcription models for the current provider
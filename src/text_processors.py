@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Callable, Optional, List, Dict
 from prompts import PromptTemplate
 from api_providers.provider_factory import ProviderFactory
 from api_providers.base_provider import BaseTextProvider
@@ -15,7 +15,7 @@ class TextProcessor:
         self.provider = provider.lower()
         self.text_provider = ProviderFactory.get_text_provider(provider, api_key)
 
-    def process_text(self, text: str, prompt_template: PromptTemplate, model: str = None, temperature: float = 0.2) -> Optional[str]:
+    def process_text(self, text: str, prompt_template: PromptTemplate, model: str = None, temperature: float = 0.2, messages: Optional[List[Dict[str, str]]] = None, on_chunk: Optional[Callable[[str], None]] = None) -> Optional[str]:
         """
         Process text with selected provider and prompt
 
@@ -24,11 +24,70 @@ class TextProcessor:
             prompt_template: Prompt template to use
             model: Model to use for processing (optional)
             temperature: Temperature parameter for generation (optional)
+            messages: Full chat history to send instead of the system prompt and text (optional)
+            on_chunk: Called with the reply received so far while it is streamed (optional)
 
         Returns:
             Processed text or None if processing failed
         """
-        return self.text_provider.process_text(text, prompt_template, model, temperature)
+        return self.text_provider.process_text(text, prompt_template, model, temperature, messages, on_chunk)
+
+    async def process_text_async(self, text: str, prompt_template: PromptTemplate, model: str = None, temperature: float = 0.2, messages: Optional[List[Dict[str, str]]] = None) -> Optional[str]:
+        """
+        Process text without blocking the event loop
+
+        Args:
+            text: Text to process
+            prompt_template: Prompt template to use
+            model: Model to use for processing (optional)
+            temperature: Temperature parameter for generation (optional)
+            messages: Full chat history to send instead of the system prompt and text (optional)
+
+        Returns:
+            Processed text or None if processing failed
+        """
+        return await self.text_provider.process_text_async(text, prompt_template, model, temperature, messages)
+
+    async def process_batch(self, texts: List[str], prompt_template: PromptTemplate, model: str = None, temperature: float = 0.2, max_concurrency: Optional[int] = None) -> List[Optional[str]]:
+        """
+        Process several texts concurrently using the selected provider
+
+        Args:
+            texts: Texts to process
+            prompt_template: Prompt template to use
+            model: Model to use for processing (optional)
+            temperature: Temperature parameter for generation (optional)
+            max_concurrency: Maximum number of parallel requests (optional)
+
+        Returns:
+            List of processed texts in the order of texts
+        """
+        return await self.text_provider.process_batch(texts, prompt_template, model, temperature, max_concurrency)
+
+    async def process_text_multi(self, text: str, prompt_templates: List[PromptTemplate], model: str = None, temperature: float = 0.2, max_concurrency: Optional[int] = None) -> List[Optional[str]]:
+        """
+        Process one text with several prompt templates using the selected provider
+
+        Args:
+            text: Text to process
+            prompt_templates: Prompt templates to apply
+            model: Model to use for processing (optional)
+            temperature: Temperature parameter for generation (optional)
+            max_concurrency: Maximum number of parallel requests (optional)
+
+        Returns:
+            List of processed texts in the order of prompt_templates
+        """
+        return await self.text_provider.process_text_multi(text, prompt_templates, model, temperature, max_concurrency)
+
+    def prewarm(self, model: str = None) -> None:
+        """
+        Warm up the provider connection before text is ready to be processed
+
+        Args:
+            model: Model that will be used for processing (optional)
+        """
+        self.text_provider.prewarm(model)
 
     def get_available_models(self) -> List[str]:
         """
@@ -0,0 +1,250 @@
+import io
+import tempfile
+import wave
+from contextlib import contextmanager
+from math import gcd
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Union
+
+import numpy as np
+
+# Sample rate expected by the Whisper transcription models
+TARGET_SAMPLE_RATE = 16000
+
+
+def sniff_audio_format(header: bytes) -> Optional[str]:
+    """
+    Detect the container format of audio data from its first bytes
+
+    Args:
+        header: At least the first 12 bytes of the audio data
+
+    Returns:
+        Format name such as "wav" or "webm", or None if unrecognised
+    """
+    if header[:4] == b'RIFF' and header[8:12] == b'WAVE':
+        return 'wav'
+    if header[:4] == b'\x1a\x45\xdf\xa3':
+        return 'webm'
+    if header[:4] == b'OggS':
+        return 'ogg'
+    if header[:4] == b'fLaC':
+        return 'flac'
+    if header[4:8] == b'ftyp':
+        return 'm4a'
+    if header[:3] == b'ID3' or (len(header) > 1 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return 'mp3'
+    return None
+
+
+@contextmanager
+def temporary_audio_file(audio_bytes: bytes, suffix: str = '.wav') -> Iterator[str]:
+    """
+    Write audio to a temporary file and remove it again when done
+
+    The file is closed before it is handed out, so on Windows it can be
+    deleted as soon as the caller has closed its own handle.
+
+    Args:
+        audio_bytes: Audio data as bytes
+        suffix: File extension, used by decoders to detect the format
+
+    Yields:
+        Path of the temporary file
+    """
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
+        tmp_file.write(audio_bytes)
+        tmp_path = tmp_file.name
+    try:
+        yield tmp_path
+    finally:
+        Path(tmp_path).unlink(missing_ok=True)
+
+
+def _lowpass_filter(up: int, down: int, taps_per_phase: int) -> np.ndarray:
+    """
+    Design the anti-aliasing filter for a polyphase resampler
+
+    Args:
+        up: Upsampling factor
+        down: Downsampling factor
+        taps_per_phase: Filter taps applied per output sample
+
+    Returns:
+        Windowed-sinc filter of length up * taps_per_phase, scaled by up
+    """
+    # Odd length keeps the group delay a whole number of samples; pad to fill the phases
+    length = up * taps_per_phase - 1
+    cutoff = 1.0 / max(up, down)
+    n = np.arange(length) - (length - 1) / 2
+    h = cutoff * np.sinc(cutoff * n) * np.hanning(length)
+    return np.append(h * (up / h.sum()), 0.0)
+
+
+def resample_poly(samples: np.ndarray, src_rate: int, dst_rate: int = TARGET_SAMPLE_RATE,
+                  taps_per_phase: int = 16, block_size: int = 65536) -> np.ndarray:
+    """
+    Resample a mono signal with a polyphase windowed-sinc filter
+
+    Args:
+        samples: 1-D array of samples
+        src_rate: Sample rate of the input
+        dst_rate: Sample rate of the output
+        taps_per_phase: Filter taps applied per output sample
+        block_size: Number of output samples computed per vectorized block
+
+    Returns:
+        Resampled signal as float64
+    """
+    g = gcd(src_rate, dst_rate)
+    up, down = dst_rate // g, src_rate // g
+    samples = np.asarray(samples, dtype=np.float64)
+    if up == down:
+        return samples
+
+    # Phase k of the filter for output m sits at h[(m * down + delay) % up + k * up]
+    phases = _lowpass_filter(up, down, taps_per_phase).reshape(taps_per_phase, up)
+    delay = (up * taps_per_phase - 2) // 2
+    padded = np.concatenate([np.zeros(taps_per_phase), samples, np.zeros(taps_per_phase)])
+    taps = np.arange(taps_per_phase)
+
+    out_len = len(samples) * up // down
+    out = np.empty(out_len)
+    for start in range(0, out_len, block_size):
+        t = np.arange(start, min(start + block_size, out_len), dtype=np.int64) * down + delay
+        base, phase = np.divmod(t, up)
+        window = padded[base[:, None] - taps + taps_per_phase]
+        out[start:start + len(t)] = np.einsum('mk,km->m', window, phases[:, phase])
+    return out
+
+
+def _pcm_to_int16_scale(frames: bytes, sample_width: int) -> Optional[np.ndarray]:
+    """
+    Decode little-endian PCM frames to floats on the 16-bit sample scale
+
+    Args:
+        frames: Raw PCM data
+        sample_width: Bytes per sample (1, 2, 3 or 4)
+
+    Returns:
+        Interleaved samples as float64, or None for unsupported widths
+    """
+    if sample_width == 1:
+        # 8-bit WAV is unsigned
+        return (np.frombuffer(frames, dtype=np.uint8).astype(np.float64) - 128.0) * 256.0
+    if sample_width == 2:
+        return np.frombuffer(frames, dtype='<i2').astype(np.float64)
+    if sample_width == 3:
+        # Widen packed 24-bit samples into the top bytes of int32
+        packed = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)
+        widened = np.zeros((len(packed), 4), dtype=np.uint8)
+        widened[:, 1:] = packed
+        return widened.view('<i4').ravel().astype(np.float64) / 65536.0
+    if sample_width == 4:
+        return np.frombuffer(frames, dtype='<i4').astype(np.float64) / 65536.0
+    return None
+
+
+def wav_to_mono_16k(source: Union[str, BinaryIO]) -> Optional[io.BytesIO]:
+    """
+    Convert an integer PCM WAV file to 16-bit 16 kHz mono without pydub or ffmpeg
+
+    Args:
+        source: Path or binary file object of the WAV data
+
+    Returns:
+        BytesIO named "audio.wav" ready for upload, or None if the file is not integer PCM WAV
+    """
+    try:
+        with wave.open(source, 'rb') as reader:
+            channels = reader.getnchannels()
+            rate = reader.getframerate()
+            sample_width = reader.getsampwidth()
+            frames = reader.readframes(reader.getnframes())
+    except (wave.Error, EOFError):
+        return None
+
+    if channels == 1 and rate == TARGET_SAMPLE_RATE and sample_width == 2:
+        # Already in the upload format (e.g. mic recordings); keep the samples as they are
+        pcm = frames
+    else:
+        samples = _pcm_to_int16_scale(frames, sample_width)
+        if samples is None:
+            return None
+        samples = samples.reshape(-1, channels).mean(axis=1)
+        resampled = resample_poly(samples, rate)
+        pcm = np.clip(np.rint(resampled), -32768, 32767).astype('<i2').tobytes()
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(TARGET_SAMPLE_RATE)
+        writer.writeframes(pcm)
+    buffer.seek(0)
+    buffer.name = "audio.wav"
+    return buffer
+
+
+def slice_wav(source: BinaryIO, slice_sec: float = 30.0, overlap_sec: float = 1.0) -> List[io.BytesIO]:
+    """
+    Split a WAV file into overlapping slices of equal length
+
+    Args:
+        source: Binary file object of the WAV data
+        slice_sec: Length of each slice in seconds
+        overlap_sec: Audio shared by neighbouring slices in seconds
+
+    Returns:
+        List of in-memory WAV slices, a single slice if the audio is short enough
+    """
+    source.seek(0)
+    with wave.open(source, 'rb') as reader:
+        params = reader.getparams()
+        frames = reader.readframes(params.nframes)
+    source.seek(0)
+
+    frame_size = params.nchannels * params.sampwidth
+    slice_frames = int(slice_sec * params.framerate)
+    step = slice_frames - int(overlap_sec * params.framerate)
+    if params.nframes <= slice_frames or step <= 0:
+        return [source]
+
+    slices = []
+    for start in range(0, params.nframes - int(overlap_sec * params.framerate), step):
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as writer:
+            writer.setparams(params)
+            writer.writeframes(frames[start * frame_size:(start + slice_frames) * frame_size])
+        buffer.seek(0)
+        buffer.name = f"audio_{len(slices)}.wav"
+        slices.append(buffer)
+    return slices
+
+
+def _normalize_word(word: str) -> str:
+    """Lower-case a word and strip surrounding punctuation for seam matching"""
+    return word.strip(".,;:!?\"'()[]").lower()
+
+
+def merge_transcripts(texts: List[str], max_overlap_words: int = 20) -> str:
+    """
+    Join transcripts of overlapping slices, dropping words repeated at the seams
+
+    Args:
+        texts: Transcripts in slice order
+        max_overlap_words: Longest run of repeated words to look for at each seam
+
+    Returns:
+        Combined transcript
+    """
+    words: List[str] = []
+    for text in texts:
+        next_words = text.split()
+        overlap = 0
+        for size in range(min(max_overlap_words, len(words), len(next_words)), 0, -1):
+            if [_normalize_word(w) for w in words[-size:]] == [_normalize_word(w) for w in next_words[:size]]:
+                overlap = size
+                break
+        words.extend(next_words[overlap:])
+    return " ".join(words)
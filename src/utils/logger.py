@@ -20,17 +20,17 @@ class AppLogger:
             
         self.logger.addHandler(console_handler)
         
-    def info(self, message: str) -> None:
-        self.logger.info(message)
+    def info(self, message: str, *args) -> None:
+        self.logger.info(message, *args)
         
-    def error(self, message: str) -> None:
-        self.logger.error(message)
+    def error(self, message: str, *args) -> None:
+        self.logger.error(message, *args)
         
-    def warning(self, message: str) -> None:
-        self.logger.warning(message)
+    def warning(self, message: str, *args) -> None:
+        self.logger.warning(message, *args)
         
-    def debug(self, message: str) -> None:
-        self.logger.debug(message)
+    def debug(self, message: str, *args) -> None:
+        self.logger.debug(message, *args)
 
 
 # Cache for loggers to avoid creating multiple instances
@@ -0,0 +1,120 @@
+import functools
+import importlib.util
+import re
+from typing import Dict, List, Optional
+
+# tiktoken is optional; without it token counts fall back to a character estimate
+_TIKTOKEN_AVAILABLE = importlib.util.find_spec("tiktoken") is not None
+
+# Context windows of the default chat models, in tokens
+CONTEXT_WINDOWS: Dict[str, int] = {
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-3.5-turbo": 16385,
+    "o1": 200000,
+    "o1-mini": 128000,
+    "o3-mini": 200000,
+    "llama-3.3-70b-versatile": 128000,
+    "llama-3.1-8b-instant": 128000,
+    "llama-guard-3-8b": 8192,
+    "gemma2-9b-it": 8192,
+}
+
+# Model ids that spell out their context window, e.g. "mixtral-8x7b-32768"; such
+# windows are powers of two of at least 8192, unlike date suffixes such as "-0613"
+_CONTEXT_SUFFIX_RE = re.compile(r'-(\d{4,6})$')
+_MIN_SUFFIX_WINDOW = 8192
+
+# Tokens added per chat message for role and separators
+_TOKENS_PER_MESSAGE = 4
+
+
+@functools.lru_cache(maxsize=16)
+def _get_encoder(model: Optional[str]):
+    """
+    Load the tiktoken encoding for a model, cached per model
+
+    Args:
+        model: Model id, with or without provider prefix, or None for the default encoding
+
+    Returns:
+        tiktoken Encoding, or None if tiktoken or its encoding files are unavailable
+    """
+    if not _TIKTOKEN_AVAILABLE:
+        return None
+
+    import tiktoken
+    try:
+        if model:
+            try:
+                return tiktoken.encoding_for_model(model.split('/')[-1])
+            except KeyError:
+                pass
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # Encoding files are downloaded on first use and may be unreachable
+        return None
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Count the tokens of a text, exactly for OpenAI models and approximately otherwise
+
+    Args:
+        text: Text to count
+        model: Model the text is sent to (optional)
+
+    Returns:
+        Number of tokens
+    """
+    encoder = _get_encoder(model)
+    if encoder is None:
+        # Rough approximation: 4 characters per token
+        return len(text) // 4
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def context_window(model: str) -> Optional[int]:
+    """
+    Look up the context window of a chat model
+
+    Args:
+        model: Model id, with or without provider prefix
+
+    Returns:
+        Context window in tokens, or None if unknown
+    """
+    base_model = model.split('/')[-1].lower()
+    if base_model in CONTEXT_WINDOWS:
+        return CONTEXT_WINDOWS[base_model]
+    match = _CONTEXT_SUFFIX_RE.search(base_model)
+    if not match:
+        return None
+    window = int(match.group(1))
+    if window < _MIN_SUFFIX_WINDOW or window & (window - 1):
+        return None
+    return window
+
+
+def check_context_length(messages: List[Dict[str, str]], model: str) -> Optional[str]:
+    """
+    Reject chat requests that cannot fit the model's context window before sending them
+
+    Only checked when tiktoken is available, so estimates never block a request.
+
+    Args:
+        messages: Chat messages to send
+        model: Model the messages are sent to
+
+    Returns:
+        Error message if the messages are too long, otherwise None
+    """
+    limit = context_window(model)
+    if limit is None or _get_encoder(model) is None:
+        return None
+
+    total = sum(count_tokens(message.get("content") or "", model) + _TOKENS_PER_MESSAGE for message in messages)
+    if total > limit:
+        return "Error: Text is too long for this model. Please use a shorter text or select a model with larger context window."
+    return None
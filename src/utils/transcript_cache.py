@@ -0,0 +1,120 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Default location of cached transcripts, overridable with TRANSCRIPT_CACHE_DIR
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "speech-to-text")
+
+
+def file_sha256(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Hash the contents of a file without loading it into memory
+
+    Args:
+        file_path: Path to the file
+        chunk_size: Bytes read per step on Python versions without hashlib.file_digest
+
+    Returns:
+        Hex digest of the file contents
+    """
+    with open(file_path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+
+class TranscriptCache:
+    """Content-addressed disk cache of transcripts, keyed by audio hash, provider and model"""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR):
+        """
+        Initialize the cache
+
+        Args:
+            directory: Directory holding one text file per cached transcript
+        """
+        self.directory = directory
+
+    @staticmethod
+    def make_key(audio_digest: str, provider: str, model: str) -> str:
+        """
+        Build the cache key of a transcript
+
+        Args:
+            audio_digest: Hex digest of the audio data
+            provider: Name of the provider class that transcribed the audio
+            model: Transcription model
+
+        Returns:
+            Hex digest identifying the transcript
+        """
+        return hashlib.sha256(f"{audio_digest}\0{provider}\0{model}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.txt")
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached transcript
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Cached transcript, or None on a miss
+        """
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, key: str, text: str) -> None:
+        """
+        Store a transcript; failures to write are ignored
+
+        Args:
+            key: Cache key from make_key
+            text: Transcript to store
+        """
+        tmp_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write to a temp file first so readers never see partial transcripts
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning("Could not cache transcript: %s", e)
+            if tmp_path:
+                Path(tmp_path).unlink(missing_ok=True)
+
+
+_default_cache: Optional[TranscriptCache] = None
+
+
+def get_transcript_cache() -> Optional[TranscriptCache]:
+    """
+    Get the process-wide transcript cache
+
+    Returns:
+        Shared TranscriptCache, or None if TRANSCRIPT_CACHE_DIR is set to an empty string
+    """
+    global _default_cache
+    directory = os.getenv("TRANSCRIPT_CACHE_DIR", DEFAULT_CACHE_DIR)
+    if not directory:
+        return None
+    if _default_cache is None or _default_cache.directory != directory:
+        _default_cache = TranscriptCache(directory)
+    return _default_cache
@@ -2,18 +2,33 @@
 Integration tests for the overall application flow
 """
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import ANY, patch, MagicMock
 import tempfile
 import os
 import json
 from src.speech_to_text import AudioTranscriber
 from src.text_processors import TextProcessor
-from src.app import TranscriptionApp
+from src.app import TranscriptionApp, _get_text_processor, _get_transcriber
 from src.prompts import PromptTemplate
 
 # Mark this module as containing integration tests
 pytestmark = pytest.mark.integration
 
+class SessionState(dict):
+    """Dictionary with attribute access, standing in for st.session_state"""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+    def __delattr__(self, name):
+        del self[name]
+
 class TestAppFlow:
     """Integration tests for the application flow"""
     
@@ -28,8 +43,11 @@ class TestAppFlow:
     def mock_streamlit(self):
         """Mock Streamlit functionality"""
         with patch('src.app.st') as mock_st:
-            # Setup session state as a simple dictionary
-            mock_st.session_state = {}
+            # Session state supports both item and attribute access, like Streamlit's
+            mock_st.session_state = SessionState()
+            # Providers built by earlier tests must not leak in through the resource cache
+            _get_transcriber.clear()
+            _get_text_processor.clear()
             yield mock_st
     
     @pytest.fixture
@@ -54,7 +72,7 @@ class TestAppFlow:
             
             # Mock the transcriber
             mock_transcriber_instance = MagicMock()
-            mock_transcriber_instance.transcribe_file.return_value = ("Transcription result", True)
+            mock_transcriber_instance.transcribe_bytes.return_value = ("Transcription result", True)
             mock_transcriber_instance.get_available_models.return_value = ["whisper-large-v3"]
             MockTranscriber.return_value = mock_transcriber_instance
             
@@ -79,6 +97,7 @@ class TestAppFlow:
             # Create a mock file uploader result
             mock_uploaded_file = MagicMock()
             mock_uploaded_file.getvalue.return_value = b'test audio content'
+            mock_uploaded_file.name = "test.wav"
             
             # Create a mock prompt template
             mock_prompt = PromptTemplate(
@@ -96,11 +115,17 @@ class TestAppFlow:
             )
             
             # Assert
-            mock_transcriber_instance.transcribe_file.assert_called_once()
+            mock_transcriber_instance.transcribe_bytes.assert_called_once_with(
+                b'test audio content',
+                model="whisper-large-v3",
+                filename="test.wav",
+                on_partial=ANY
+            )
             mock_processor_instance.process_text.assert_called_once_with(
                 "Transcription result", 
                 mock_prompt, 
-                model="llama-3.3-70b-versatile"
+                model="llama-3.3-70b-versatile",
+                on_chunk=ANY
             )
             
             # Clean up
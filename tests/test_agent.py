@@ -4,7 +4,8 @@ Unit tests for the Agent class
 import pytest
 from unittest.mock import patch, MagicMock, AsyncMock
 import asyncio
-from src.agents.agent import Agent, Tool
+from src.agents.agent import Agent, Tool, _parse_tool_call
+from src.agents.tools.think import ThinkTool
 
 class TestAgent:
     """Test cases for the Agent class"""
@@ -15,6 +16,7 @@ class TestAgent:
         mock_tool = MagicMock(spec=Tool)
         mock_tool.name = "mock_tool"
         mock_tool.description = "A mock tool for testing"
+        mock_tool.is_sync_fast = False
         mock_tool.execute = AsyncMock(return_value={"result": "Tool executed", "isError": False})
         return mock_tool
     
@@ -23,11 +25,14 @@ class TestAgent:
         """Create a mock MCP integration for testing"""
         with patch('src.agents.agent.get_mcp_integration') as mock_get_integration:
             mock_integration = MagicMock()
-            mock_integration.get_available_servers.return_value = ["test_server"]
-            mock_integration.get_available_tools.return_value = [
+            mock_integration.get_configured_servers.return_value = []
+            mock_integration.connect = AsyncMock()
+            mock_integration.disconnect = AsyncMock()
+            mock_integration.get_available_servers = AsyncMock(return_value=["test_server"])
+            mock_integration.get_available_tools = AsyncMock(return_value=[
                 {"name": "test_tool", "description": "A test MCP tool"}
-            ]
-            mock_integration.call_tool.return_value = {"result": "MCP tool executed", "isError": False}
+            ])
+            mock_integration.call_tool = AsyncMock(return_value={"result": "MCP tool executed", "isError": False})
             
             mock_get_integration.return_value = mock_integration
             yield mock_integration
@@ -77,6 +82,29 @@ class TestAgent:
         assert tools["mock_tool"]["type"] == "local"
         assert tools["server:tool"]["type"] == "mcp"
     
+    @pytest.mark.asyncio
+    async def test_connect_discovers_tools(self, mock_tool, mock_mcp_integration):
+        """Test that connecting discovers tools from every server"""
+        # Arrange
+        mock_mcp_integration.get_available_servers.return_value = ["server1", "server2"]
+        mock_mcp_integration.get_available_tools.side_effect = [
+            [{"name": "tool1", "description": "Tool 1"}],
+            [{"name": "tool2", "description": "Tool 2"}]
+        ]
+        agent = Agent(
+            name="TestAgent",
+            system="Test system prompt",
+            tools=[mock_tool]
+        )
+        
+        # Act
+        await agent.connect()
+        
+        # Assert
+        assert set(agent.mcp_tools) == {"server1:tool1", "server2:tool2"}
+        assert agent.mcp_tools["server2:tool2"]["server"] == "server2"
+        assert mock_mcp_integration.get_available_tools.call_count == 2
+    
     @pytest.mark.asyncio
     async def test_execute_local_tool(self, mock_tool, mock_mcp_integration):
         """Test executing a local tool"""
@@ -94,6 +122,25 @@ class TestAgent:
         assert result == {"result": "Tool executed", "isError": False}
         mock_tool.execute.assert_called_once_with({"arg": "value"})
     
+    @pytest.mark.asyncio
+    async def test_execute_sync_fast_tool(self, mock_mcp_integration):
+        """Test that fast tools are run without awaiting execute"""
+        # Arrange
+        fast_tool = ThinkTool()
+        fast_tool.execute = AsyncMock()
+        agent = Agent(
+            name="TestAgent",
+            system="Test system prompt",
+            tools=[fast_tool]
+        )
+        
+        # Act
+        result = await agent.execute_tool("think", {"thought": "plan"})
+        
+        # Assert
+        assert result == {"result": "I thought about: plan", "isError": False}
+        fast_tool.execute.assert_not_called()
+    
     @pytest.mark.asyncio
     async def test_execute_mcp_tool(self, mock_tool, mock_mcp_integration):
         """Test executing an MCP tool"""
@@ -120,6 +167,27 @@ class TestAgent:
         assert result == {"result": "MCP tool executed", "isError": False}
         mock_mcp_integration.call_tool.assert_called_once_with("test_server", "test_tool", {"arg": "value"})
     
+    def test_agent_prompt_cache(self, mock_tool, mock_mcp_integration):
+        """Test that the agent prompt is reused until the system prompt changes"""
+        # Arrange
+        agent = Agent(
+            name="TestAgent",
+            system="Test system prompt",
+            tools=[mock_tool]
+        )
+        
+        # Act
+        first_prompt = agent._get_agent_prompt()
+        second_prompt = agent._get_agent_prompt()
+        agent.system = "Updated system prompt"
+        updated_prompt = agent._get_agent_prompt()
+        
+        # Assert
+        assert first_prompt is second_prompt
+        assert "- mock_tool (local): A mock tool for testing" in first_prompt.system_prompt
+        assert updated_prompt is not first_prompt
+        assert "Updated system prompt" in updated_prompt.system_prompt
+    
     @pytest.mark.asyncio
     async def test_process_method(self, mock_tool, mock_mcp_integration):
         """Test the process method with the new implementation"""
@@ -167,4 +235,53 @@ class TestAgent:
         # Assert
         assert response == "Final response after tool execution"
         assert agent.text_processor.process_text.call_count == 2
-        mock_tool.execute.assert_called_once_with({"arg": "value"})
\ No newline at end of file
+        mock_tool.execute.assert_called_once_with({"arg": "value"})
+        # The follow-up call carries the whole exchange
+        history = agent.text_processor.process_text.call_args.kwargs["messages"]
+        assert [message["role"] for message in history] == ["system", "user", "assistant", "user"]
+    
+    @pytest.mark.asyncio
+    async def test_process_streams_final_response(self, mock_tool, mock_mcp_integration):
+        """Test that the reply after a tool call is streamed to the callback"""
+        # Arrange
+        agent = Agent(
+            name="TestAgent",
+            system="Test system prompt",
+            tools=[mock_tool]
+        )
+        
+        def process_text(text, prompt, model=None, messages=None, on_chunk=None):
+            if messages is None:
+                return '{"tool": "mock_tool", "args": {}}'
+            for partial in ("Final", "Final response"):
+                on_chunk(partial)
+            return "Final response"
+        
+        agent.text_processor = MagicMock()
+        agent.text_processor.provider = "groq"
+        agent.text_processor.process_text.side_effect = process_text
+        updates = []
+        
+        async def callback(chunk):
+            updates.append(chunk)
+        
+        # Act
+        response = await agent.process("Hello, use a tool!", callback)
+        
+        # Assert
+        assert response == "Final response"
+        assert updates[0] == "Executing tool: mock_tool..."
+        assert "on_chunk" in agent.text_processor.process_text.call_args.kwargs
+        assert updates[-1] == "Final response"
+    
+    def test_parse_tool_call(self):
+        """Test extracting tool calls from fenced and inline JSON"""
+        # Act & Assert
+        assert _parse_tool_call('```json\n{"tool": "think", "args": {"thought": "a {b}"}}\n```') == {
+            "tool": "think", "args": {"thought": "a {b}"}
+        }
+        assert _parse_tool_call('Let me check. {"tool": "think", "args": {}} Done.') == {
+            "tool": "think", "args": {}
+        }
+        assert _parse_tool_call("Just a normal answer") is None
+        assert _parse_tool_call("Broken {json") is None
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""
+Unit tests for the audio helpers
+"""
+import hashlib
+import io
+import os
+import wave
+from unittest.mock import patch
+import numpy as np
+from src.utils.audio import merge_transcripts, resample_poly, slice_wav, sniff_audio_format, temporary_audio_file, wav_to_mono_16k
+from src.utils.transcript_cache import TranscriptCache, file_sha256
+
+class TestAudioUtils:
+    """Test cases for the in-process audio helpers"""
+
+    def test_resample_poly_preserves_tone(self):
+        """Test that a 440 Hz tone survives resampling from 44.1 kHz to 16 kHz"""
+        # Arrange
+        t = np.arange(44100) / 44100
+        tone = 10000 * np.sin(2 * np.pi * 440 * t)
+
+        # Act
+        resampled = resample_poly(tone, 44100)
+
+        # Assert
+        expected = 10000 * np.sin(2 * np.pi * 440 * np.arange(len(resampled)) / 16000)
+        assert len(resampled) == 16000
+        assert np.abs(resampled[500:-500] - expected[500:-500]).max() < 50
+
+    def test_wav_to_mono_16k(self):
+        """Test converting stereo 48 kHz PCM WAV to 16 kHz mono"""
+        # Arrange
+        source = io.BytesIO()
+        with wave.open(source, 'wb') as writer:
+            writer.setnchannels(2)
+            writer.setsampwidth(2)
+            writer.setframerate(48000)
+            writer.writeframes(np.zeros(2 * 4800, dtype='<i2').tobytes())
+        source.seek(0)
+
+        # Act
+        converted = wav_to_mono_16k(source)
+
+        # Assert
+        with wave.open(converted, 'rb') as reader:
+            assert reader.getnchannels() == 1
+            assert reader.getframerate() == 16000
+            assert reader.getnframes() == 1600
+        assert converted.name == "audio.wav"
+        assert wav_to_mono_16k(io.BytesIO(b"not a wav file")) is None
+
+    def test_wav_to_mono_16k_keeps_16k_mono_samples(self):
+        """Test that audio already in the upload format is passed through sample for sample"""
+        # Arrange
+        frames = np.arange(-800, 800, dtype='<i2').tobytes()
+        source = io.BytesIO()
+        with wave.open(source, 'wb') as writer:
+            writer.setnchannels(1)
+            writer.setsampwidth(2)
+            writer.setframerate(16000)
+            writer.writeframes(frames)
+        source.seek(0)
+
+        # Act
+        converted = wav_to_mono_16k(source)
+
+        # Assert
+        with wave.open(converted, 'rb') as reader:
+            assert reader.readframes(reader.getnframes()) == frames
+
+    def test_wav_to_mono_16k_converts_24_bit(self):
+        """Test that 24-bit PCM is decoded in-process and scaled to 16 bits"""
+        # Arrange
+        source = io.BytesIO()
+        sample = (1000 * 256).to_bytes(3, 'little', signed=True)
+        with wave.open(source, 'wb') as writer:
+            writer.setnchannels(1)
+            writer.setsampwidth(3)
+            writer.setframerate(16000)
+            writer.writeframes(sample * 1600)
+        source.seek(0)
+
+        # Act
+        converted = wav_to_mono_16k(source)
+
+        # Assert
+        with wave.open(converted, 'rb') as reader:
+            assert reader.getsampwidth() == 2
+            samples = np.frombuffer(reader.readframes(reader.getnframes()), dtype='<i2')
+        assert np.all(samples == 1000)
+
+    def test_sniff_audio_format(self):
+        """Test detecting containers from their magic bytes"""
+        # Act & Assert
+        assert sniff_audio_format(b'RIFF\x00\x00\x00\x00WAVEfmt ') == 'wav'
+        assert sniff_audio_format(b'\x1a\x45\xdf\xa3\x9f\x42\x86\x81\x01\x42\xf7\x81') == 'webm'
+        assert sniff_audio_format(b'\x00\x00\x00\x20ftypM4A ') == 'm4a'
+        assert sniff_audio_format(b'ID3\x04\x00\x00\x00\x00\x00\x00\x00\x00') == 'mp3'
+        assert sniff_audio_format(b'not audio at all') is None
+
+    def test_slice_wav_overlapping_slices(self):
+        """Test that long audio is split into overlapping slices covering the whole file"""
+        # Arrange
+        source = io.BytesIO()
+        with wave.open(source, 'wb') as writer:
+            writer.setnchannels(1)
+            writer.setsampwidth(2)
+            writer.setframerate(16000)
+            writer.writeframes(np.zeros(16000 * 70, dtype='<i2').tobytes())
+        source.seek(0)
+
+        # Act
+        slices = slice_wav(source, slice_sec=30, overlap_sec=1)
+
+        # Assert
+        lengths = []
+        for audio_slice in slices:
+            with wave.open(audio_slice, 'rb') as reader:
+                lengths.append(reader.getnframes() / 16000)
+        assert lengths == [30, 30, 12]
+
+    def test_merge_transcripts_drops_repeated_seam_words(self):
+        """Test that words transcribed twice in the overlap appear once"""
+        # Act
+        merged = merge_transcripts(["Hello there, how are", "How are you today?", "Fine."])
+
+        # Assert
+        assert merged == "Hello there, how are you today? Fine."
+
+    def test_temporary_audio_file_removed_after_use(self):
+        """Test that the temporary audio file exists inside the block and is deleted afterwards"""
+        # Act
+        with temporary_audio_file(b"RIFF", '.mp3') as tmp_path:
+            with open(tmp_path, 'rb') as f:
+                content = f.read()
+
+        # Assert
+        assert content == b"RIFF"
+        assert tmp_path.endswith('.mp3')
+        assert not os.path.exists(tmp_path)
+
+    def test_file_sha256_matches_in_memory_hash(self, tmp_path):
+        """Test that chunked file hashing gives the same digest as hashing the whole content"""
+        # Arrange
+        data = os.urandom(3 * 1024 + 5)
+        path = tmp_path / "audio.wav"
+        path.write_bytes(data)
+
+        # Act
+        digest = file_sha256(str(path), chunk_size=1024)
+
+        # Assert
+        assert digest == hashlib.sha256(data).hexdigest()
+
+    def test_transcript_cache_removes_temp_file_on_failed_write(self, tmp_path):
+        """Test that a failed cache write leaves no temporary file behind"""
+        # Arrange
+        cache = TranscriptCache(str(tmp_path))
+
+        # Act
+        with patch('src.utils.transcript_cache.os.replace', side_effect=OSError("disk full")):
+            cache.put("key", "transcript")
+
+        # Assert
+        assert list(tmp_path.iterdir()) == []
+        assert cache.get("key") is None
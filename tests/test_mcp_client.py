@@ -3,10 +3,11 @@ Unit tests for the MCP client
 """
 import pytest
 from unittest.mock import patch, MagicMock, AsyncMock
+import asyncio
 import json
 import os
 import tempfile
-from src.mcp_client import MCPClient, get_mcp_client, run_async
+from src.mcp_client import MCPClient, _convert_path, get_mcp_client, run_async
 
 class TestMCPClient:
     """Test cases for the MCPClient class"""
@@ -94,6 +95,84 @@ class TestMCPClient:
             mock_session.initialize.assert_called_once()
             mock_session.list_tools.assert_called_once()
     
+    @pytest.mark.asyncio
+    async def test_connect_to_servers_reuses_live_session(self, temp_config_file):
+        """Test that a live session with an unchanged configuration is reused"""
+        # Arrange
+        client = MCPClient(config_path=temp_config_file)
+        mock_session = MagicMock()
+        mock_session.send_ping = AsyncMock()
+        client.sessions = {"test-server": mock_session}
+        client._session_keys = {"test-server": MCPClient._config_key(client.servers["test-server"])}
+        
+        with patch.object(client, 'connect_to_server', AsyncMock()) as mock_connect:
+            # Act
+            await client.connect_to_servers()
+            
+            # Assert
+            mock_session.send_ping.assert_called_once()
+            mock_connect.assert_not_called()
+            assert client.sessions["test-server"] is mock_session
+    
+    @pytest.mark.asyncio
+    async def test_reconnect_replaces_dead_session(self, temp_config_file):
+        """Test that reconnecting closes the old transport before starting a new one"""
+        # Arrange
+        client = MCPClient(config_path=temp_config_file)
+        old_exit_stack = MagicMock()
+        old_exit_stack.aclose = AsyncMock()
+        client._exit_stacks = {"test-server": old_exit_stack}
+        client.sessions = {"test-server": MagicMock()}
+        
+        with patch('src.mcp_client.stdio_client', side_effect=OSError("spawn failed")) as mock_stdio_client:
+            # Act
+            reconnected = await client.reconnect("test-server")
+            missing = await client.reconnect("unknown-server")
+            
+            # Assert
+            assert reconnected is False
+            assert missing is False
+            old_exit_stack.aclose.assert_called_once()
+            mock_stdio_client.assert_called_once()
+            assert "test-server" not in client.sessions
+            assert "test-server" not in client._exit_stacks
+    
+    @pytest.mark.asyncio
+    async def test_ping_only_fails_on_lost_connection(self, temp_config_file):
+        """Test that an error reply keeps the session while a closed transport does not"""
+        # Arrange
+        import anyio
+        client = MCPClient(config_path=temp_config_file)
+        mock_session = MagicMock()
+        mock_session.send_ping = AsyncMock(side_effect=[RuntimeError("busy"), anyio.ClosedResourceError()])
+        client.sessions = {"test-server": mock_session}
+        
+        # Act
+        error_reply = await client.ping("test-server")
+        closed = await client.ping("test-server")
+        
+        # Assert
+        assert error_reply is True
+        assert closed is False
+    
+    @pytest.mark.asyncio
+    async def test_call_tool_marks_undelivered_requests(self, temp_config_file):
+        """Test that only a request that never reached the server is marked as undelivered"""
+        # Arrange
+        import anyio
+        client = MCPClient(config_path=temp_config_file)
+        mock_session = MagicMock()
+        mock_session.call_tool = AsyncMock(side_effect=[anyio.ClosedResourceError(), RuntimeError("tool failed")])
+        client.sessions = {"test-server": mock_session}
+        
+        # Act
+        unsent = await client.call_tool("test-server", "test-tool", {})
+        failed = await client.call_tool("test-server", "test-tool", {})
+        
+        # Assert
+        assert unsent["delivered"] is False
+        assert "delivered" not in failed
+    
     @pytest.mark.asyncio
     async def test_list_servers(self, temp_config_file):
         """Test listing servers"""
@@ -135,6 +214,30 @@ class TestMCPClient:
         assert tools[1]["description"] == "Tool 2 description"
         assert tools[1]["server"] == "test-server"
     
+    @pytest.mark.asyncio
+    async def test_list_all_tools(self, temp_config_file):
+        """Test listing the tools of every connected server"""
+        # Arrange
+        client = MCPClient(config_path=temp_config_file)
+        sessions = {}
+        for server_name in ("server1", "server2"):
+            tool = MagicMock(description=f"{server_name} tool")
+            tool.name = f"{server_name}-tool"
+            session = MagicMock()
+            session.list_tools = AsyncMock()
+            session.list_tools.return_value.tools = [tool]
+            sessions[server_name] = session
+        client.sessions = sessions
+        
+        # Act
+        tools_by_server = await client.list_all_tools()
+        
+        # Assert
+        assert list(tools_by_server) == ["server1", "server2"]
+        assert tools_by_server["server2"] == [{"name": "server2-tool", "description": "server2 tool", "server": "server2"}]
+        for session in sessions.values():
+            session.list_tools.assert_awaited_once()
+    
     @pytest.mark.asyncio
     async def test_call_tool(self, temp_config_file):
         """Test calling a tool on a server"""
@@ -176,7 +279,7 @@ class TestMCPClient:
         client = MCPClient(config_path=temp_config_file)
         mock_exit_stack = MagicMock()
         mock_exit_stack.aclose = AsyncMock()
-        client.exit_stack = mock_exit_stack
+        client._exit_stacks = {"server1": mock_exit_stack}
         client.sessions = {"server1": MagicMock()}
         
         # Act
@@ -184,4 +287,27 @@ class TestMCPClient:
         
         # Assert
         mock_exit_stack.aclose.assert_called_once()
-        assert client.sessions == {}
\ No newline at end of file
+        assert client.sessions == {}
+        assert client._exit_stacks == {}
+    
+    def test_run_async_reuses_one_event_loop(self):
+        """Test that run_async runs every coroutine on the same long-lived loop"""
+        # Arrange
+        async def current_loop():
+            return asyncio.get_running_loop()
+        
+        # Act
+        first = run_async(current_loop())
+        second = run_async(current_loop())
+        
+        # Assert
+        assert first is second
+        assert first.is_running()
+    
+    def test_convert_path_between_windows_and_wsl(self):
+        """Test that path arguments are rewritten for the platform the server runs on"""
+        # Act & Assert
+        assert _convert_path("C:\\servers\\weather.py", "wsl") == "/mnt/c/servers/weather.py"
+        assert _convert_path("/mnt/d/servers/weather.py", "windows") == "D:\\servers\\weather.py"
+        assert _convert_path("run", "wsl") == "run"
+        assert _convert_path("C:\\servers\\weather.py", "other") == "C:\\servers\\weather.py"
@@ -0,0 +1,65 @@
+"""
+Unit tests for the speech agent tools
+"""
+import pytest
+import asyncio
+from unittest.mock import MagicMock
+from src.agents.speech_agent import SpeechAgent, TextProcessingTool
+
+class TestTextProcessingTool:
+    """Test cases for the TextProcessingTool class"""
+
+    @pytest.mark.asyncio
+    async def test_execute_passes_request_to_text_processor(self):
+        """Test that a request is sent once to the text processor, which coalesces duplicates itself"""
+        # Arrange
+        text_processor = MagicMock()
+        text_processor.process_text.return_value = "Processed"
+        tool = TextProcessingTool(text_processor, "test-model")
+        
+        # Act
+        result = await tool.execute({"text": "Hello", "system_prompt": "Be brief"})
+        
+        # Assert
+        assert result == {"result": "Processed", "isError": False}
+        args, kwargs = text_processor.process_text.call_args
+        assert args[0] == "Hello"
+        assert args[1].system_prompt == "Be brief"
+        assert kwargs == {"model": "test-model", "on_chunk": None}
+
+    @pytest.mark.asyncio
+    async def test_streamed_reply_forwarded_to_callback(self):
+        """Test that chunks streamed from a worker thread reach the progress callback in order"""
+        # Arrange
+        def process_text(text, prompt, model=None, on_chunk=None):
+            for partial in ("Pro", "Processed"):
+                on_chunk(partial)
+            return "Processed"
+
+        text_processor = MagicMock()
+        text_processor.process_text.side_effect = process_text
+        tool = TextProcessingTool(text_processor, "test-model")
+        updates = []
+
+        async def callback(status_type, status_text, additional_info=""):
+            updates.append((status_type, status_text))
+
+        partials = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        forward_task = asyncio.create_task(SpeechAgent._forward_partials(
+            partials, lambda partial: callback("processed_partial", partial)
+        ))
+
+        # Act
+        result = await tool.execute({
+            "text": "Hello",
+            "system_prompt": "Be brief",
+            "on_chunk": lambda partial: loop.call_soon_threadsafe(partials.put_nowait, partial)
+        })
+        partials.put_nowait(None)
+        await forward_task
+
+        # Assert
+        assert result == {"result": "Processed", "isError": False}
+        assert updates[-1] == ("processed_partial", "Processed")
+        assert all(status_type == "processed_partial" for status_type, _ in updates)
@@ -0,0 +1,146 @@
+"""
+Unit tests for the text processing providers
+"""
+import pytest
+from unittest.mock import MagicMock, patch
+from src.api_providers.base_provider import BaseTextProvider, RateLimiter
+from src.prompts import PromptTemplate
+from src.utils import tokens
+
+class TestBaseTextProvider:
+    """Test cases for the shared BaseTextProvider helpers"""
+
+    @pytest.mark.asyncio
+    async def test_process_batch_keeps_order_and_errors(self):
+        """Test that batch processing returns results in input order and reports failures"""
+        # Arrange
+        class FakeProvider(BaseTextProvider):
+            def process_text(self, text, prompt_template, model=None, temperature=0.2, messages=None):
+                if text == "broken":
+                    raise RuntimeError("request failed")
+                return text.upper()
+
+            def get_available_chat_models(self):
+                return []
+
+        prompt = PromptTemplate(name="Test", description="Test prompt", system_prompt="Repeat")
+
+        # Act
+        results = await FakeProvider().process_batch(["a", "broken", "b"], prompt, max_concurrency=2)
+
+        # Assert
+        assert results == ["A", "Error: request failed", "B"]
+
+    @pytest.mark.asyncio
+    async def test_process_text_multi_sends_shared_prompts_once(self):
+        """Test that templates with the same system prompt share one request"""
+        # Arrange
+        calls = []
+
+        class FakeProvider(BaseTextProvider):
+            def process_text(self, text, prompt_template, model=None, temperature=0.2, messages=None):
+                calls.append(prompt_template.system_prompt)
+                return f"{prompt_template.system_prompt}: {text}"
+
+            def get_available_chat_models(self):
+                return []
+
+        summary = PromptTemplate(name="Summary", description="", system_prompt="Summarize")
+        short_summary = PromptTemplate(name="Short summary", description="", system_prompt="Summarize")
+        translate = PromptTemplate(name="Translate", description="", system_prompt="Translate")
+
+        # Act
+        results = await FakeProvider().process_text_multi("hello", [summary, translate, short_summary])
+
+        # Assert
+        assert results == ["Summarize: hello", "Translate: hello", "Summarize: hello"]
+        assert sorted(calls) == ["Summarize", "Translate"]
+
+    def test_rate_limiter_spaces_requests_after_burst(self):
+        """Test that requests beyond the burst wait one interval each"""
+        # Arrange
+        limiter = RateLimiter(requests_per_minute=60, burst=2)
+
+        # Act
+        delays = [limiter.reserve() for _ in range(4)]
+
+        # Assert
+        assert delays[:2] == [0.0, 0.0]
+        assert delays[2] == pytest.approx(1.0, abs=0.01)
+        assert delays[3] == pytest.approx(2.0, abs=0.01)
+
+    def test_check_context_length_rejects_oversized_requests(self, monkeypatch):
+        """Test that requests beyond a model's context window are rejected before sending"""
+        # Arrange
+        class FakeEncoder:
+            def encode(self, text, disallowed_special=()):
+                return text.split()
+
+        monkeypatch.setattr(tokens, "_get_encoder", lambda model: FakeEncoder())
+        short = [{"role": "user", "content": "hello"}]
+        too_long = [{"role": "user", "content": "word " * 9000}]
+
+        # Act & Assert
+        assert tokens.context_window("groq/mixtral-8x7b-32768") == 32768
+        assert tokens.context_window("openrouter/auto") is None
+        assert tokens.check_context_length(short, "gemma2-9b-it") is None
+        assert tokens.check_context_length(too_long, "gemma2-9b-it").startswith("Error: Text is too long")
+        assert tokens.check_context_length(too_long, "openrouter/auto") is None
+
+    def test_context_window_ignores_date_suffixes(self):
+        """Test that dated model ids are not mistaken for ids that spell out their window"""
+        # Act & Assert
+        assert tokens.context_window("gpt-4-0613") != 613
+        assert tokens.context_window("gpt-3.5-turbo-0125") is None
+        assert tokens.context_window("openai/gpt-3.5-turbo-1106") is None
+        assert tokens.context_window("llama3-8b-8192") == 8192
+
+    def test_create_completion_streams_to_callback(self):
+        """Test that a streamed reply is reported as it grows and returned in full"""
+        # Arrange
+        def chunk(content):
+            return MagicMock(choices=[MagicMock(delta=MagicMock(content=content))])
+
+        class FakeProvider(BaseTextProvider):
+            def process_text(self, text, prompt_template, model=None, temperature=0.2, messages=None, on_chunk=None):
+                return None
+
+            def get_available_chat_models(self):
+                return []
+
+        provider = FakeProvider()
+        provider.client = MagicMock()
+        provider.client.chat.completions.create.return_value = iter([chunk("Hel"), chunk(None), chunk("lo")])
+        seen = []
+
+        # Act
+        reply = provider.create_completion(seen.append, model="test-model", messages=[])
+
+        # Assert
+        assert reply == "Hello"
+        assert seen == ["Hel", "Hello"]
+        provider.client.chat.completions.create.assert_called_once_with(stream=True, model="test-model", messages=[])
+
+    def test_create_completion_takes_one_rate_limiter_token(self):
+        """Test that synchronous chat requests are rate limited once each"""
+        # Arrange
+        class FakeProvider(BaseTextProvider):
+            requests_per_minute = 30
+
+            def process_text(self, text, prompt_template, model=None, temperature=0.2, messages=None, on_chunk=None):
+                return self.create_completion(model=model, messages=[{"role": "user", "content": text}])
+
+            def get_available_chat_models(self):
+                return []
+
+        provider = FakeProvider()
+        provider.client = MagicMock()
+        provider.client.chat.completions.create.return_value.choices = [MagicMock(message=MagicMock(content="Hi"))]
+
+        # Act
+        with patch('src.api_providers.base_provider.RateLimiter.reserve', return_value=0.0) as reserve:
+            replies = [provider.process_text("Hello", None, model="test-model") for _ in range(2)]
+
+        # Assert
+        assert replies == ["Hi", "Hi"]
+        assert reserve.call_count == 2
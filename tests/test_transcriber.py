@@ -1,10 +1,14 @@
 """
 Unit tests for the AudioTranscriber class
 """
+import io
+import threading
+import wave
 import pytest
 from unittest.mock import patch, MagicMock
 from src.speech_to_text import AudioTranscriber
-from src.api_providers.base_provider import BaseAudioProvider
+from src.api_providers.base_provider import BaseAudioProvider, ModelIndex, cache_transcripts, invalidate_ttl_cache, single_flight, strip_provider_prefix, transcode_to_wav_buffer, ttl_cache
+from src.api_providers.groq_provider import GroqAudioProvider
 
 class TestAudioTranscriber:
     """Test cases for the AudioTranscriber class"""
@@ -58,6 +62,41 @@ class TestAudioTranscriber:
             assert success is False
             mock_provider.transcribe_file.assert_called_once_with("dummy_path.wav", "whisper-large-v3")
     
+    def test_transcribe_bytes_delegates_to_provider(self, mock_api_key):
+        """Test in-memory transcription is passed straight to the provider"""
+        with patch('src.speech_to_text.ProviderFactory.get_audio_provider') as mock_factory:
+            # Arrange
+            mock_provider = MagicMock(spec=BaseAudioProvider)
+            mock_provider.transcribe_bytes.return_value = ("Transcription result", True)
+            mock_factory.return_value = mock_provider
+            
+            # Act
+            transcriber = AudioTranscriber(provider='groq', api_key=mock_api_key)
+            result, success = transcriber.transcribe_bytes(b"RIFF", "whisper-large-v3")
+            
+            # Assert
+            assert result == "Transcription result"
+            assert success is True
+            mock_provider.transcribe_bytes.assert_called_once_with(b"RIFF", "whisper-large-v3", "audio.wav", None)
+    
+    @pytest.mark.asyncio
+    async def test_transcribe_file_async(self, mock_api_key):
+        """Test that async transcription awaits the provider"""
+        with patch('src.speech_to_text.ProviderFactory.get_audio_provider') as mock_factory:
+            # Arrange
+            mock_provider = MagicMock(spec=BaseAudioProvider)
+            mock_provider.transcribe_file_async.return_value = ("Transcription result", True)
+            mock_factory.return_value = mock_provider
+            
+            # Act
+            transcriber = AudioTranscriber(provider='groq', api_key=mock_api_key)
+            result, success = await transcriber.transcribe_file_async("dummy_path.wav", "whisper-large-v3")
+            
+            # Assert
+            assert result == "Transcription result"
+            assert success is True
+            mock_provider.transcribe_file_async.assert_awaited_once_with("dummy_path.wav", "whisper-large-v3")
+    
     def test_get_available_models(self, mock_api_key):
         """Test getting available transcription models"""
         with patch('src.speech_to_text.ProviderFactory.get_audio_provider') as mock_factory:
@@ -72,4 +111,332 @@ class TestAudioTranscriber:
             
             # Assert
             assert models == ["model1", "model2"]
-            mock_provider.get_available_transcription_models.assert_called_once()
\ No newline at end of file
+            mock_provider.get_available_transcription_models.assert_called_once()
+
+
+    def test_provider_factory_reuses_instances(self, mock_api_key):
+        """Test that transcribers for the same provider and key share one provider instance"""
+        # Act
+        first = AudioTranscriber(provider='groq', api_key=mock_api_key)
+        second = AudioTranscriber(provider='Groq', api_key=mock_api_key)
+        other_key = AudioTranscriber(provider='groq', api_key=mock_api_key + "-other")
+
+        # Assert
+        assert first.audio_provider is second.audio_provider
+        assert first.audio_provider is not other_key.audio_provider
+
+    def test_openrouter_uses_passed_transcription_keys(self, mock_api_key, monkeypatch):
+        """Test that OpenRouter routes transcription with the keys it is given, not the environment"""
+        # Arrange
+        monkeypatch.setenv("GROQ_API_KEY", "env-groq-key")
+
+        # Act
+        transcriber = AudioTranscriber(provider='openrouter', api_key=mock_api_key, openai_api_key="openai-key", groq_api_key=None)
+
+        # Assert
+        assert transcriber.audio_provider.openai_api_key == "openai-key"
+        assert set(transcriber.audio_provider.providers) == {'openai'}
+
+class TestBaseAudioProvider:
+    """Test cases for the shared BaseAudioProvider helpers"""
+
+    @pytest.mark.asyncio
+    async def test_transcribe_files_keeps_order_and_errors(self):
+        """Test that batch transcription returns results in input order and reports failures"""
+        # Arrange
+        class FakeProvider(BaseAudioProvider):
+            def transcribe_file(self, file_path, model):
+                if file_path == "broken.wav":
+                    raise RuntimeError("decode failed")
+                return f"text of {file_path}", True
+
+            def get_available_transcription_models(self):
+                return []
+
+        # Act
+        results = await FakeProvider().transcribe_files(["a.wav", "broken.wav", "b.wav"], "whisper-1", max_concurrency=2)
+
+        # Assert
+        assert results == [
+            ("text of a.wav", True),
+            ("Transcription error: decode failed", False),
+            ("text of b.wav", True)
+        ]
+
+    def test_ttl_cache_reuses_model_list_until_expiry(self):
+        """Test that cached model lists are reused within the TTL and refreshed afterwards"""
+        # Arrange
+        class FakeProvider:
+            calls = 0
+
+            @ttl_cache(60)
+            def get_available_transcription_models(self):
+                FakeProvider.calls += 1
+                return ["whisper-1"]
+
+        provider = FakeProvider()
+
+        with patch('src.api_providers.base_provider.time.monotonic') as mock_clock:
+            # Act
+            mock_clock.return_value = 0
+            first = provider.get_available_transcription_models()
+            first.append("mutated")
+            second = provider.get_available_transcription_models()
+            mock_clock.return_value = 61
+            provider.get_available_transcription_models()
+            invalidate_ttl_cache(provider)
+            provider.get_available_transcription_models()
+
+        # Assert
+        assert second == ["whisper-1"]
+        assert FakeProvider.calls == 3
+
+    def test_ttl_cache_shared_by_providers_with_same_client(self):
+        """Test that a new provider instance reuses the model list fetched through the same client"""
+        # Arrange
+        class FakeProvider:
+            calls = 0
+
+            def __init__(self, client):
+                self.client = client
+
+            @ttl_cache(60)
+            def get_available_transcription_models(self):
+                FakeProvider.calls += 1
+                return ["whisper-1"]
+
+        client = MagicMock()
+
+        # Act
+        FakeProvider(client).get_available_transcription_models()
+        FakeProvider(client).get_available_transcription_models()
+        FakeProvider(MagicMock()).get_available_transcription_models()
+
+        # Assert
+        assert FakeProvider.calls == 2
+
+    def test_cache_transcripts_by_content_and_model(self, tmp_path, monkeypatch):
+        """Test that identical audio is transcribed once per model and failures are not cached"""
+        # Arrange
+        monkeypatch.setenv("TRANSCRIPT_CACHE_DIR", str(tmp_path / "cache"))
+        calls = []
+
+        class FakeProvider:
+            @cache_transcripts
+            def transcribe_bytes(self, audio_bytes, model, filename="audio.wav"):
+                calls.append((audio_bytes, model))
+                return ("text", True) if model != "broken" else ("Error", False)
+
+        provider = FakeProvider()
+
+        # Act
+        first = provider.transcribe_bytes(b"audio", "whisper-1", "a.wav")
+        second = provider.transcribe_bytes(b"audio", "whisper-1", "renamed.wav")
+        provider.transcribe_bytes(b"audio", "whisper-large-v3")
+        provider.transcribe_bytes(b"audio", "broken")
+        provider.transcribe_bytes(b"audio", "broken")
+
+        # Assert
+        assert first == second == ("text", True)
+        assert calls == [
+            (b"audio", "whisper-1"),
+            (b"audio", "whisper-large-v3"),
+            (b"audio", "broken"),
+            (b"audio", "broken")
+        ]
+
+    def test_single_flight_shares_in_flight_result(self):
+        """Test that a call arriving while an identical one is running waits for its result"""
+        # Arrange
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_call():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return ("text", True)
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(single_flight("key", slow_call)))
+        follower = threading.Thread(target=lambda: results.append(single_flight("key", slow_call)))
+
+        # Act
+        leader.start()
+        started.wait(5)
+        follower.start()
+        follower.join(0.2)  # follower blocks on the leader's result
+        release.set()
+        leader.join(5)
+        follower.join(5)
+
+        # Assert
+        assert results == [("text", True), ("text", True)]
+        assert len(calls) == 1
+
+    def test_strip_provider_prefix(self):
+        """Test that matching prefixes are removed and other providers' models are rejected"""
+        # Act & Assert
+        assert strip_provider_prefix("groq/whisper-large-v3", "groq", "Groq") == ("whisper-large-v3", None)
+        assert strip_provider_prefix("whisper-large-v3", "groq", "Groq") == ("whisper-large-v3", None)
+        model, error = strip_provider_prefix("openai/whisper-1", "groq", "Groq")
+        assert model == "openai/whisper-1"
+        assert error == "Error: Model 'openai/whisper-1' is not a Groq model. Please select a Groq model."
+
+    def test_model_index_lookups(self):
+        """Test exact, fuzzy and provider-prefix lookups of model ids"""
+        # Arrange
+        index = ModelIndex(["llama-3.3-70b-versatile", "gemma2-9b-it", "meta-llama/llama-3-8b", "openai/gpt-4o"])
+
+        # Act & Assert
+        assert index.find("LLAMA-3.3-70B-Versatile") == "llama-3.3-70b-versatile"
+        assert index.find("llama-3.3") is None
+        assert index.closest("llama-3.3") == "llama-3.3-70b-versatile"
+        assert index.closest("9b") == "gemma2-9b-it"
+        assert index.closest("mixtral") is None
+        assert index.with_prefix("meta-llama") == ["meta-llama/llama-3-8b"]
+        assert index.with_prefix("anthropic") == []
+
+    def test_segment_stats_are_opt_in(self, mock_api_key):
+        """Test that plain text is requested unless segment statistics are wanted"""
+        with patch('src.api_providers.groq_provider.get_openai_client') as mock_get_client:
+            # Arrange
+            mock_client = MagicMock()
+            mock_client.audio.transcriptions.create.return_value = "Plain transcription"
+            mock_get_client.return_value = mock_client
+            provider = GroqAudioProvider(mock_api_key)
+
+            # Act
+            result = provider._transcribe_upload(MagicMock(), "whisper-large-v3")
+            provider.want_segment_stats = True
+            mock_client.audio.transcriptions.create.return_value = MagicMock(
+                text="Verbose transcription",
+                segments=[MagicMock(avg_logprob=-0.2, no_speech_prob=0.1)]
+            )
+            verbose_result = provider._transcribe_upload(MagicMock(), "whisper-large-v3")
+
+            # Assert
+            assert result == ("Plain transcription", True)
+            assert verbose_result == ("Verbose transcription", True)
+            formats = [c.kwargs["response_format"] for c in mock_client.audio.transcriptions.create.call_args_list]
+            assert formats == ["text", "verbose_json"]
+
+    def test_segment_stats_averages_segments(self, mock_provider_response):
+        """Test that segment confidence statistics are averaged over all segments"""
+        # Arrange
+        segments = [MagicMock(**segment) for segment in mock_provider_response["segments"]]
+
+        # Act
+        avg_logprob, no_speech_prob = BaseAudioProvider.segment_stats(MagicMock(segments=segments))
+        empty_stats = BaseAudioProvider.segment_stats(MagicMock(segments=[]))
+
+        # Assert
+        assert avg_logprob == pytest.approx(-0.4)
+        assert no_speech_prob == pytest.approx(0.075)
+        assert empty_stats == (0.0, 0.0)
+
+    def test_prepare_bytes_upload_trusts_content_over_extension(self):
+        """Test that WebM audio named .wav is uploaded as-is under a WebM name"""
+        # Arrange
+        class FakeProvider(BaseAudioProvider):
+            def transcribe_file(self, file_path, model):
+                return "", True
+
+            def get_available_transcription_models(self):
+                return []
+
+        webm_bytes = b'\x1a\x45\xdf\xa3' + bytes(60)
+
+        # Act
+        upload = FakeProvider().prepare_bytes_upload(webm_bytes, "recording.wav")
+
+        # Assert
+        assert upload.name == "audio.webm"
+        assert upload.getvalue() == webm_bytes
+
+    def test_upload_in_slices_reports_partial_transcripts(self):
+        """Test that long audio reports the merged transcript as each slice completes in order"""
+        # Arrange
+        class FakeProvider(BaseAudioProvider):
+            slice_duration_sec = 1.0
+            slice_overlap_sec = 0.0
+
+            def transcribe_file(self, file_path, model):
+                return "", True
+
+            def get_available_transcription_models(self):
+                return []
+
+        audio = io.BytesIO()
+        with wave.open(audio, 'wb') as writer:
+            writer.setnchannels(1)
+            writer.setsampwidth(2)
+            writer.setframerate(16000)
+            writer.writeframes(bytes(2 * 16000 * 3))
+        audio.seek(0)
+        audio.name = "audio.wav"
+        partials = []
+
+        # Act
+        text, success = FakeProvider().upload_in_slices(audio, lambda f: (f.name, True), partials.append)
+
+        # Assert
+        assert success is True
+        assert partials == ["audio_0.wav", "audio_0.wav audio_1.wav", "audio_0.wav audio_1.wav audio_2.wav"]
+        assert text == partials[-1]
+
+    @pytest.mark.asyncio
+    async def test_rate_limiter_counts_each_upload_once(self):
+        """Test that async and sliced transcription take one limiter token per uploaded slice"""
+        # Arrange
+        class FakeProvider(BaseAudioProvider):
+            slice_duration_sec = 1.0
+            slice_overlap_sec = 0.0
+            requests_per_minute = 600
+
+            def transcribe_file(self, file_path, model):
+                return "", True
+
+            def transcribe_bytes(self, audio_bytes, model, filename="audio.wav", on_partial=None):
+                audio = io.BytesIO(audio_bytes)
+                audio.name = "audio.wav"
+                return self.upload_in_slices(audio, lambda f: (f.name, True), on_partial)
+
+            def get_available_transcription_models(self):
+                return []
+
+        audio = io.BytesIO()
+        with wave.open(audio, 'wb') as writer:
+            writer.setnchannels(1)
+            writer.setsampwidth(2)
+            writer.setframerate(16000)
+            writer.writeframes(bytes(2 * 16000 * 3))
+        provider = FakeProvider()
+
+        # Act
+        with patch('src.api_providers.base_provider.RateLimiter.reserve', return_value=0.0) as reserve:
+            text, success = await provider.transcribe_bytes_async(audio.getvalue(), "whisper-large-v3")
+
+        # Assert
+        assert success is True
+        assert reserve.call_count == 3
+
+    def test_transcode_to_wav_buffer_in_worker(self):
+        """Test that audio pydub has to decode comes back as 16 kHz mono WAV"""
+        # Arrange
+        source = io.BytesIO()
+        with wave.open(source, 'wb') as writer:
+            writer.setnchannels(2)
+            writer.setsampwidth(4)
+            writer.setframerate(44100)
+            writer.writeframes(bytes(8 * 4410))
+
+        # Act
+        converted = transcode_to_wav_buffer(source.getvalue(), 'wav')
+
+        # Assert
+        with wave.open(converted, 'rb') as reader:
+            assert reader.getnchannels() == 1
+            assert reader.getframerate() == 16000
+        assert converted.name == "audio.wav"